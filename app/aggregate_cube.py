@@ -0,0 +1,98 @@
+import pandas as pd
+
+# Sidebar filter dimensions, present in every cube
+FILTER_DIMENSIONS = ["area", "months", "marital", "income"]
+
+# Main cube behind the Dashboard charts, and the smaller one for the customer care chart
+CUBE_DIMENSIONS = FILTER_DIMENSIONS + ["crclscod", "churn"]
+COMPLAINTS_DIMENSIONS = FILTER_DIMENSIONS + ["custcare_Mean"]
+
+
+class AggregateCube:
+    """Counts and sums of the dashboard measures, pre-aggregated over a set of dimensions.
+
+    Filters select cube cells instead of customer rows, and every chart is answered by
+    rolling the selected cells up to its own grouping.
+    """
+
+    def __init__(self, table, dimensions):
+        self.table = table
+        self.dimensions = dimensions
+
+    @classmethod
+    def build(cls, df, dimensions=CUBE_DIMENSIONS):
+        """Aggregate a customer frame into a cube over `dimensions`."""
+        # Keep missing keys as their own cells so filters that match NaN still see them
+        table = df.groupby(dimensions, observed=True, dropna=False).agg(
+            count=("churn", "size"),
+            churned=("churn", "sum"),
+            totrev_sum=("totrev", "sum"),
+            totrev_count=("totrev", "count"),
+            mou_sum=("mou_Mean", "sum"),
+            mou_count=("mou_Mean", "count"),
+            mou_max=("mou_Mean", "max"),
+        ).reset_index()
+        return cls(table, dimensions)
+
+    @classmethod
+    def combine(cls, cubes):
+        """Combine cubes over the same dimensions built from disjoint rows with one concat and one groupby."""
+        cubes = list(cubes)
+        dimensions = cubes[0].dimensions
+        table = pd.concat([cube.table for cube in cubes], ignore_index=True)
+        measures = {column: "sum" for column in table.columns if column not in dimensions}
+        measures["mou_max"] = "max"
+        combined = table.groupby(dimensions, observed=True, dropna=False).agg(measures).reset_index()
+        return cls(combined, dimensions)
+
+    def merge(self, other):
+        """Combine with a cube over the same dimensions built from other rows, e.g. the next chunk."""
+        return AggregateCube.combine([self, other])
+
+    def filter(self, area, months, marital, income):
+        """Return the sub-cube matching the Dashboard sidebar selections."""
+        t = self.table
+        mask = (
+            (t['area'] == area) &
+            (t['months'].between(months[0], months[1])) &
+            (t['marital'].isin(marital)) &
+            (t['income'].between(income[0], income[1]))
+        )
+        return AggregateCube(t[mask], self.dimensions)
+
+    def totals(self):
+        """Return customer count, churn rate, average revenue and average MOU / max MOU."""
+        t = self.table
+        count = t['count'].sum()
+        return {
+            "count": int(count),
+            "churn_rate": t['churned'].sum() / count if count else float("nan"),
+            "avg_revenue": t['totrev_sum'].sum() / t['totrev_count'].sum() if count else float("nan"),
+            "mou_ratio": (t['mou_sum'].sum() / t['mou_count'].sum()) / t['mou_max'].max() if count else float("nan"),
+        }
+
+    def churn_rate(self, by):
+        """Return the churn rate per `by` group as a frame with a 'churn' column."""
+        grouped = self.table.groupby(by, observed=True)[['count', 'churned']].sum()
+        return (grouped['churned'] / grouped['count']).rename('churn')
+
+    def total(self, measure, by):
+        """Return the summed `measure` per `by` group."""
+        return self.table.groupby(by, observed=True)[measure].sum()
+
+
+def build_cubes(df):
+    """Build the main and customer care cubes for the Dashboard."""
+    return AggregateCube.build(df, CUBE_DIMENSIONS), AggregateCube.build(df, COMPLAINTS_DIMENSIONS)
+
+
+def dashboard_tables(cube, complaints_cube):
+    """Return every aggregate the Dashboard charts plot, from already filtered cubes."""
+    return {
+        "churn_over_time": cube.churn_rate('months').reset_index(),
+        "churn_by_marital": cube.churn_rate('marital').reset_index(),
+        "revenue_impact": cube.total('totrev_sum', 'churn').rename('totrev').reset_index(),
+        "churn_by_plan": cube.churn_rate('crclscod').reset_index(),
+        "complaints_churn": complaints_cube.churn_rate('custcare_Mean').reset_index(),
+        "churn_heatmap": cube.churn_rate(['area', 'crclscod']).unstack(),
+    }
@@ -1,17 +1,54 @@
+import logging
+
+import pandas as pd
 import streamlit as st
 from streamlit_extras.metric_cards import style_metric_cards
 
-def display_business_metrics(df):
-    """Display key business metrics in the sidebar."""
-    st.sidebar.markdown("---")
-    st.sidebar.header("📈 Business Metrics (Overall)")
+from app.streaming import BUSINESS_MEASURES, BUSINESS_SEGMENTS, RunningStats, business_metrics
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Segment labels shown in the sidebar breakdown
+SEGMENT_LABELS = {
+    "churn": {0: "Retained", 1: "Churned"},
+    "creditcd": {"Y": "Credit card", "N": "No credit card"},
+}
+
+
+def metrics_from_stats(stats):
+    """Return the overall CLV, ARPU and complaints, and a frame of them per segment of `stats`."""
+    metrics = {"overall": business_metrics(stats.rollup())}
+    for segment in stats.by:
+        frame = pd.DataFrame(business_metrics(stats.rollup([segment])))
+        metrics[segment] = frame.rename(index=SEGMENT_LABELS.get(segment, {}))
+    return metrics
+
+
+def compute_business_metrics(df, segments=BUSINESS_SEGMENTS):
+    """Compute every sidebar KPI from one grouped pass over the business measure columns."""
+    segments = [segment for segment in segments if segment in df.columns]
+    return metrics_from_stats(RunningStats(BUSINESS_MEASURES, by=segments).update(df))
+
+
+def display_business_metrics(metrics):
+    """Display key business metrics, as returned by `compute_business_metrics`, in the sidebar."""
+    try:
+        st.sidebar.markdown("---")
+        st.sidebar.header("📈 Business Metrics (Overall)")
 
-    if df is not None:
-        clv = df['totrev'].mean() / df['months'].mean()
-        arpu = df['rev_Mean'].mean()
-        num_complaints = df['custcare_Mean'].mean() if 'custcare_Mean' in df.columns else 0
+        if metrics is not None:
+            overall = metrics["overall"]
+            st.sidebar.metric(label="📊 Average CLV", value=f"${overall['clv']:.2f}")
+            st.sidebar.metric(label="💳 Average ARPU", value=f"${overall['arpu']:.2f}")
+            st.sidebar.metric(label="📞 Average Complaints", value=f"{overall['complaints']:.2f}")
+            style_metric_cards()  # Apply styling to metric cards
 
-        st.sidebar.metric(label="📊 Average CLV", value=f"${clv:.2f}")
-        st.sidebar.metric(label="💳 Average ARPU", value=f"${arpu:.2f}")
-        st.sidebar.metric(label="📞 Average Complaints", value=f"{num_complaints:.2f}")
-        style_metric_cards()  # Apply styling to metric cards
\ No newline at end of file
+            # Per-segment variants of the same KPIs
+            with st.sidebar.expander("By segment"):
+                for segment, frame in metrics.items():
+                    if segment != "overall":
+                        st.dataframe(frame.rename(columns={"clv": "CLV", "arpu": "ARPU", "complaints": "Complaints"}).round(2))
+    except Exception as e:
+        st.error(f"An error occurred while displaying business metrics: {e}")
+        logger.error(f"Error displaying business metrics: {e}")
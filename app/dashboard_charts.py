@@ -0,0 +1,57 @@
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def churn_over_time_figure(churn_over_time, color_theme):
+    fig = px.line(churn_over_time, x='months', y='churn', title="Churn Rate Over Time",
+                  labels={'churn': 'Churn Rate', 'months': 'Months'},
+                  color_discrete_sequence=[color_theme[0]],
+                  template="plotly_white")
+    fig.update_traces(line=dict(width=3))
+    return fig
+
+
+def churn_by_marital_figure(churn_by_marital, color_theme):
+    return px.bar(churn_by_marital, x='marital', y='churn', title="Churn Rate by Marital Status",
+                  labels={'churn': 'Churn Rate', 'marital': 'Marital Status'},
+                  color='marital', color_discrete_sequence=color_theme,
+                  template="plotly_white")
+
+
+def revenue_impact_figure(revenue_impact, color_theme):
+    return px.bar(revenue_impact, x='churn', y='totrev', title="Total Revenue by Churn Status",
+                  labels={'totrev': 'Total Revenue', 'churn': 'Churn'},
+                  color='churn', color_discrete_sequence=color_theme,
+                  template="plotly_white")
+
+
+def churn_by_plan_figure(churn_by_plan, color_theme):
+    return px.bar(churn_by_plan, x='crclscod', y='churn', title="Churn Rate by Service Plan",
+                  labels={'churn': 'Churn Rate', 'crclscod': 'Service Plan'},
+                  color='crclscod', color_discrete_sequence=color_theme,
+                  template="plotly_white")
+
+
+def complaints_churn_figure(complaints_churn, color_theme):
+    return px.scatter(complaints_churn, x='custcare_Mean', y='churn', title="Customer Complaints vs. Churn",
+                      labels={'custcare_Mean': 'Customer Care Calls', 'churn': 'Churn Rate'},
+                      color='custcare_Mean', color_continuous_scale=color_theme,
+                      template="plotly_white")
+
+
+def churn_gauge_figure(churn_probability):
+    return go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=churn_probability,
+        title={'text': "Churn Probability"},
+        gauge={'axis': {'range': [None, 1]},
+               'steps': [
+                   {'range': [0, 0.3], 'color': "lightgreen"},
+                   {'range': [0.3, 0.7], 'color': "yellow"},
+                   {'range': [0.7, 1], 'color': "red"}],
+               'threshold': {'line': {'color': "black", 'width': 4}, 'thickness': 0.75, 'value': churn_probability}}))
+
+
+def churn_heatmap_figure(churn_heatmap, color_theme):
+    return px.imshow(churn_heatmap, labels=dict(x="Service Plan", y="Area", color="Churn Rate"),
+                     title="Churn Rate by Area and Service Plan", color_continuous_scale=color_theme)
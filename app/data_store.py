@@ -0,0 +1,123 @@
+import os
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Source extract and the columnar snapshot built from it
+CSV_PATH = "data/Telecom_customer churn.csv"
+SNAPSHOT_PATH = "data/Telecom_customer churn.parquet"
+STORE_PATH = "data/Telecom_customer churn.arrow"
+
+# Low-cardinality string columns stored as categoricals in the snapshot
+CATEGORICAL_COLUMNS = ["area", "marital", "crclscod"]
+
+# Columns read by the dashboards
+DASHBOARD_COLUMNS = ["churn", "months", "totrev", "mou_Mean", "custcare_Mean", "area", "marital", "income", "crclscod"]
+# Columns read by Key Insights and the prediction page sidebar
+INSIGHTS_COLUMNS = ["churn", "months", "totrev", "rev_Mean", "custcare_Mean", "creditcd"]
+
+
+def snapshot_dtypes(columns):
+    """Return the explicit snapshot dtype for each typed column in `columns`."""
+    dtypes = {}
+    for column in columns:
+        if column in CATEGORICAL_COLUMNS:
+            dtypes[column] = "category"
+        elif column.endswith("_Mean"):
+            dtypes[column] = "float32"
+    return dtypes
+
+
+def _is_stale(source_path, derived_path):
+    """Check whether `derived_path` is missing or older than `source_path`."""
+    if not os.path.exists(derived_path):
+        return True
+    if not os.path.exists(source_path):
+        return False
+    return os.path.getmtime(derived_path) < os.path.getmtime(source_path)
+
+
+def snapshot_is_stale(csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH):
+    """Check whether the snapshot is missing or older than the source CSV."""
+    return _is_stale(csv_path, snapshot_path)
+
+
+def build_snapshot(csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH):
+    """Convert the churn CSV into a typed Parquet snapshot."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    df = pd.read_csv(csv_path, dtype=snapshot_dtypes(header))
+    # Write next to the target and swap in, so readers never see a half-written snapshot
+    tmp_path = snapshot_path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, snapshot_path)
+    logger.info(f"Snapshot written to {snapshot_path} ({len(df)} rows, {len(df.columns)} columns).")
+    return snapshot_path
+
+
+def load_columns(columns=None, csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH):
+    """Load only `columns` (all when None) from the snapshot, rebuilding it if stale."""
+    if snapshot_is_stale(csv_path, snapshot_path):
+        build_snapshot(csv_path, snapshot_path)
+    return pd.read_parquet(snapshot_path, columns=columns)
+
+
+def build_store(csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH, store_path=STORE_PATH):
+    """Write the snapshot out as a single-chunk, uncompressed Arrow IPC file for memory mapping."""
+    if snapshot_is_stale(csv_path, snapshot_path):
+        build_snapshot(csv_path, snapshot_path)
+    table = pq.read_table(snapshot_path).combine_chunks()
+
+    # Store missing floats as NaN rather than nulls so pandas can view them without copying
+    for i, field in enumerate(table.schema):
+        if pa.types.is_floating(field.type) and table.column(i).null_count:
+            table = table.set_column(i, field, pc.fill_null(table.column(i), float("nan")))
+
+    # Write next to the target and swap in, so processes never map a half-written file
+    tmp_path = store_path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, store_path)
+    logger.info(f"Shared store written to {store_path}.")
+    return store_path
+
+
+def open_store(csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH, store_path=STORE_PATH):
+    """Memory-map the shared Arrow store, rebuilding it if stale."""
+    if snapshot_is_stale(csv_path, snapshot_path) or _is_stale(snapshot_path, store_path):
+        build_store(csv_path, snapshot_path, store_path)
+    source = pa.memory_map(store_path, "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_shared(columns=None, csv_path=CSV_PATH, snapshot_path=SNAPSHOT_PATH, store_path=STORE_PATH):
+    """Load `columns` as a DataFrame whose numeric columns are read-only views of the memory map.
+
+    All pages and server processes mapping the same store share its pages through the OS page
+    cache, so cache the result with `st.cache_resource` and never mutate it in place.
+    """
+    table = open_store(csv_path, snapshot_path, store_path)
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def iter_chunks(path, columns=None, batch_size=100_000):
+    """Yield DataFrames of at most `batch_size` rows from a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        with pd.read_csv(path, usecols=columns, dtype=snapshot_dtypes(header), chunksize=batch_size) as reader:
+            yield from reader
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_store()
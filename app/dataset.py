@@ -0,0 +1,83 @@
+"""The churn dataset as the pages see it: the base CSV plus any appended partitions, under one version.
+
+Every cache that depends on the data is keyed on `dataset_version()`, so the aggregates, the
+row-level frames and the filter options built from them always describe the same customers.
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from app.aggregate_cube import AggregateCube, build_cubes
+from app.data_store import CATEGORICAL_COLUMNS, CSV_PATH, DASHBOARD_COLUMNS, load_shared
+from app.filter_index import FilterIndex
+from app.instrumentation import timed
+from app.partitions import PartitionedAggregates, fingerprint, partition_files, read_partitions
+
+# Marital status codes and their full forms
+MARITAL_STATUS_MAPPING = {
+    "S": "Single",
+    "A": "Annulled",
+    "B": "Divorced",
+    "U": "Unknown",
+    "M": "Married"
+}
+
+
+# Keep the base and per-partition aggregates in one object per process
+@st.cache_resource
+def load_partitions():
+    return PartitionedAggregates()
+
+
+def dataset_version():
+    """Return the version of the base CSV and partitions, or None if there is no data.
+
+    With partitions, this refreshes their aggregates first, so only the delta is ingested.
+    Without, it is the CSV's fingerprint; the store derived from it may not be built yet.
+    """
+    if partition_files():
+        return load_partitions().refresh()["version"]
+    return fingerprint(CSV_PATH) if os.path.exists(CSV_PATH) else None
+
+
+def load_rows(columns):
+    """Return `columns` of every customer: the shared store's rows, followed by the partitions' rows."""
+    df = load_shared(columns)
+    appended = read_partitions(columns)
+    if appended is None:
+        return df
+    df = pd.concat([df, appended], ignore_index=True)
+    # Categories differ between files; concatenated, they fall back to object
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    return df
+
+
+# Row-level Dashboard data, once per dataset version
+@st.cache_resource(max_entries=2)
+@timed("dashboard.load_data")
+def load_dashboard_data(version):
+    df = load_rows(DASHBOARD_COLUMNS)
+    df['marital'] = df['marital'].cat.rename_categories(MARITAL_STATUS_MAPPING)
+    return df
+
+
+# Build the aggregate cubes once per dataset version, from the partition aggregates when there are partitions
+@st.cache_resource(max_entries=2)
+@timed("dashboard.load_cubes")
+def load_cubes(version):
+    if not partition_files():
+        return build_cubes(load_dashboard_data(version))
+    _, cube, complaints_cube = load_partitions().combined()
+    return tuple(
+        AggregateCube(c.table.assign(marital=c.table['marital'].astype('category').cat.rename_categories(MARITAL_STATUS_MAPPING)), c.dimensions)
+        for c in (cube, complaints_cube)
+    )
+
+
+# Build the sidebar filter indexes once per dataset version
+@st.cache_resource(max_entries=2)
+def load_filter_index(version):
+    return FilterIndex(load_dashboard_data(version))
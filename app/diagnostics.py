@@ -0,0 +1,53 @@
+import json
+
+import pandas as pd
+import streamlit as st
+
+from app.instrumentation import METRICS_PATH, REGISTRY
+
+
+def span_table(snapshot):
+    """Return one row per span with its call count and latencies in milliseconds, slowest total first."""
+    rows = [
+        {
+            "span": name,
+            "calls": span["count"],
+            "total (ms)": span["sum"] * 1e3,
+            "mean (ms)": span["mean"] * 1e3,
+            "p50 (ms)": span["p50"] * 1e3,
+            "p90 (ms)": span["p90"] * 1e3,
+            "p99 (ms)": span["p99"] * 1e3,
+            "max (ms)": span["max"] * 1e3,
+        }
+        for name, span in snapshot["spans"].items()
+    ]
+    table = pd.DataFrame(rows, columns=["span", "calls", "total (ms)", "mean (ms)", "p50 (ms)", "p90 (ms)", "p99 (ms)", "max (ms)"])
+    return table.sort_values("total (ms)", ascending=False).set_index("span")
+
+
+def render_diagnostics():
+    """Display the instrumentation registry: span latencies, counters and exports."""
+    st.header("🩺 Diagnostics")
+    if not REGISTRY.enabled:
+        st.warning("Instrumentation is disabled (CHURN_INSTRUMENTATION=0).")
+
+    snapshot = REGISTRY.snapshot()
+    st.caption("Latencies are bucketed; percentiles are bucket upper bounds. Cached loaders are timed on cache misses only.")
+    st.subheader("Spans")
+    st.dataframe(span_table(snapshot).round(2), use_container_width=True)
+
+    st.subheader("Counters")
+    if snapshot["counters"]:
+        st.dataframe(pd.Series(snapshot["counters"], name="count"), use_container_width=True)
+    else:
+        st.write("No counters recorded yet.")
+
+    # Exports for offline comparison or a Prometheus scrape
+    col1, col2, col3, col4 = st.columns(4)
+    col1.download_button("Prometheus text", REGISTRY.prometheus(), file_name="metrics.prom", mime="text/plain")
+    col2.download_button("JSON", json.dumps(snapshot, indent=2), file_name="metrics.json", mime="application/json")
+    if col3.button(f"Write {METRICS_PATH}"):
+        st.success(f"Written to {REGISTRY.write_json()}")
+    if col4.button("Reset"):
+        REGISTRY.reset()
+        st.rerun()
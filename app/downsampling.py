@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Above this many points the MOU scatter is binned on the server instead of sent row by row
+SCATTER_ROW_THRESHOLD = 5_000
+
+# Bins along MOU for the density points, and equal-count bins for the trendline
+DENSITY_BINS = 60
+TREND_BINS = 40
+
+
+def bin_scatter(df, x, y, bins=DENSITY_BINS):
+    """Aggregate points into per-(x bin, y value) counts, plotted at each bin's mean x.
+
+    Suited to the low-cardinality `y` of the churn charts; the output has at most
+    `bins` points per distinct `y`.
+    """
+    data = df[[x, y]].dropna()
+    edges = np.histogram_bin_edges(data[x], bins=bins)
+    bin_index = np.clip(np.searchsorted(edges, data[x], side="right") - 1, 0, bins - 1)
+    grouped = data.groupby([bin_index, data[y].to_numpy()], sort=True)
+    return pd.DataFrame({
+        x: grouped[x].mean().to_numpy(),
+        y: grouped.size().index.get_level_values(1),
+        "count": grouped.size().to_numpy(),
+    })
+
+
+def binned_trend(df, x, y, bins=TREND_BINS):
+    """Return the mean `y` over equal-count bins of `x`, as a trendline."""
+    data = df[[x, y]].dropna()
+    edges = np.unique(np.quantile(data[x], np.linspace(0, 1, bins + 1)))
+    bin_index = np.clip(np.searchsorted(edges, data[x], side="right") - 1, 0, len(edges) - 2)
+    grouped = data.groupby(bin_index, sort=True)
+    return pd.DataFrame({x: grouped[x].mean().to_numpy(), y: grouped[y].mean().to_numpy()})
+
+
+def mou_vs_churn_figure(df, color_theme, row_threshold=SCATTER_ROW_THRESHOLD):
+    """Build the "MOU vs. Churn" chart, switching to server-side binning for large selections."""
+    labels = {'mou_Mean': 'Mean MOU', 'churn': 'Churn'}
+    if len(df) <= row_threshold:
+        return px.scatter(df, x='mou_Mean', y='churn', title="Minutes of Usage (MOU) vs. Churn",
+                          labels=labels, color='churn', color_discrete_sequence=color_theme,
+                          trendline="lowess", template="plotly_white")
+
+    density = bin_scatter(df, 'mou_Mean', 'churn')
+    trend = binned_trend(df, 'mou_Mean', 'churn')
+    fig = px.scatter(density, x='mou_Mean', y='churn', size='count', title="Minutes of Usage (MOU) vs. Churn",
+                     labels={**labels, 'count': 'Customers'}, color='churn',
+                     color_discrete_sequence=color_theme, template="plotly_white")
+    fig.add_trace(go.Scatter(x=trend['mou_Mean'], y=trend['churn'], mode='lines',
+                             name='Churn rate (binned trend)', line=dict(color=color_theme[3])))
+    fig.update_layout(showlegend=False)
+    return fig
@@ -0,0 +1,421 @@
+"""Per-customer TreeSHAP explanations of the ensemble, computed in batches and stored by customer.
+
+    python -m app.explanations customers.csv --id-column Customer_ID --preprocessor input_pipeline.json --workers 4
+
+Contributions are exact path-dependent TreeSHAP values for each member. GradientBoosting
+and LightGBM trees are explained with NumPy from per-leaf tables precomputed once per model
+(`LeafTables`); CatBoost and XGBoost use their own TreeSHAP. The ensemble's contributions are the
+members' averaged with the voting weights, so `expected_value + contributions.sum()` is its
+prediction.
+
+The customer file is read in chunks which worker processes, each holding the model, explain in
+parallel. The results go to a Parquet file with one row per customer (id, churn probability,
+expected value and one contribution column per model feature); `ExplanationStore` loads it
+column-wise and returns a customer's top drivers by id without touching the model.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.data_store import iter_chunks
+from app.feature_schema import FeatureSchema, schema_for
+from app.inference import FEATURE_COLUMNS, MODEL_PATH, ensemble_members, to_feature_matrix
+from app.model_bundle import ALLOW_PICKLE, BUNDLE_PATH, check_pickle, load_ensemble, read_schema
+from app.preprocessing import input_columns, load_input_pipeline
+from app.tree_compiler import GradientBoostingArrays
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+EXPLANATIONS_PATH = "explanations.parquet"
+DEFAULT_BATCH_SIZE = 20_000
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+TOP_DRIVERS = 5
+
+# Leaves whose path splits on more distinct features than this are not tabulated (2**d patterns each)
+MAX_PATH_FEATURES = 10
+
+# Rows per block when walking the leaf tables; bounds the (rows x leaves x path features) arrays
+_BLOCK_CELLS = 500_000
+
+
+def _narrow(path, feature, threshold, is_left, fraction):
+    """Return `path` with one more split on `feature`: rows go left when x <= threshold."""
+    low, high, zero = path.get(feature, (-np.inf, np.inf, 1.0))
+    # Repeated splits on a feature narrow its interval and multiply its zero fraction
+    bounds = (low, min(high, threshold)) if is_left else (max(low, threshold), high)
+    return {**path, feature: (*bounds, zero * fraction)}
+
+
+def _array_leaf_paths(tree):
+    """Yield (value, {feature: (low, high, zero_fraction)}) for every leaf of a `GradientBoostingArrays` tree."""
+    cover = tree["cover"]
+    stack = [(0, {})]
+    while stack:
+        node, path = stack.pop()
+        left, right = tree["left"][node], tree["right"][node]
+        if left == -1:
+            yield tree["value"][node], path
+            continue
+        feature, threshold = int(tree["feature"][node]), tree["threshold"][node]
+        stack.append((left, _narrow(path, feature, threshold, True, cover[left] / cover[node])))
+        stack.append((right, _narrow(path, feature, threshold, False, cover[right] / cover[node])))
+
+
+def _lightgbm_leaf_paths(node, path=None):
+    """Yield (value, {feature: (low, high, zero_fraction)}) for every leaf of a dumped LightGBM tree."""
+    path = {} if path is None else path
+    if "leaf_value" in node:
+        yield node["leaf_value"], path
+        return
+    if node["decision_type"] != "<=" or node["missing_type"] != "None":
+        raise ValueError("Only numerical LightGBM splits without missing-value handling can be tabulated")
+    count = node["internal_count"]
+    for child, is_left in ((node["left_child"], True), (node["right_child"], False)):
+        child_count = child.get("internal_count", child.get("leaf_count"))
+        yield from _lightgbm_leaf_paths(child, _narrow(path, node["split_feature"], node["threshold"], is_left, child_count / count))
+
+
+class LeafTables:
+    """Path-dependent TreeSHAP for tree ensembles as per-leaf lookup tables.
+
+    For a leaf whose path splits on d distinct features, the contribution of each of them
+    depends only on which of the leaf's d path conditions a row satisfies. The contributions
+    are tabulated for all 2**d satisfied-condition patterns, with leaves grouped by d, so
+    explaining a batch is one comparison per path condition and one table lookup per leaf.
+    """
+
+    def __init__(self, leaves, n_features, bias=0.0, float32_input=False):
+        groups = {}
+        for value, path in leaves:
+            # Leaves of single-leaf trees get one always-true condition, which contributes nothing
+            groups.setdefault(max(1, len(path)), []).append((value, path))
+        depth = max(groups)
+        if depth > MAX_PATH_FEATURES:
+            raise ValueError(f"Tree paths split on up to {depth} features; at most {MAX_PATH_FEATURES} can be tabulated.")
+        self.n_features = n_features
+        self.float32_input = float32_input
+        self.expected_value = bias
+        self.groups = []
+        for depth, group in sorted(groups.items()):
+            feature = np.zeros((len(group), depth), dtype=np.intp)
+            low = np.full((len(group), depth), -np.inf)
+            high = np.full((len(group), depth), np.inf)
+            zero = np.ones((len(group), depth))
+            value = np.array([leaf_value for leaf_value, _ in group], dtype=np.float64)
+            for i, (_, path) in enumerate(group):
+                for j, (f, (lo, hi, fraction)) in enumerate(sorted(path.items())):
+                    feature[i, j], low[i, j], high[i, j], zero[i, j] = f, lo, hi, fraction
+            # Path-dependent expectation: leaf values weighted by the share of training cover reaching them
+            self.expected_value += float((value * zero.prod(axis=1)).sum())
+            # Maps each (leaf, condition) contribution onto its feature column
+            scatter = np.zeros((feature.size, n_features))
+            scatter[np.arange(feature.size), feature.ravel()] = 1.0
+            # Flattened to (leaves * 2**d, d) rows, so a lookup is one `take` at leaf offset + pattern
+            table = _tabulate(value, zero).reshape(-1, depth)
+            offsets = np.arange(len(group))[None, :] * 2 ** depth
+            self.groups.append((feature, low, high, table, offsets, scatter))
+
+    @classmethod
+    def from_gradient_boosting(cls, est):
+        """Tabulate a fitted sklearn GradientBoostingRegressor, or its `GradientBoostingArrays` from a bundle."""
+        arrays = est if isinstance(est, GradientBoostingArrays) else GradientBoostingArrays.from_estimator(est)
+        leaves = [leaf for tree in arrays.trees for leaf in _array_leaf_paths(tree)]
+        # sklearn trees compare float32 inputs against their thresholds
+        return cls(leaves, arrays.n_features_in_, arrays.bias, float32_input=True)
+
+    @classmethod
+    def from_lightgbm(cls, est):
+        """Tabulate a LightGBM regressor (the sklearn wrapper or a raw Booster)."""
+        booster = getattr(est, "booster_", est)
+        dump = booster.dump_model()
+        leaves = [leaf for tree in dump["tree_info"] for leaf in _lightgbm_leaf_paths(tree["tree_structure"])]
+        return cls(leaves, dump["max_feature_idx"] + 1)
+
+    def contributions(self, features):
+        """Return the (rows, features) TreeSHAP contributions for `features`."""
+        features = np.asarray(features, dtype=np.float32 if self.float32_input else np.float64).astype(np.float64)
+        if np.isnan(features).any():
+            raise ValueError("Tabulated trees cannot explain rows with missing values; impute them first.")
+        out = np.zeros((len(features), self.n_features))
+        for feature, low, high, table, offsets, scatter in self.groups:
+            block = max(1, _BLOCK_CELLS // feature.size)
+            for start in range(0, len(features), block):
+                x = features[start:start + block][:, feature]  # (rows, leaves, d)
+                satisfied = (x > low) & (x <= high)
+                pattern = offsets + satisfied[..., 0]
+                for j in range(1, feature.shape[1]):
+                    pattern |= satisfied[..., j].astype(np.intp) << j
+                out[start:start + block] += table.take(pattern, axis=0).reshape(len(x), -1) @ scatter
+        return out
+
+
+def _tabulate(value, zero):
+    """Return the (leaves, 2**d, d) contributions of every leaf for each satisfied-condition pattern."""
+    n_leaves, depth = zero.shape
+    patterns = (np.arange(2 ** depth)[:, None] >> np.arange(depth)) & 1  # (2**d, d) "one" fractions
+    # Shapley weight of a coalition of size s among d players, for a player outside it
+    weights = np.array([math.factorial(s) * math.factorial(depth - s - 1) / math.factorial(depth) for s in range(depth)])
+    table = np.empty((n_leaves, 2 ** depth, depth))
+    for i in range(depth):
+        # Coefficients of prod_{j != i} (zero_j + one_j * t): coefficient s sums the coalitions of size s
+        poly = np.zeros((n_leaves, 2 ** depth, depth))
+        poly[..., 0] = 1.0
+        for j in range(depth):
+            if j == i:
+                continue
+            shifted = np.concatenate([np.zeros_like(poly[..., :1]), poly[..., :-1]], axis=-1)
+            poly = poly * zero[:, j, None, None] + shifted * patterns[None, :, j, None]
+        table[..., i] = value[:, None] * (patterns[None, :, i] - zero[:, i, None]) * (poly @ weights)
+    return table
+
+
+def _is_lightgbm(est):
+    # Bundles hold the raw LightGBM Booster, pickles the sklearn wrapper
+    return type(est).__module__.startswith("lightgbm")
+
+
+def _native_contributions(est, features, threads):
+    """Return (contributions, expected value) from a library's built-in TreeSHAP."""
+    kind = type(est).__name__
+    if _is_lightgbm(est):
+        raw = est.predict(features, pred_contrib=True, num_threads=threads or 0)
+    elif kind == "CatBoostRegressor":
+        from catboost import Pool
+        raw = est.get_feature_importance(Pool(features), type="ShapValues", thread_count=threads or -1)
+    elif kind == "XGBRegressor":
+        import xgboost
+        raw = est.get_booster().predict(xgboost.DMatrix(features, nthread=threads or -1), pred_contribs=True)
+    else:
+        raise ValueError(f"{kind} members cannot be explained")
+    return raw[:, :-1], float(raw[0, -1])
+
+
+def _leaf_tables(est):
+    """Return the member's leaf tables, or None where its library's own TreeSHAP is used."""
+    if type(est).__name__ in ("GradientBoostingRegressor", "GradientBoostingArrays"):
+        return LeafTables.from_gradient_boosting(est)
+    if _is_lightgbm(est):
+        # LightGBM's native TreeSHAP walks every tree per row; the tables are much faster in batches
+        try:
+            return LeafTables.from_lightgbm(est)
+        except ValueError as e:
+            logger.info(f"Using LightGBM's own TreeSHAP: {e}")
+    return None
+
+
+class EnsembleExplainer:
+    """TreeSHAP contributions of a VotingRegressor or ModelBundle, averaged with the voting weights."""
+
+    def __init__(self, model, threads=None):
+        ensemble = ensemble_members(model)
+        self.names = list(ensemble.names)
+        self.members = [ensemble.member(name) for name in self.names]
+        weights = np.ones(len(self.names)) if ensemble.weights is None else np.asarray(ensemble.weights, dtype=np.float64)
+        self.weights = weights / weights.sum()
+        self.threads = threads
+        # Tables are built once per model; CatBoost and XGBoost explain natively
+        self._tables = [_leaf_tables(est) for est in self.members]
+
+    def explain(self, features):
+        """Return the (rows, features) contributions and the expected value of the ensemble."""
+        features = np.asarray(features, dtype=np.float64)
+        missing = np.isnan(features).any()
+        total, expected = 0.0, 0.0
+        for est, tables, weight in zip(self.members, self._tables, self.weights):
+            if tables is not None and not (missing and _is_lightgbm(est)):
+                contributions, member_expected = tables.contributions(features), tables.expected_value
+            else:
+                contributions, member_expected = _native_contributions(est, features, self.threads)
+            total = total + weight * contributions
+            expected += weight * member_expected
+        return total, expected
+
+
+def top_drivers(contributions, names, k=TOP_DRIVERS):
+    """Return the `k` largest contributions by magnitude as a frame of feature and contribution."""
+    contributions = np.asarray(contributions, dtype=np.float64)
+    k = min(k, len(contributions))
+    order = np.argpartition(-np.abs(contributions), k - 1)[:k]
+    order = order[np.argsort(-np.abs(contributions[order]))]
+    return pd.DataFrame({"feature": [names[i] for i in order], "contribution": contributions[order]})
+
+
+# The explainer loaded once in each worker process
+_worker_explainer = None
+
+
+def _init_worker(bundle_path, pickle_path, allow_pickle):
+    global _worker_explainer
+    model = load_ensemble(bundle_path, pickle_path, allow_pickle)
+    # A bundle checks its members as they load; a pickled model is checked against the default columns here
+    schema_for(model, FEATURE_COLUMNS)
+    # One thread per worker; the parallelism comes from the worker processes
+    _worker_explainer = EnsembleExplainer(model, threads=1)
+
+
+def _explain_in_worker(features):
+    return _worker_explainer.explain(features)
+
+
+def _chunk_matrices(input_path, batch_size, id_column, features, input_pipeline):
+    """Yield (ids, feature matrix) for every chunk of the customer file."""
+    columns = list(features) + ([id_column] if id_column not in features else [])
+    for chunk in iter_chunks(input_path, columns=columns, batch_size=batch_size):
+        if input_pipeline is not None:
+            matrix = np.ascontiguousarray(input_pipeline.transform(chunk[features]), dtype=np.float64)
+        else:
+            matrix = to_feature_matrix(chunk, features)
+        yield chunk[id_column].to_numpy(), matrix
+
+
+def _check_unique_ids(input_path, id_column, batch_size):
+    """Raise ValueError if a customer id occurs more than once; the store is looked up by id."""
+    ids = [chunk[id_column] for chunk in iter_chunks(input_path, columns=[id_column], batch_size=batch_size)]
+    ids = pd.concat(ids, ignore_index=True) if ids else pd.Series([], dtype=object)
+    duplicated = ids[ids.duplicated()].unique()
+    if len(duplicated):
+        raise ValueError(
+            f"{input_path} has {len(duplicated)} {id_column} values on more than one row "
+            f"(e.g. {duplicated[:5].tolist()}); explanations are stored one row per customer."
+        )
+
+
+def explain_file(input_path, output_path=EXPLANATIONS_PATH, id_column="Customer_ID", bundle_path=BUNDLE_PATH,
+                 pickle_path=MODEL_PATH, input_pipeline=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS,
+                 allow_pickle=ALLOW_PICKLE):
+    """Explain every customer of `input_path` into the explanation store at `output_path`; return run statistics.
+
+    Customer ids must be unique; the id column is checked before anything is explained. Only the
+    worker processes load the model; the feature names come from the bundle's manifest.
+    """
+    _check_unique_ids(input_path, id_column, batch_size)
+    schema = read_schema(bundle_path)
+    if schema is None:
+        # No bundle: the workers unpickle the model, which is only allowed explicitly
+        check_pickle(pickle_path, allow_pickle)
+        schema = FeatureSchema(FEATURE_COLUMNS)
+    names = schema.names
+    features = input_columns(input_pipeline) if input_pipeline is not None else names
+    chunks = _chunk_matrices(input_path, batch_size, id_column, features, input_pipeline)
+    metadata = {b"explanations": json.dumps({"id_column": id_column, "features": list(names)}).encode()}
+    rows = 0
+    writer = None
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bundle_path, pickle_path, allow_pickle)) as executor:
+        # Keep at most two chunks per worker in flight, so memory stays bounded on large files
+        pending = []
+        try:
+            for ids, matrix in chunks:
+                pending.append((ids, executor.submit(_explain_in_worker, matrix)))
+                if len(pending) >= 2 * workers:
+                    rows, writer = _write(pending.pop(0), names, id_column, metadata, output_path, writer, rows)
+            while pending:
+                rows, writer = _write(pending.pop(0), names, id_column, metadata, output_path, writer, rows)
+        finally:
+            if writer is not None:
+                writer.close()
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed if elapsed else 0.0}
+
+
+def _write(item, names, id_column, metadata, output_path, writer, rows):
+    ids, future = item
+    contributions, expected = future.result()
+    frame = pd.DataFrame(contributions.astype(np.float32), columns=names)
+    frame.insert(0, "expected_value", np.float32(expected))
+    frame.insert(0, "churn_probability", (expected + contributions.sum(axis=1)).astype(np.float32))
+    frame.insert(0, id_column, ids)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if writer is None:
+        writer = pq.ParquetWriter(output_path, table.schema.with_metadata(metadata))
+    writer.write_table(table.replace_schema_metadata(metadata))
+    rows += len(frame)
+    logger.info(f"Explained {rows} customers.")
+    return rows, writer
+
+
+class ExplanationStore:
+    """Explanations written by `explain_file`, held column-wise and indexed by customer id."""
+
+    def __init__(self, path=EXPLANATIONS_PATH):
+        table = pq.read_table(path)
+        meta = json.loads(table.schema.metadata[b"explanations"])
+        self.id_column = meta["id_column"]
+        self.features = meta["features"]
+        self.index = pd.Index(table.column(self.id_column).to_numpy())
+        if not self.index.is_unique:
+            raise ValueError(f"{path} holds more than one row for some {self.id_column} values; rebuild it with explain_file.")
+        self.probability = table.column("churn_probability").to_numpy()
+        self.expected_value = table.column("expected_value").to_numpy()
+        self.contributions = np.column_stack([table.column(name).to_numpy() for name in self.features])
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, customer_id):
+        return customer_id in self.index
+
+    def lookup(self, customer_id):
+        """Return the churn probability, expected value and contributions stored for a customer."""
+        row = self.index.get_loc(customer_id)
+        return {
+            "churn_probability": float(self.probability[row]),
+            "expected_value": float(self.expected_value[row]),
+            "contributions": pd.Series(self.contributions[row], index=self.features),
+        }
+
+    def top_drivers(self, customer_id, k=TOP_DRIVERS):
+        """Return a customer's `k` largest contributions; raises KeyError for unknown ids."""
+        return top_drivers(self.contributions[self.index.get_loc(customer_id)], self.features, k)
+
+    def top_driver_columns(self, customer_ids, k=TOP_DRIVERS):
+        """Return the top `k` driver names per customer as columns driver_1..driver_k, missing for unknown ids."""
+        rows = self.index.get_indexer(customer_ids)
+        found = rows >= 0
+        order = np.argsort(-np.abs(self.contributions[rows[found]]), axis=1)[:, :k]
+        names = np.asarray(self.features, dtype=object)
+        columns = {}
+        for i in range(order.shape[1]):
+            column = np.full(len(rows), None, dtype=object)
+            column[found] = names[order[:, i]]
+            columns[f"driver_{i + 1}"] = column
+        return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Customer file to explain (.csv or .parquet)")
+    parser.add_argument("--output", default=EXPLANATIONS_PATH, help="Parquet explanation store to write")
+    parser.add_argument("--id-column", default="Customer_ID", help="Column identifying each customer")
+    parser.add_argument("--bundle", default=BUNDLE_PATH, help="Model bundle (falls back to --model with --allow-pickle)")
+    parser.add_argument("--model", default=MODEL_PATH, help="Pickled VotingRegressor")
+    parser.add_argument("--allow-pickle", action="store_true", help="Trust and unpickle --model, a bundle's pickled members, or a pickled --preprocessor")
+    parser.add_argument("--preprocessor", default=None, help="Fitted input pipeline from app.training, for files of raw customer columns")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Customers per chunk")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes explaining chunks in parallel")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    input_pipeline = None
+    if args.preprocessor:
+        # The JSON transform app.training writes next to the pickle reads no code
+        if not args.preprocessor.endswith(".json"):
+            check_pickle(args.preprocessor, args.allow_pickle or ALLOW_PICKLE)
+        input_pipeline = load_input_pipeline(args.preprocessor)
+    stats = explain_file(args.input, args.output, args.id_column, args.bundle, args.model, input_pipeline,
+                         args.batch_size, args.workers, args.allow_pickle or ALLOW_PICKLE)
+    print(f"Explained {stats['rows']} customers in {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
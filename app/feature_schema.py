@@ -0,0 +1,179 @@
+import operator
+
+import numpy as np
+import pandas as pd
+
+from app.inference import ensemble_members
+
+
+def member_feature_count(est):
+    """Return how many input features a fitted model expects, or None if it does not say."""
+    # CatBoost reports n_features_in_ as 0 when fitted on an array; its feature_names_ are reliable
+    if getattr(est, "feature_names_", None) is not None:
+        return len(est.feature_names_)
+    if hasattr(est, "num_feature"):
+        return int(est.num_feature())
+    if getattr(est, "n_features_in_", 0):
+        return int(est.n_features_in_)
+    return None
+
+
+class FeatureSchema:
+    """The exact model input: feature names and dtypes in column order.
+
+    Models trained by `app.training` also record where the features come from: the raw customer
+    columns the input pipeline reads and the indices SelectKBest kept.
+    """
+
+    def __init__(self, names, dtypes=None, selected_indices=None, source_columns=None):
+        self.names = list(names)
+        self.dtypes = list(dtypes) if dtypes is not None else ["float32"] * len(self.names)
+        if len(self.dtypes) != len(self.names):
+            raise ValueError(f"Schema has {len(self.names)} feature names but {len(self.dtypes)} dtypes.")
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"Schema feature names are not unique: {self.names}")
+        self.selected_indices = list(selected_indices) if selected_indices is not None else None
+        if self.selected_indices is not None and len(self.selected_indices) != len(self.names):
+            raise ValueError(f"Schema has {len(self.names)} features but {len(self.selected_indices)} selected indices.")
+        self.source_columns = list(source_columns) if source_columns is not None else None
+
+    @classmethod
+    def from_input_pipeline(cls, pipeline):
+        """Derive the schema of a fitted input pipeline (preprocessor, column transformer, selector)."""
+        selector = pipeline.steps[-1][1]
+        transformed = pipeline[:-1].get_feature_names_out()
+        indices = [int(i) for i in selector.get_support(indices=True)]
+        # Drop the ColumnTransformer prefix ("num__rev_Mean" -> "rev_Mean")
+        names = [str(transformed[i]).split("__", 1)[-1] for i in indices]
+        return cls(names, selected_indices=indices, source_columns=list(pipeline.feature_names_in_))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            [feature["name"] for feature in data["features"]],
+            [feature["dtype"] for feature in data["features"]],
+            data.get("selected_indices"),
+            data.get("source_columns"),
+        )
+
+    def to_dict(self):
+        return {
+            "features": [{"name": name, "dtype": dtype} for name, dtype in zip(self.names, self.dtypes)],
+            "selected_indices": self.selected_indices,
+            "source_columns": self.source_columns,
+        }
+
+    def check_model(self, est, name="model"):
+        """Raise ValueError if a fitted model expects a different number of features."""
+        count = member_feature_count(est)
+        if count is not None and count != len(self.names):
+            raise ValueError(f"{name} expects {count} features but the schema lists {len(self.names)}: {self.names}")
+
+    def adapter(self, fields, input_pipeline=None):
+        """Compile an `InputAdapter` for requests that supply `fields`, raw columns of `input_pipeline` if given."""
+        return InputAdapter(self, fields, input_pipeline)
+
+
+class InputAdapter:
+    """Maps requests with a fixed set of fields straight to contiguous float32 model input.
+
+    Field names are matched against the schema once, when the adapter is built, so a page or
+    service whose fields do not cover the model's features fails at load time. Each call is
+    then a precomputed gather with no DataFrame and no name lookup in the model.
+
+    With the model's fitted input pipeline, requests carry raw customer columns instead, and
+    every row goes through the pipeline exactly as it did in training. They must carry the
+    columns the model's features are computed from (`pipeline_inputs`); the pipeline imputes
+    any other column they leave out, as it does for missing values.
+    """
+
+    def __init__(self, schema, fields, input_pipeline=None):
+        fields = list(fields)
+        if input_pipeline is not None:
+            inputs = list(input_pipeline.feature_names_in_)
+            required = pipeline_inputs(schema, input_pipeline)
+        else:
+            inputs = required = schema.names
+        missing = [name for name in required if name not in fields]
+        if missing:
+            raise ValueError(f"Model inputs {missing} are not provided; the model expects {required}, got {fields}.")
+        self.schema = schema
+        self.fields = fields
+        self.inputs = inputs
+        self.input_pipeline = input_pipeline
+        # Inputs the requests carry, in model order; with a pipeline, the others are left to its imputation
+        self.provided = [name for name in inputs if name in fields]
+        self.positions = np.array([fields.index(name) for name in self.provided], dtype=np.intp)
+        self._identity = self.positions.tolist() == list(range(len(fields)))
+        # itemgetter of one name returns a scalar, so always ask for a tuple
+        getter = operator.itemgetter(*self.provided)
+        self._getter = getter if len(self.provided) > 1 else lambda values: (getter(values),)
+
+    def _transform(self, df):
+        df = df[self.provided].reindex(columns=self.inputs)
+        return np.ascontiguousarray(self.input_pipeline.transform(df), dtype=np.float32)
+
+    def from_mapping(self, values):
+        """Return one request given as a field -> value mapping as a (1, n_features) float32 row."""
+        if self.input_pipeline is not None:
+            return self._transform(pd.DataFrame([self._getter(values)], columns=self.provided))
+        return np.array(self._getter(values), dtype=np.float32).reshape(1, -1)
+
+    def from_rows(self, rows):
+        """Return rows whose columns follow `fields` as a contiguous (n, n_features) float32 matrix."""
+        rows = np.asarray(rows, dtype=object if self.input_pipeline is not None else np.float32)
+        if rows.ndim != 2 or rows.shape[1] != len(self.fields):
+            raise ValueError(f"Expected rows of {len(self.fields)} fields {self.fields}, got shape {rows.shape}.")
+        if self.input_pipeline is not None:
+            return self._transform(pd.DataFrame(rows[:, self.positions], columns=self.provided).infer_objects())
+        return np.ascontiguousarray(rows if self._identity else rows[:, self.positions])
+
+    def from_frame(self, df):
+        """Return the `fields` columns of a DataFrame as contiguous float32 model input."""
+        if self.input_pipeline is not None:
+            return self._transform(df)
+        return self.from_rows(df[self.fields].to_numpy(dtype=np.float32))
+
+
+def schema_for(model, default_names):
+    """Return the schema a loaded model carries, or one built from `default_names` for a plain pickle."""
+    schema = getattr(model, "schema", None)
+    if schema is None:
+        schema = FeatureSchema(default_names)
+        if not hasattr(model, "estimators"):
+            schema.check_model(model)
+            return schema
+        members = ensemble_members(model)
+        for name in members.names:
+            schema.check_model(members.member(name), name)
+    return schema
+
+
+def pipeline_inputs(schema, input_pipeline):
+    """Return the raw columns of `input_pipeline` that the model's selected features are computed from.
+
+    A numeric feature keeps its raw column's name through the pipeline and depends on that column
+    alone. If any feature does not (a one-hot category, say), every raw column is needed.
+    """
+    columns = list(input_pipeline.feature_names_in_)
+    if all(name in columns for name in schema.names):
+        return [name for name in columns if name in schema.names]
+    return columns
+
+
+def input_pipeline_for(model):
+    """Return the fitted input pipeline a model bundle ships, or None if the model has none."""
+    return model.input_pipeline() if hasattr(model, "input_pipeline") else None
+
+
+def form_fields(model, default_fields):
+    """Return the fields a form collects for `model`: the raw columns behind its features if it ships an input pipeline."""
+    input_pipeline = input_pipeline_for(model)
+    if input_pipeline is None:
+        return list(default_fields)
+    return pipeline_inputs(schema_for(model, default_fields), input_pipeline)
+
+
+def adapter_for(model, fields, default_names):
+    """Compile the `InputAdapter` from `fields` to a loaded model, through its input pipeline if it ships one."""
+    return schema_for(model, default_names).adapter(fields, input_pipeline_for(model))
@@ -0,0 +1,94 @@
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+# Total serialized size kept before the least recently used figures are evicted
+DEFAULT_MAXBYTES = 64 * 2**20
+
+
+def _freeze(value):
+    """Turn lists, tuples, sets and dicts of filter values into a hashable key part."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    return value
+
+
+class FigureCache:
+    """Thread-safe LRU of serialized Plotly figures, bounded by the total size of their JSON in bytes.
+
+    Entries are keyed on (chart id, filter state, dataset version), so a chart whose inputs
+    have not changed is handed to `st.plotly_chart` as its stored dict, without being rebuilt
+    with Plotly Express or serialized again. The returned dicts are shared between sessions
+    and must not be modified.
+    """
+
+    def __init__(self, maxbytes=DEFAULT_MAXBYTES):
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(chart_id, filters, version):
+        """Build the cache key for a chart under the given filter selections and dataset version."""
+        return chart_id, _freeze(filters), version
+
+    def _lookup(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return None
+
+    def _store(self, key, spec, nbytes):
+        with self._lock:
+            # A figure larger than the whole budget is returned but not kept
+            if nbytes > self.maxbytes or key in self._entries:
+                return
+            self._entries[key] = (spec, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.maxbytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def figure(self, key, build):
+        """Return the figure for `key` as the dict `st.plotly_chart` takes; `build()` only runs on a miss."""
+        spec = self._lookup(key)
+        if spec is None:
+            # Build and serialize outside the lock so other sessions are not blocked on Plotly
+            text = pio.to_json(build(), validate=False)
+            spec = json.loads(text)
+            self._store(key, spec, len(text))
+        return spec
+
+    def stats(self):
+        """Return the hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "bytes": self.nbytes,
+                "maxbytes": self.maxbytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Sidebar filters resolved by bitmap intersection, and those resolved by binary search
+EQUALITY_COLUMNS = ["area", "marital"]
+RANGE_COLUMNS = ["months", "income"]
+
+
+def _is_missing(value):
+    return not isinstance(value, str) and pd.isna(value)
+
+
+class FilterIndex:
+    """Load-time indexes that resolve the Dashboard sidebar filters to row positions.
+
+    `area` and `marital` get one packed bitmap per value (missing values included, since a
+    multiselect built from `unique()` can select NaN). `months` and `income` keep their row
+    positions sorted by value, so a range resolves by binary search. Only rows already inside
+    the narrower range are checked against the bitmaps and the other range.
+    """
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.bitmaps = {}
+        # Distinct values in order of appearance, as `unique()` returns them for the widgets
+        self.options = {}
+        for column in EQUALITY_COLUMNS:
+            self.options[column] = df[column].unique()
+            values = df[column].astype("category")
+            codes = values.cat.codes.to_numpy()
+            bitmaps = {None: np.packbits(codes == -1)}
+            for code, value in enumerate(values.cat.categories):
+                bitmaps[value] = np.packbits(codes == code)
+            self.bitmaps[column] = bitmaps
+
+        self.sorted_values = {}
+        self.sorted_positions = {}
+        self.ranks = {}
+        for column in RANGE_COLUMNS:
+            values = df[column].to_numpy()
+            # Stable sort keeps positions of equal values ascending; NaN sorts last
+            order = np.argsort(values, kind="stable")
+            self.sorted_values[column] = values[order]
+            self.sorted_positions[column] = order
+            # Inverse permutation: where each row sits in the sorted order
+            rank = np.empty(self.size, dtype=np.int64)
+            rank[order] = np.arange(self.size)
+            self.ranks[column] = rank
+
+    def bounds(self, column):
+        """Return the (min, max) of a range column, ignoring missing values."""
+        values = self.sorted_values[column]
+        valid = values[:np.searchsorted(values, np.nan, side="left")] if values.dtype.kind == "f" else values
+        return valid[0], valid[-1]
+
+    def _bitmap(self, column, selected):
+        """OR together the bitmaps of every selected value of an equality column."""
+        bitmaps = self.bitmaps[column]
+        result = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        for value in selected:
+            key = None if _is_missing(value) else value
+            if key in bitmaps:
+                result |= bitmaps[key]
+        return result
+
+    def _span(self, column, low, high):
+        """Return the [start, stop) slice of the sorted order holding values in [low, high]."""
+        values = self.sorted_values[column]
+        return np.searchsorted(values, low, side="left"), np.searchsorted(values, high, side="right")
+
+    def resolve(self, area, months, marital, income):
+        """Return the ascending row positions matching the sidebar selections."""
+        # Equality on NaN matches nothing, as with `df['area'] == selected_area`
+        area_bitmap = np.zeros((self.size + 7) // 8, dtype=np.uint8) if _is_missing(area) else self._bitmap("area", [area])
+        bitmap = area_bitmap & self._bitmap("marital", marital)
+
+        # Start from the narrower range and test the other one on those candidates only
+        spans = {"months": self._span("months", *months), "income": self._span("income", *income)}
+        narrow, other = sorted(spans, key=lambda column: spans[column][1] - spans[column][0])
+        start, stop = spans[narrow]
+        positions = self.sorted_positions[narrow][start:stop]
+
+        in_bitmap = (bitmap[positions >> 3] >> (7 - (positions & 7))) & 1
+        positions = positions[in_bitmap.astype(bool)]
+
+        start, stop = spans[other]
+        rank = self.ranks[other][positions]
+        positions = positions[(rank >= start) & (rank < stop)]
+        return np.sort(positions)
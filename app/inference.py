@@ -0,0 +1,125 @@
+import pickle
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = "voting_regressor_model.pkl"
+
+# Model inputs in the order the prediction pages build them
+FEATURE_COLUMNS = [
+    "Age", "Gender", "Tenure", "MonthlyCharges", "TotalCharges",
+    "ContractType", "PaymentMethod", "UsageFrequency", "NumberOfCalls", "Complaints"
+]
+
+
+def load_model_file(path=MODEL_PATH):
+    """Unpickle the VotingRegressor ensemble."""
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def to_feature_matrix(df, columns=FEATURE_COLUMNS):
+    """Return `columns` of `df` as a contiguous float64 array in model order."""
+    return np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64))
+
+
+def predict_batch(model, features):
+    """Score a whole feature matrix with one vectorized predict call."""
+    return model.predict(features)
+
+
+class _VotingMembers:
+    """Name-addressable access to the fitted members of a VotingRegressor."""
+
+    def __init__(self, model):
+        # estimators_ holds the fitted members in order, without the dropped ones
+        self.names = [name for name, est in model.estimators if est != "drop"]
+        self.weights = None
+        if model.weights is not None:
+            self.weights = [w for (_, est), w in zip(model.estimators, model.weights) if est != "drop"]
+        self._members = dict(zip(self.names, model.estimators_))
+
+    def member(self, name):
+        return self._members[name]
+
+
+def ensemble_members(model):
+    """Return `names`, `weights` and `member(name)` access for a VotingRegressor or ModelBundle."""
+    if hasattr(model, "member"):
+        return model
+    return _VotingMembers(model)
+
+
+# Members moved into a process pool, keyed by name; populated once per worker
+_worker_estimators = {}
+
+
+def _init_worker(payload):
+    """Unpickle the members this worker process predicts with."""
+    global _worker_estimators
+    _worker_estimators = pickle.loads(payload)
+
+
+def _predict_in_worker(name, features):
+    return _worker_estimators[name].predict(features)
+
+
+class ParallelVotingPredictor:
+    """Predict with every member of a fitted VotingRegressor concurrently.
+
+    Members run on a thread pool by default, since CatBoost, LightGBM and sklearn's tree
+    predictors release the GIL in native code. Members named in `process_members` run on a
+    process pool instead, for estimators whose predict holds the GIL. The member outputs are
+    combined with the same weighted average as `VotingRegressor.predict`.
+    """
+
+    def __init__(self, model, process_members=(), max_workers=None):
+        self._ensemble = ensemble_members(model)
+        self.names = self._ensemble.names
+        self.weights = self._ensemble.weights
+
+        unknown = set(process_members) - set(self.names)
+        if unknown:
+            raise ValueError(f"Unknown ensemble members: {sorted(unknown)}")
+
+        self._process_members = set(process_members)
+        thread_count = len(self.names) - len(self._process_members)
+        self._threads = ThreadPoolExecutor(max_workers=max_workers or thread_count or 1)
+        self._processes = None
+        if process_members:
+            payload = pickle.dumps({name: self._ensemble.member(name) for name in process_members})
+            self._processes = ProcessPoolExecutor(
+                max_workers=max_workers or len(process_members),
+                initializer=_init_worker,
+                initargs=(payload,),
+            )
+
+    def _predict_member(self, name, features):
+        # Resolved per call so lazily loaded bundle members load on the worker threads
+        return self._ensemble.member(name).predict(features)
+
+    def predict(self, features):
+        """Return the weighted ensemble prediction for `features`."""
+        futures = []
+        for name in self.names:
+            if name in self._process_members:
+                futures.append(self._processes.submit(_predict_in_worker, name, features))
+            else:
+                futures.append(self._threads.submit(self._predict_member, name, features))
+        predictions = np.column_stack([future.result() for future in futures])
+        return np.average(predictions, axis=1, weights=self.weights)
+
+    def close(self):
+        """Shut down the worker pools."""
+        self._threads.shutdown()
+        if self._processes is not None:
+            self._processes.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,104 +1,150 @@
-import streamlit as st
+import logging
+
 import pandas as pd
 import plotly.express as px
+import streamlit as st
+
+# Set up logging
+logger = logging.getLogger(__name__)
 
 COLOR_THEME = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
 
-def key_insights_and_analysis(df):
-    """Display key insights and analysis based on the data."""
-    st.header("📊 Key Insights and Analysis")
-    st.markdown(
-        """
-        Dive into customer churn data and uncover actionable insights using advanced analytics and visualizations.
-        """
-    )
-
-    analysis_option = st.selectbox(
-        "Choose an Analysis",
-        [
-            "Overall Churn Rate",
-            "Churn Rate by Tenure",
-            "Churn by Payment Method",
-            "ARPU: Churned vs Retained"
-        ]
-    )
-
-    if analysis_option == "Overall Churn Rate":
-        churn_rate = df['churn'].mean() * 100
-        st.metric(label="Overall Churn Rate", value=f"{churn_rate:.2f}%")
-        
-        fig = px.pie(df, names='churn', title="Overall Churn Rate", 
-                     color_discrete_sequence=COLOR_THEME,
-                     hole=0.4)
-        st.plotly_chart(fig, use_container_width=True)
+CHURN_LABELS = {0: 'Retained', 1: 'Churned'}
+ARPU_BINS = 20
 
-        st.markdown(
-            """
-            **Insights:**
-            - The overall churn rate provides a high-level view of customer attrition.
-            - A higher churn rate indicates a need for immediate retention strategies.
-            - Compare this rate with industry benchmarks to assess performance.
-            """
-        )
 
-    elif analysis_option == "Churn Rate by Tenure":
-        fig = px.histogram(df, x='months', color='churn', 
-                           barmode='group', title="Churn Rate by Tenure",
-                           labels={'months': 'Tenure (Months)', 'churn': 'Churn'},
-                           color_discrete_sequence=COLOR_THEME)
-        st.plotly_chart(fig, use_container_width=True)
+def churn_counts(df):
+    """Return customers per churn value."""
+    return df['churn'].value_counts(sort=False).sort_index().rename_axis('churn').reset_index(name='count')
 
-        st.markdown(
-            """
-            **Insights:**
-            - Customers with shorter tenures are more likely to churn.
-            - Long-term customers tend to have lower churn rates, indicating loyalty.
-            - Focus retention efforts on customers in the 0-12 month tenure range.
-            """
-        )
 
-    elif analysis_option == "Churn by Payment Method":
-        df['churn_status'] = df['churn'].map({0: 'Retained', 1: 'Churned'})
-        payment_churn = df.groupby(['creditcd', 'churn_status']).size().reset_index(name='count')
-        
-        fig = px.sunburst(
-            payment_churn,
-            path=['creditcd', 'churn_status'],
-            values='count',
-            title="Churn by Payment Method (Sunburst Chart)",
-            color='churn_status',
-            color_discrete_sequence=COLOR_THEME,
-            hover_data=['count']
-        )
-        fig.update_traces(textinfo="label+percent parent")
-        st.plotly_chart(fig, use_container_width=True)
+def tenure_churn(df):
+    """Return customers per tenure (months) and churn value."""
+    return df.groupby(['months', 'churn'], observed=True).size().reset_index(name='count')
+
+
+def payment_churn(df):
+    """Return customers per payment method and churn status."""
+    table = df.groupby(['creditcd', 'churn'], observed=True).size().reset_index(name='count')
+    table['churn_status'] = table.pop('churn').map(CHURN_LABELS)
+    return table[['creditcd', 'churn_status', 'count']]
+
+
+def arpu_churn(df, bins=ARPU_BINS):
+    """Return customers per ARPU bin (rows, equal-width as `pd.cut`) and churn status (columns)."""
+    if 'rev_Mean' not in df.columns or 'churn' not in df.columns:
+        raise ValueError("Required columns ('rev_Mean' or 'churn') not found in the dataset.")
+    # Only the bin codes are computed per row; the interval labels are formatted once per bin
+    arpu_bin = pd.cut(df['rev_Mean'], bins=bins)
+    table = df['churn'].groupby([arpu_bin, df['churn']], observed=True).size().unstack(fill_value=0)
+    table.index = table.index.astype(str).rename('ARPU_bin')
+    table.columns = table.columns.map(CHURN_LABELS).rename('churn_status')
+    return table
 
+
+# Summary table behind each analysis
+INSIGHT_SUMMARIES = {
+    "Overall Churn Rate": churn_counts,
+    "Churn Rate by Tenure": tenure_churn,
+    "Churn by Payment Method": payment_churn,
+    "ARPU: Churned vs Retained": arpu_churn,
+}
+
+
+# Summaries are computed once per analysis and dataset version and shared by all sessions
+@st.cache_resource(max_entries=16)
+def load_insight_summary(analysis, version, _df):
+    return INSIGHT_SUMMARIES[analysis](_df)
+
+
+def key_insights_and_analysis(df, version):
+    """Display key insights and analysis from cached summaries of the data at `version`."""
+    try:
+        st.header("📊 Key Insights and Analysis")
         st.markdown(
             """
-            **Insights:**
-            - Customers using electronic checks have a higher churn rate compared to other payment methods.
-            - Credit card users are more likely to be retained, indicating a preference for convenience.
-            - Consider incentivizing customers to switch to more stable payment methods.
+            Dive into customer churn data and uncover actionable insights using advanced analytics and visualizations.
             """
         )
 
-    elif analysis_option == "ARPU: Churned vs Retained":
-        if 'rev_Mean' in df.columns and 'churn' in df.columns:
-            df['churn_status'] = df['churn'].map({0: 'Retained', 1: 'Churned'})
-            df['ARPU_bin'] = pd.cut(df['rev_Mean'], bins=20)
-            df['ARPU_bin'] = df['ARPU_bin'].astype(str)
-            arpu_churn = df.groupby(['ARPU_bin', 'churn_status']).size().unstack().fillna(0)
+        analysis_option = st.selectbox("Choose an Analysis", list(INSIGHT_SUMMARIES))
+        summary = load_insight_summary(analysis_option, version, df)
+
+        if analysis_option == "Overall Churn Rate":
+            churn_rate = (summary['churn'] * summary['count']).sum() / summary['count'].sum() * 100
+            st.metric(label="Overall Churn Rate", value=f"{churn_rate:.2f}%")
+
+            fig = px.pie(summary, names='churn', values='count', title="Overall Churn Rate",
+                         color_discrete_sequence=COLOR_THEME,
+                         hole=0.4)
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.markdown(
+                """
+                **Insights:**
+                - The overall churn rate provides a high-level view of customer attrition.
+                - A higher churn rate indicates a need for immediate retention strategies.
+                - Compare this rate with industry benchmarks to assess performance.
+                """
+            )
 
-            if 'Churned' in arpu_churn.columns:
+        elif analysis_option == "Churn Rate by Tenure":
+            # Sum the per-month counts, so the histogram bins the summary instead of every customer
+            fig = px.histogram(summary, x='months', y='count', color='churn', histfunc='sum',
+                               barmode='group', title="Churn Rate by Tenure",
+                               labels={'months': 'Tenure (Months)', 'churn': 'Churn', 'count': 'Customers'},
+                               color_discrete_sequence=COLOR_THEME)
+            fig.update_layout(yaxis_title="Customers")
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.markdown(
+                """
+                **Insights:**
+                - Customers with shorter tenures are more likely to churn.
+                - Long-term customers tend to have lower churn rates, indicating loyalty.
+                - Focus retention efforts on customers in the 0-12 month tenure range.
+                """
+            )
+
+        elif analysis_option == "Churn by Payment Method":
+            # Advanced Visualization: Sunburst Chart
+            fig = px.sunburst(
+                summary,
+                path=['creditcd', 'churn_status'],  # Hierarchy: Payment Method -> Churn Status
+                values='count',  # Size of each segment
+                title="Churn by Payment Method (Sunburst Chart)",
+                color='churn_status',  # Color by churn status
+                color_discrete_sequence=COLOR_THEME,
+                hover_data=['count']  # Show count on hover
+            )
+            fig.update_traces(textinfo="label+percent parent")  # Add labels and percentages
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.markdown(
+                """
+                **Insights:**
+                - Customers using electronic checks have a higher churn rate compared to other payment methods.
+                - Credit card users are more likely to be retained, indicating a preference for convenience.
+                - Consider incentivizing customers to switch to more stable payment methods.
+                """
+            )
+
+        elif analysis_option == "ARPU: Churned vs Retained":
+            if 'Churned' in summary.columns:
+                # Create line chart
                 fig = px.line(
-                    arpu_churn,
-                    x=arpu_churn.index,
-                    y=arpu_churn.columns,
+                    summary,
+                    x=summary.index,  # ARPU bins on x-axis
+                    y=summary.columns,  # Churn status on y-axis
                     title="ARPU: Churned vs Retained (Line Chart)",
                     labels={'value': 'Number of Customers', 'index': 'ARPU Bin', 'variable': 'Churn Status'},
                     color_discrete_sequence=COLOR_THEME
                 )
+
+                # Optional: Add markers to the lines for better visibility
                 fig.update_traces(mode='lines+markers')
+
+                # Update layout
                 fig.update_layout(
                     xaxis_title="ARPU Bin",
                     yaxis_title="Number of Customers",
@@ -106,8 +152,10 @@ def key_insights_and_analysis(df):
                     template="plotly_white",
                     hovermode="x"
                 )
-                max_churn_bin = arpu_churn['Churned'].idxmax()
-                max_churn_value = arpu_churn['Churned'].max()
+
+                # Add annotation to highlight the ARPU bin with the highest churn rate
+                max_churn_bin = summary['Churned'].idxmax()
+                max_churn_value = summary['Churned'].max()
                 fig.add_annotation(
                     x=max_churn_bin,
                     y=max_churn_value,
@@ -117,6 +165,8 @@ def key_insights_and_analysis(df):
                     ax=0,
                     ay=-40
                 )
+
+                # Display the chart in Streamlit
                 st.plotly_chart(fig, use_container_width=True)
 
                 st.markdown(
@@ -129,5 +179,8 @@ def key_insights_and_analysis(df):
                 )
             else:
                 st.warning("No churned customers found in the dataset for ARPU analysis.")
-        else:
-            st.error("Required columns ('rev_Mean' or 'churn') not found in the dataset.")
\ No newline at end of file
+    except ValueError as e:
+        st.error(str(e))
+    except Exception as e:
+        st.error(f"An error occurred in the key insights and analysis section: {e}")
+        logger.error(f"Error in key insights and analysis section: {e}")
@@ -0,0 +1,195 @@
+"""Lightweight timers, latency histograms and counters for the app's hot paths.
+
+    from app.instrumentation import timed, timer
+
+    @timed("load_csv")
+    def load_csv(): ...
+
+    with timer("dashboard.filter"):
+        ...
+
+Spans are recorded into one process-wide registry, shared by every page and session, and
+exported as Prometheus text (`prometheus()`, served on /metrics by `app.serve`) or JSON
+(`snapshot()`, `write_json()`). Set CHURN_INSTRUMENTATION=0 to turn recording off; a disabled
+timer costs one flag check.
+"""
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+METRICS_PREFIX = "churn_app"
+METRICS_PATH = "artifacts/metrics.json"
+
+
+class Histogram:
+    """Cumulative-style latency histogram with a count and sum, as in Prometheus."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate the `q` quantile as the upper bound of the bucket that reaches it."""
+        if not self.count:
+            return float("nan")
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.registry.increment(f"{self.name}.errors")
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Registry:
+    """Thread-safe store of per-span histograms and named counters."""
+
+    def __init__(self, enabled=True, buckets=BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timer(self, name):
+        """Context manager recording the duration of its block under `name`."""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def timed(self, name=None):
+        """Decorator recording each call's duration under `name` (the function name by default)."""
+        def decorator(func):
+            span = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, span):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Return every span's count, sum, mean, p50/p90/p99 and max in seconds, plus the counters."""
+        with self._lock:
+            spans = {
+                name: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "mean": h.sum / h.count if h.count else float("nan"),
+                    "p50": h.quantile(0.5),
+                    "p90": h.quantile(0.9),
+                    "p99": h.quantile(0.99),
+                    "max": h.max,
+                    "buckets": {_bound(b): c for b, c in zip(h.buckets, h.counts)},
+                }
+                for name, h in sorted(self.histograms.items())
+            }
+            return {"started": self.started, "spans": spans, "counters": dict(sorted(self.counters.items()))}
+
+    def prometheus(self, prefix=METRICS_PREFIX):
+        """Render the histograms and counters in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_span_seconds Duration of instrumented spans.",
+            f"# TYPE {prefix}_span_seconds histogram",
+        ]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{_bound(bound)}"}} {cumulative}')
+                lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {h.sum}')
+                lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {h.count}')
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path=METRICS_PATH):
+        """Write `snapshot()` to `path`, replacing it atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+
+def _bound(bound):
+    return "+Inf" if math.isinf(bound) else repr(bound)
+
+
+# The process-wide registry and shortcuts to it
+REGISTRY = Registry(enabled=os.environ.get("CHURN_INSTRUMENTATION", "1") != "0")
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+increment = REGISTRY.increment
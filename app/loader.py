@@ -1,10 +1,11 @@
 import streamlit as st
-import pandas as pd
-import pickle
 import plotly.express as px
 import plotly.graph_objects as go
 from streamlit_extras.metric_cards import style_metric_cards
 import logging
+from app.data_store import load_shared
+from app.instrumentation import timed
+from app.model_bundle import load_ensemble
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -13,30 +14,31 @@ logger = logging.getLogger(__name__)
 # Custom color theme for eye-catching visuals
 COLOR_THEME = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
 
-# Load the model
-@st.cache_data
+# Load the model bundle once per process; its members load lazily on first prediction
+@st.cache_resource
+@timed("load_model")
 def load_model():
    
     try:
-        with open('voting_regressor_model.pkl', 'rb') as f:
-            model = pickle.load(f)
+        model = load_ensemble()
         logger.info("Model loaded successfully.")
         return model
-    except FileNotFoundError:
-        st.error("Model file 'voting_regressor_model.pkl' not found. Please ensure it exists in the correct directory.")
-        logger.error("Model file not found.")
+    except FileNotFoundError as e:
+        st.error(f"Model not found: {e}")
+        logger.error(f"Model not found: {e}")
         return None
     except Exception as e:
         st.error(f"An error occurred while loading the model: {e}")
         logger.error(f"Error loading model: {e}")
         return None
 
-# Load the CSV file
-@st.cache_data
-def load_csv():
+# Load the CSV file (shared across sessions through the memory-mapped store)
+@st.cache_resource
+@timed("load_csv")
+def load_csv(columns=None):
 
     try:
-        df = pd.read_csv(r"C:\Users\Kunal\OneDrive\Desktop\Telecom-Customer-Churn-Prediction\data\Telecom_customer churn.csv")
+        df = load_shared(columns)
         logger.info("CSV file loaded successfully.")
         return df
     except FileNotFoundError:
@@ -0,0 +1,264 @@
+"""Versioned model bundle for the churn ensemble.
+
+    python -m app.model_bundle --model voting_regressor_model.pkl --output models/voting_regressor
+
+A bundle is a directory holding each ensemble member in its native format (CatBoost `.cbm`,
+LightGBM text model; the sklearn GradientBoosting member has no native format and is stored as
+its node arrays in `.npz`) plus a `manifest.json` with the feature schema and voting weights, and
+optionally the fitted input pipeline from `app.training` as JSON. Members are loaded on first use,
+so opening a bundle imports none of the model libraries.
+
+Nothing is unpickled unless pickles are allowed explicitly (`--allow-pickle`, or
+`CHURN_ALLOW_PICKLE=1` for the app): members with no native format, which are pickled into the
+bundle, and the pickled `voting_regressor_model.pkl` when no bundle was exported, are refused otherwise.
+"""
+import argparse
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.inference import FEATURE_COLUMNS, MODEL_PATH, ensemble_members, load_model_file
+from app.feature_schema import FeatureSchema
+from app.preprocessing import INPUT_TRANSFORM_PATH, InputTransform, load_input_pipeline
+from app.tree_compiler import GradientBoostingArrays
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+BUNDLE_PATH = "models/voting_regressor"
+MANIFEST_NAME = "manifest.json"
+
+# Bumped whenever the manifest layout changes
+BUNDLE_FORMAT_VERSION = 3
+
+# Unpickling runs arbitrary code, so it is opt-in; CHURN_ALLOW_PICKLE=1 allows it for the app
+ALLOW_PICKLE = os.environ.get("CHURN_ALLOW_PICKLE", "0") == "1"
+
+
+def _save_catboost(est, path):
+    est.save_model(path, format="cbm")
+
+
+def _load_catboost(path):
+    from catboost import CatBoostRegressor
+
+    return CatBoostRegressor().load_model(path, format="cbm")
+
+
+def _save_lightgbm(est, path):
+    est.booster_.save_model(path)
+
+
+def _load_lightgbm(path):
+    import lightgbm
+
+    return lightgbm.Booster(model_file=path)
+
+
+def _save_npz(est, path):
+    GradientBoostingArrays.from_estimator(est).save(path)
+
+
+def _load_npz(path):
+    return GradientBoostingArrays.load(path)
+
+
+def _save_pickle(est, path):
+    with open(path, "wb") as f:
+        pickle.dump(est, f)
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+# Member class name -> (format, file extension)
+_MEMBER_FORMATS = {
+    "CatBoostRegressor": ("cbm", ".cbm"),
+    "LGBMRegressor": ("lightgbm", ".txt"),
+    "GradientBoostingRegressor": ("npz", ".npz"),
+}
+_SAVERS = {"cbm": _save_catboost, "lightgbm": _save_lightgbm, "npz": _save_npz, "pickle": _save_pickle}
+_LOADERS = {"cbm": _load_catboost, "lightgbm": _load_lightgbm, "npz": _load_npz, "pickle": _load_pickle}
+
+
+def check_pickle(path, allow_pickle):
+    """Refuse to read or write the pickle at `path` unless pickles were allowed explicitly."""
+    if not allow_pickle:
+        raise ValueError(
+            f"{path} is a pickle; allow pickles explicitly (--allow-pickle, or CHURN_ALLOW_PICKLE=1 for the app) "
+            "only if you trust it, or re-export the model bundle."
+        )
+    logger.warning(f"Using pickle {path}; unpickling runs arbitrary code, so only allow it for trusted files.")
+
+
+def export_bundle(model, output_path=BUNDLE_PATH, features=FEATURE_COLUMNS, model_version=1, input_pipeline=None,
+                  allow_pickle=False):
+    """Write every member of a fitted VotingRegressor, and its input pipeline if given, into a bundle directory.
+
+    The schema comes from the input pipeline when there is one, otherwise from `features`. Members
+    with no native format are pickled only with `allow_pickle`.
+    """
+    schema = FeatureSchema.from_input_pipeline(input_pipeline) if input_pipeline is not None else FeatureSchema(features)
+    os.makedirs(output_path, exist_ok=True)
+    ensemble = ensemble_members(model)
+    members = []
+    for name in ensemble.names:
+        est = ensemble.member(name)
+        schema.check_model(est, name)
+        fmt, extension = _MEMBER_FORMATS.get(type(est).__name__, ("pickle", ".pkl"))
+        filename = f"{name}{extension}"
+        if fmt == "pickle":
+            check_pickle(filename, allow_pickle)
+        _SAVERS[fmt](est, os.path.join(output_path, filename))
+        members.append({"name": name, "format": fmt, "file": filename, "class": type(est).__name__})
+
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "model_version": model_version,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "schema": schema.to_dict(),
+        "weights": ensemble.weights,
+        "members": members,
+        "input_pipeline": None,
+    }
+    if input_pipeline is not None:
+        InputTransform.from_pipeline(input_pipeline).save(os.path.join(output_path, INPUT_TRANSFORM_PATH))
+        manifest["input_pipeline"] = INPUT_TRANSFORM_PATH
+    with open(os.path.join(output_path, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"Model bundle v{model_version} written to {output_path}.")
+    return output_path
+
+
+class ModelBundle:
+    """An exported ensemble whose members load lazily on first use.
+
+    Pickled members, exported for classes with no native format, load only with `allow_pickle`.
+    """
+
+    def __init__(self, path=BUNDLE_PATH, allow_pickle=ALLOW_PICKLE):
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+        if self.manifest["format_version"] != BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Model bundle format {self.manifest['format_version']} is not supported "
+                f"(expected {BUNDLE_FORMAT_VERSION}); re-export the bundle."
+            )
+        self.path = path
+        self.allow_pickle = allow_pickle
+        self.version = self.manifest["model_version"]
+        self.schema = FeatureSchema.from_dict(self.manifest["schema"])
+        self.features = self.schema.names
+        self.weights = self.manifest["weights"]
+        self.names = [member["name"] for member in self.manifest["members"]]
+        self.load_times = {}
+        self._specs = {member["name"]: member for member in self.manifest["members"]}
+        self._members = {}
+        self._input_pipeline = None
+        self._lock = threading.Lock()
+
+    def member(self, name):
+        """Return a member, loading it from disk on first access."""
+        if name not in self._members:
+            with self._lock:
+                if name not in self._members:
+                    spec = self._specs[name]
+                    if spec["format"] == "pickle":
+                        check_pickle(os.path.join(self.path, spec["file"]), self.allow_pickle)
+                    start = time.perf_counter()
+                    est = _LOADERS[spec["format"]](os.path.join(self.path, spec["file"]))
+                    self.load_times[name] = time.perf_counter() - start
+                    # Fail here, once, rather than on every predict with a misshapen input
+                    self.schema.check_model(est, name)
+                    self._members[name] = est
+                    logger.info(f"Loaded {name} ({spec['format']}) in {self.load_times[name] * 1e3:.1f} ms.")
+        return self._members[name]
+
+    def input_pipeline(self):
+        """Return the fitted input pipeline exported with the model, or None if there is none; loaded once."""
+        filename = self.manifest.get("input_pipeline")
+        if not filename:
+            return None
+        if self._input_pipeline is None:
+            with self._lock:
+                if self._input_pipeline is None:
+                    self._input_pipeline = InputTransform.load(os.path.join(self.path, filename))
+        return self._input_pipeline
+
+    def predict(self, features):
+        """Return the weighted ensemble prediction for `features`."""
+        predictions = np.column_stack([self.member(name).predict(features) for name in self.names])
+        return np.average(predictions, axis=1, weights=self.weights)
+
+
+def model_version(model):
+    """Identify a loaded model, so caches of its predictions are not reused for another one."""
+    if isinstance(model, ModelBundle):
+        return f"{model.path}@v{model.version}:{model.manifest.get('created')}"
+    # A pickled model carries no version; each loaded object is its own
+    return f"{type(model).__name__}@{id(model):x}"
+
+
+def read_schema(bundle_path=BUNDLE_PATH):
+    """Return the feature schema in a bundle's manifest without loading any member, or None if there is no bundle."""
+    path = os.path.join(bundle_path, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return FeatureSchema.from_dict(json.load(f)["schema"])
+
+
+def load_ensemble(bundle_path=BUNDLE_PATH, pickle_path=MODEL_PATH, allow_pickle=ALLOW_PICKLE):
+    """Open the model bundle; the pickled VotingRegressor is loaded instead only with `allow_pickle`."""
+    if os.path.exists(os.path.join(bundle_path, MANIFEST_NAME)):
+        return ModelBundle(bundle_path, allow_pickle)
+    if not allow_pickle:
+        raise FileNotFoundError(
+            f"No model bundle at {bundle_path}. Export one with `python -m app.model_bundle --allow-pickle`, "
+            f"or set CHURN_ALLOW_PICKLE=1 to load {pickle_path} directly."
+        )
+    logger.warning(f"No model bundle at {bundle_path}; unpickling {pickle_path} instead.")
+    return load_model_file(pickle_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH, help="Pickled VotingRegressor to export")
+    parser.add_argument("--output", default=BUNDLE_PATH, help="Bundle directory to write")
+    parser.add_argument("--model-version", type=int, default=1)
+    parser.add_argument("--preprocessor", default=None, help="Fitted input pipeline pickled by app.training to ship with the model")
+    parser.add_argument("--check-rows", type=int, default=1_000, help="Random rows compared against the pickled model")
+    parser.add_argument("--allow-pickle", action="store_true", help="Trust and unpickle --model and --preprocessor")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    check_pickle(args.model, args.allow_pickle)
+    model = load_model_file(args.model)
+    input_pipeline = None
+    if args.preprocessor:
+        # The fitted pipeline, as app.training pickles it; the bundle stores it as JSON
+        check_pickle(args.preprocessor, args.allow_pickle)
+        input_pipeline = load_input_pipeline(args.preprocessor)
+    export_bundle(model, args.output, model_version=args.model_version, input_pipeline=input_pipeline,
+                  allow_pickle=args.allow_pickle)
+
+    bundle = ModelBundle(args.output, allow_pickle=args.allow_pickle)
+    for name in bundle.names:
+        bundle.member(name)
+        print(f"{name:<20} loaded in {bundle.load_times[name] * 1e3:8.1f} ms")
+    if args.check_rows:
+        features = np.random.default_rng(0).normal(size=(args.check_rows, len(bundle.features)))
+        error = np.abs(bundle.predict(features) - model.predict(features)).max()
+        print(f"Max absolute difference from the pickled model over {args.check_rows} rows: {error:.3g}")
+
+
+if __name__ == "__main__":
+    main()
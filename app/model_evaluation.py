@@ -1,31 +1,29 @@
+import logging
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-def model_evaluation_metrics():
-    """Display model evaluation metrics."""
-    st.header("📊 Model Evaluation Metrics")
-    st.markdown(
-        """
-        Evaluate the performance of the machine learning model using key metrics and visualizations.
-        """
-    )
+from app.figure_cache import FigureCache
 
-    rmse = 0.49174695355193226
-    mae = 0.48607733765642713
-    r2 = 0.03183860198932953
+# Set up logging
+logger = logging.getLogger(__name__)
 
-    col1, col2, col3 = st.columns(3)
-    col1.metric(label="RMSE", value=f"{rmse:.2f}")
-    col2.metric(label="MAE", value=f"{mae:.2f}")
-    col3.metric(label="R²", value=f"{r2:.2f}")
+# Final performance metrics of the ensemble
+MODEL_METRICS = {
+    "RMSE": 0.49174695355193226,
+    "MAE": 0.48607733765642713,
+    "R²": 0.03183860198932953,
+}
 
+
+def model_metrics_figure(metrics=MODEL_METRICS):
+    """Build the model performance bar chart."""
     metrics_data = pd.DataFrame({
-        "Metric": ["RMSE", "MAE", "R²"],
-        "Value": [rmse, mae, r2]
+        "Metric": list(metrics),
+        "Value": list(metrics.values())
     })
 
-    st.subheader("Model Performance Metrics")
     fig = px.bar(
         metrics_data,
         x="Metric",
@@ -60,13 +58,40 @@ def model_evaluation_metrics():
         plot_bgcolor='white',
         margin=dict(l=50, r=50, t=100, b=50)
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+def model_evaluation_metrics(figures=None):
+    """Display model evaluation metrics, taking the chart from `figures` (a FigureCache) when given."""
+    try:
+        st.header("📊 Model Evaluation Metrics")
+        st.markdown(
+            """
+            Evaluate the performance of the machine learning model using key metrics and visualizations.
+            """
+        )
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric(label="RMSE", value=f"{MODEL_METRICS['RMSE']:.2f}")
+        col2.metric(label="MAE", value=f"{MODEL_METRICS['MAE']:.2f}")
+        col3.metric(label="R²", value=f"{MODEL_METRICS['R²']:.2f}")
+
+        st.subheader("Model Performance Metrics")
+        # The metrics are constants, so the chart is built once and served from the cache afterwards
+        if figures is not None:
+            fig = figures.figure(FigureCache.key("model_metrics", None, None), model_metrics_figure)
+        else:
+            fig = model_metrics_figure()
+        st.plotly_chart(fig, use_container_width=True)
 
-    st.markdown(
-        """
-        **Insights:**
-        - **RMSE (Root Mean Squared Error):** Measures the average deviation of predictions from actual values. Lower values indicate better performance.
-        - **MAE (Mean Absolute Error):** Represents the average absolute difference between predicted and actual values. It provides a clear understanding of prediction errors.
-        - **R² (R-squared):** Indicates the proportion of variance in the target variable explained by the model. A higher R² value suggests a better fit.
-        """
-    )
\ No newline at end of file
+        st.markdown(
+            """
+            **Insights:**
+            - **RMSE (Root Mean Squared Error):** Measures the average deviation of predictions from actual values. Lower values indicate better performance.
+            - **MAE (Mean Absolute Error):** Represents the average absolute difference between predicted and actual values. It provides a clear understanding of prediction errors.
+            - **R² (R-squared):** Indicates the proportion of variance in the target variable explained by the model. A higher R² value suggests a better fit.
+            """
+        )
+    except Exception as e:
+        st.error(f"An error occurred in the model evaluation metrics section: {e}")
+        logger.error(f"Error in model evaluation metrics section: {e}")
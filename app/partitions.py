@@ -0,0 +1,193 @@
+"""Append-only customer partitions with incrementally maintained aggregates.
+
+    python -m app.partitions add daily_extract.csv
+    python -m app.partitions refresh
+
+Each extract (CSV or Parquet) is a partition file in `data/partitions/`; the base churn CSV is
+the first partition, so the aggregates always cover it plus every extract. The business metrics
+and Dashboard cubes are kept per partition, fingerprinted by file size and modification time,
+and saved between runs. A refresh re-ingests only partitions whose fingerprint is new or
+changed, drops removed ones, and recombines the small per-partition aggregates, so its cost
+grows with the delta rather than the whole history. The dataset version, a hash of every
+fingerprint, keys the caches that depend on the aggregates.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app.aggregate_cube import COMPLAINTS_DIMENSIONS, CUBE_DIMENSIONS, AggregateCube
+from app.data_store import CSV_PATH, iter_chunks
+from app.streaming import BUSINESS_MEASURES, BUSINESS_SEGMENTS, DEFAULT_BATCH_SIZE, CubeBuilder, RunningStats, stream
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+PARTITIONS_DIR = "data/partitions"
+STATE_PATH = os.path.join(PARTITIONS_DIR, ".aggregates.pkl")
+PARTITION_EXTENSIONS = (".csv", ".parquet")
+# Name the base file is tracked under; never a partition file name, which has an extension
+BASE_PARTITION = "<base>"
+# Bumped whenever the saved per-partition aggregates change layout; older state is re-ingested
+STATE_FORMAT = 2
+
+
+def partition_files(directory=PARTITIONS_DIR):
+    """Return the partition file names in `directory`, in name order."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.endswith(PARTITION_EXTENSIONS))
+
+
+def read_partitions(columns=None, directory=PARTITIONS_DIR):
+    """Return the rows of every partition file in `directory` as one frame, or None if there are none."""
+    frames = [
+        chunk
+        for name in partition_files(directory)
+        for chunk in iter_chunks(os.path.join(directory, name), columns=columns)
+    ]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def fingerprint(path):
+    """Cheap change detector for a partition file: its size and modification time."""
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def dataset_version(fingerprints):
+    """Hash a {partition: fingerprint} mapping into one version string."""
+    digest = hashlib.sha1()
+    for name in sorted(fingerprints):
+        digest.update(f"{name}:{fingerprints[name]}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def _ingest(path, batch_size):
+    """Aggregate one partition file into its per-segment business metric stats and Dashboard cubes."""
+    stats = RunningStats(BUSINESS_MEASURES, by=BUSINESS_SEGMENTS)
+    cube, complaints_cube = CubeBuilder(CUBE_DIMENSIONS), CubeBuilder(COMPLAINTS_DIMENSIONS)
+    aggregates = [stats, cube, complaints_cube]
+    columns = list(dict.fromkeys(column for aggregate in aggregates for column in aggregate.columns))
+    run = stream(path, aggregates, columns=columns, batch_size=batch_size)
+    return {"stats": stats, "cube": cube.cube, "complaints_cube": complaints_cube.cube, "rows": run["rows"]}
+
+
+class PartitionedAggregates:
+    """Business metrics and Dashboard cubes over the base file and a directory of append-only partitions."""
+
+    def __init__(self, directory=PARTITIONS_DIR, state_path=None, batch_size=DEFAULT_BATCH_SIZE, base_path=CSV_PATH):
+        self.directory = directory
+        self.base_path = base_path
+        self.state_path = state_path or os.path.join(directory, os.path.basename(STATE_PATH))
+        self.batch_size = batch_size
+        self.partials = {}
+        self.version = None
+        self._combined = None
+        self._lock = threading.Lock()
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("format") == STATE_FORMAT:
+                self.partials = state["partials"]
+                self.version = dataset_version({name: p["fingerprint"] for name, p in self.partials.items()})
+            else:
+                logger.info(f"Saved aggregates in {self.state_path} have an older format; every partition will be re-ingested.")
+
+    def sources(self):
+        """Return {partition name: path} for the base file, when it exists, and every partition file."""
+        paths = {BASE_PARTITION: self.base_path} if self.base_path and os.path.exists(self.base_path) else {}
+        paths.update((name, os.path.join(self.directory, name)) for name in partition_files(self.directory))
+        return paths
+
+    def refresh(self):
+        """Re-ingest new or changed partitions and drop removed ones; return what changed."""
+        with self._lock:
+            start = time.perf_counter()
+            paths = self.sources()
+            current = {name: fingerprint(path) for name, path in paths.items()}
+            changed = [name for name in current if self.partials.get(name, {}).get("fingerprint") != current[name]]
+            removed = [name for name in self.partials if name not in current]
+
+            for name in changed:
+                partial = _ingest(paths[name], self.batch_size)
+                partial["fingerprint"] = current[name]
+                self.partials[name] = partial
+                logger.info(f"Ingested partition {name} ({partial['rows']} rows).")
+            for name in removed:
+                del self.partials[name]
+                logger.info(f"Dropped removed partition {name}.")
+
+            if changed or removed:
+                self._combined = None
+                tmp_path = self.state_path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump({"format": STATE_FORMAT, "partials": self.partials}, f)
+                os.replace(tmp_path, self.state_path)
+            self.version = dataset_version(current)
+            return {
+                "version": self.version,
+                "changed": changed,
+                "removed": removed,
+                "partitions": len(current),
+                "seconds": time.perf_counter() - start,
+            }
+
+    def combined(self):
+        """Return the per-segment business metric stats, main cube and customer care cube over the base and every partition."""
+        with self._lock:
+            if self._combined is None:
+                if not self.partials:
+                    raise ValueError(f"No partitions have been ingested from {self.directory}.")
+                partials = [self.partials[name] for name in sorted(self.partials)]
+                stats = RunningStats(BUSINESS_MEASURES, by=BUSINESS_SEGMENTS)
+                for partial in partials:
+                    stats.merge(partial["stats"])
+                # One concat and groupby over every partition's cells, rather than regrouping the growing merged cube per partition
+                cube = AggregateCube.combine(partial["cube"] for partial in partials)
+                complaints_cube = AggregateCube.combine(partial["complaints_cube"] for partial in partials)
+                self._combined = (stats, cube, complaints_cube)
+            return self._combined
+
+
+def add_partition(path, directory=PARTITIONS_DIR):
+    """Copy an extract into the partition directory under a new, timestamped name."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    name = f"{stamp}_{os.path.basename(path)}"
+    shutil.copyfile(path, os.path.join(directory, name))
+    return name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["add", "refresh"])
+    parser.add_argument("path", nargs="?", help="Extract to append (for add)")
+    parser.add_argument("--directory", default=PARTITIONS_DIR)
+    parser.add_argument("--base", default=CSV_PATH, help="Base churn file aggregated with the partitions")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per chunk when ingesting")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "add":
+        if not args.path:
+            parser.error("add needs the path of the extract to append")
+        print(f"Added partition {add_partition(args.path, args.directory)}")
+
+    aggregates = PartitionedAggregates(args.directory, batch_size=args.batch_size, base_path=args.base)
+    result = aggregates.refresh()
+    print(
+        f"Dataset version {result['version']}: {len(result['changed'])} partitions ingested, "
+        f"{len(result['removed'])} removed, {result['partitions']} total, in {result['seconds']:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAXSIZE = 4096
+
+
+class PredictionCache:
+    """Thread-safe bounded LRU of churn probabilities keyed on the model version and input vector."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, model_version=None):
+        self.maxsize = maxsize
+        self.model_version = model_version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, features):
+        """Turn a one-row feature array, already in model order, into a hashable key under this cache's model version."""
+        return (self.model_version, tuple(np.asarray(features).ravel().tolist()))
+
+    def get_or_compute(self, key, compute):
+        """Return the cached probability for `key`, calling `compute()` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Predict outside the lock so other sessions are not blocked on the ensemble
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        """Return the hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model_version": self.model_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drop every entry, e.g. after the model is replaced."""
+        with self._lock:
+            self._entries.clear()
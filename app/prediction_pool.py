@@ -0,0 +1,156 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.inference import MODEL_PATH
+from app.model_bundle import BUNDLE_PATH, load_ensemble
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Worker processes used when none are requested: leave a core for the Streamlit server
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# The model loaded once in each worker process
+_worker_model = None
+
+
+def _init_worker(bundle_path, pickle_path):
+    global _worker_model
+    _worker_model = load_ensemble(bundle_path, pickle_path)
+    # Pull every bundle member in now, so the first prediction does not pay for the load
+    for name in getattr(_worker_model, "names", []):
+        _worker_model.member(name)
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def _predict_in_worker(features):
+    """Predict in a worker, returning the predictions and the seconds spent on them."""
+    start = time.perf_counter()
+    predictions = _worker_model.predict(features)
+    return predictions, time.perf_counter() - start
+
+
+class PredictionPool:
+    """Worker processes preloaded with the ensemble, shared by every page session.
+
+    Pages submit feature rows and wait on the returned futures. Predictions run across cores
+    in the workers, so concurrent sessions no longer queue behind one another on the GIL.
+    A worker that dies (killed for memory, say) breaks the whole executor; the pool then starts
+    a new one, so later predictions do not fail until the app restarts.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, bundle_path=BUNDLE_PATH, pickle_path=MODEL_PATH):
+        self.workers = workers
+        self.bundle_path = bundle_path
+        self.pickle_path = pickle_path
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.started = time.perf_counter()
+        self._executor = self._start()
+        logger.info(f"Prediction pool ready with {workers} workers.")
+
+    def _start(self):
+        # Spawn rather than fork: forking the multithreaded Streamlit server can deadlock the children
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_worker, initargs=(self.bundle_path, self.pickle_path))
+        # Start every worker now, so model loading happens before the first user interaction.
+        # A worker that cannot load the model breaks the pool; raise here so callers can fall back.
+        try:
+            for future in [executor.submit(_warm_up) for _ in range(self.workers)]:
+                future.result()
+        except Exception:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return executor
+
+    def _restart(self, broken):
+        """Replace the executor `broken`, unless another session has replaced it already."""
+        with self._restart_lock:
+            if self._executor is not broken:
+                return
+            logger.error("A prediction worker died and broke the pool; starting new workers.")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._start()
+            with self._lock:
+                self.restarts += 1
+
+    def _submit_to_executor(self, features):
+        executor = self._executor
+        try:
+            return executor.submit(_predict_in_worker, features)
+        except BrokenProcessPool:
+            self._restart(executor)
+            return self._executor.submit(_predict_in_worker, features)
+
+    def submit(self, features):
+        """Queue a prediction and return a future of the predictions array."""
+        submitted_at = time.perf_counter()
+        worker_future = self._submit_to_executor(features)
+        with self._lock:
+            self.in_flight += 1
+            self.submitted += 1
+        # Hand back a future of the predictions alone; the busy time goes into the counters
+        result_future = Future()
+        result_future.set_running_or_notify_cancel()
+
+        def finished(future):
+            with self._lock:
+                self.in_flight -= 1
+                self.wait_seconds += time.perf_counter() - submitted_at
+                if future.exception() is not None:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                    self.busy_seconds += future.result()[1]
+            if future.exception() is not None:
+                result_future.set_exception(future.exception())
+            else:
+                result_future.set_result(future.result()[0])
+
+        worker_future.add_done_callback(finished)
+        return result_future
+
+    def predict(self, features, timeout=None):
+        """Submit a prediction and wait for it; retried once on new workers if the pool broke meanwhile."""
+        executor = self._executor
+        try:
+            return self.submit(features).result(timeout)
+        except BrokenProcessPool:
+            self._restart(executor)
+            return self.submit(features).result(timeout)
+
+    def stats(self):
+        """Return queue depth, worker utilization and request counters."""
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            done = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "restarts": self.restarts,
+                "utilization": self.busy_seconds / (self.workers * elapsed) if elapsed else 0.0,
+                "mean_latency_ms": self.wait_seconds / done * 1e3 if done else 0.0,
+                "mean_predict_ms": self.busy_seconds / self.completed * 1e3 if self.completed else 0.0,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,176 @@
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+PREPROCESSOR_PATH = "input_pipeline.pkl"
+# The same pipeline as plain JSON, shipped in model bundles instead of the pickle
+INPUT_TRANSFORM_PATH = "input_pipeline.json"
+
+
+class Preprocessor(TransformerMixin, BaseEstimator):
+    """Fitted encoding and imputation of the raw telecom customer columns.
+
+    Text columns map to the codes `LabelEncoder` gives them in the notebook (sorted category
+    order), with one extra code for values unseen at fit time or missing. Numeric columns are
+    imputed from the training means in a single `fillna` with the whole mean vector. Output
+    columns keep the fitted order, so the transform is identical in training and scoring.
+    """
+
+    def fit(self, X, y=None):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        text = X.select_dtypes(include=['object', 'string']).columns
+        self.categories_ = {column: pd.Index(np.unique(X[column].dropna().astype(str))) for column in text}
+        self.means_ = X.drop(columns=text).mean()
+        return self
+
+    def transform(self, X):
+        """Return the encoded and imputed columns as a float64 frame in fitted order."""
+        missing = [column for column in self.feature_names_in_ if column not in X.columns]
+        if missing:
+            raise ValueError(f"Input is missing columns the preprocessor was fitted on: {missing}")
+        names = pd.Index(self.feature_names_in_)
+        out = np.empty((len(X), self.n_features_in_), dtype=np.float64)
+        out[:, names.get_indexer(self.means_.index)] = X[self.means_.index].fillna(self.means_).to_numpy(dtype=np.float64)
+        for column, categories in self.categories_.items():
+            # Hash lookup of the whole column; -1 (unseen or missing) goes to the unknown code
+            codes = categories.get_indexer(X[column].astype(str))
+            out[:, names.get_loc(column)] = np.where(codes == -1, len(categories), codes)
+        return pd.DataFrame(out, columns=self.feature_names_in_, index=X.index)
+
+    def get_feature_names_out(self, input_features=None):
+        return self.feature_names_in_
+
+    def to_dict(self):
+        return {
+            "feature_names_in": [str(name) for name in self.feature_names_in_],
+            "categories": {column: categories.tolist() for column, categories in self.categories_.items()},
+            "means": {column: float(mean) for column, mean in self.means_.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        preprocessor = cls()
+        preprocessor.feature_names_in_ = np.asarray(data["feature_names_in"], dtype=object)
+        preprocessor.n_features_in_ = len(preprocessor.feature_names_in_)
+        preprocessor.categories_ = {column: pd.Index(values) for column, values in data["categories"].items()}
+        preprocessor.means_ = pd.Series(data["means"], dtype=np.float64)
+        return preprocessor
+
+
+def _step_to_dict(step):
+    """Describe one fitted imputer, scaler or one-hot encoder of a column transformer branch."""
+    kind = type(step).__name__
+    if kind == "SimpleImputer":
+        return {"kind": "impute", "statistics": step.statistics_.tolist()}
+    if kind == "StandardScaler":
+        return {
+            "kind": "scale",
+            "mean": step.mean_.tolist() if step.mean_ is not None else None,
+            "scale": step.scale_.tolist() if step.scale_ is not None else None,
+        }
+    if kind == "OneHotEncoder" and step.handle_unknown == "ignore" and step.drop is None:
+        return {"kind": "onehot", "categories": [categories.tolist() for categories in step.categories_]}
+    raise ValueError(f"{kind} steps cannot be exported to JSON")
+
+
+def _apply_step(step, values):
+    """Apply a step described by `_step_to_dict` to a 2-D object or float array."""
+    if step["kind"] == "impute":
+        statistics = np.asarray(step["statistics"], dtype=values.dtype)
+        missing = pd.isna(values)
+        return np.where(missing, statistics[None, :], values)
+    if step["kind"] == "scale":
+        values = values.astype(np.float64)
+        if step["mean"] is not None:
+            values = values - np.asarray(step["mean"])
+        if step["scale"] is not None:
+            values = values / np.asarray(step["scale"])
+        return values
+    # One-hot: a column per fitted category; unknown values encode as all zeros
+    return np.column_stack([
+        values[:, i][:, None] == np.asarray(categories, dtype=object)[None, :]
+        for i, categories in enumerate(step["categories"])
+    ]).astype(np.float64)
+
+
+class InputTransform:
+    """A fitted input pipeline (Preprocessor, ColumnTransformer, SelectKBest) stored as plain JSON.
+
+    Transforms exactly like the pipeline it was exported from, but loading it runs no pickle,
+    so model bundles can ship it safely.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.preprocessor = Preprocessor.from_dict(spec["preprocessor"])
+        self.feature_names_in_ = self.preprocessor.feature_names_in_
+        self.selected = np.asarray(spec["selected_indices"], dtype=np.intp)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Export a fitted pipeline of `Preprocessor`, `ColumnTransformer` and `SelectKBest`."""
+        steps = [step for _, step in pipeline.steps]
+        if [type(step).__name__ for step in steps] != ["Preprocessor", "ColumnTransformer", "SelectKBest"]:
+            raise ValueError("Only Preprocessor -> ColumnTransformer -> SelectKBest pipelines can be exported to JSON")
+        preprocessor, column_transformer, selector = steps
+        if column_transformer.remainder != "drop":
+            raise ValueError("Only column transformers that drop the remaining columns can be exported to JSON")
+        branches = []
+        for _, transformer, columns in column_transformer.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            branch_steps = transformer.steps if hasattr(transformer, "steps") else [(None, transformer)]
+            branches.append({
+                "columns": [str(column) for column in columns],
+                "steps": [_step_to_dict(step) for _, step in branch_steps],
+            })
+        return cls({
+            "preprocessor": preprocessor.to_dict(),
+            "branches": branches,
+            "selected_indices": [int(i) for i in selector.get_support(indices=True)],
+        })
+
+    def transform(self, X):
+        """Return the selected model features of raw customer rows `X` as a float64 array."""
+        encoded = self.preprocessor.transform(X)
+        outputs = []
+        for branch in self.spec["branches"]:
+            values = encoded[branch["columns"]].to_numpy()
+            for step in branch["steps"]:
+                values = _apply_step(step, values)
+            outputs.append(values)
+        return np.hstack(outputs)[:, self.selected]
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.spec, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+
+def load_input_pipeline(path=PREPROCESSOR_PATH):
+    """Load the fitted input pipeline: an `InputTransform` from `.json`, otherwise the pickle `app.training` wrote."""
+    if path.endswith(".json"):
+        return InputTransform.load(path)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def input_columns(pipeline):
+    """Return the raw customer columns a fitted input pipeline reads."""
+    return list(pipeline.feature_names_in_)
+
+
+def input_defaults(pipeline):
+    """Return the training defaults of a fitted input pipeline's raw columns: categories of text columns, means of the others."""
+    preprocessor = pipeline.preprocessor if isinstance(pipeline, InputTransform) else pipeline.steps[0][1]
+    defaults = {column: float(mean) for column, mean in preprocessor.means_.items()}
+    defaults.update({column: categories.tolist() for column, categories in preprocessor.categories_.items()})
+    return defaults
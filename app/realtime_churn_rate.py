@@ -1,4 +1,25 @@
+import logging
+
 import streamlit as st
+from app.feature_schema import adapter_for
+from app.inference import FEATURE_COLUMNS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Inputs this form collects
+REALTIME_FIELDS = ["Tenure", "MonthlyCharges", "TotalCharges", "ContractType", "PaymentMethod"]
+
+# Match the form's fields to the model's feature schema once; a mismatch fails here, not on every predict
+@st.cache_resource
+def load_realtime_adapter(_model):
+    # The form has to cover the model's schema; a partial row would be scored as garbage
+    try:
+        return adapter_for(_model, REALTIME_FIELDS, FEATURE_COLUMNS)
+    except ValueError as e:
+        st.error(f"The loaded model does not accept this form's inputs: {e}")
+        logger.error(f"Feature schema mismatch: {e}")
+        return None
 
 def realtime_churn_rate(model):
     """Display the real-time churn rate interface."""
@@ -23,11 +44,18 @@ def realtime_churn_rate(model):
     contract_value = contract_mapping[contract]
     payment_method_value = payment_method_mapping[payment_method]
 
-    # Prepare the input data for prediction
-    input_data = [[tenure, monthly_charges, total_charges, contract_value, payment_method_value]]
-
     if st.button("Predict Churn Rate"):
         if model:
+            adapter = load_realtime_adapter(model)
+            if adapter is None:
+                return
+            input_data = adapter.from_mapping({
+                "Tenure": tenure,
+                "MonthlyCharges": monthly_charges,
+                "TotalCharges": total_charges,
+                "ContractType": contract_value,
+                "PaymentMethod": payment_method_value,
+            })
             prediction = model.predict(input_data)
             churn_probability = prediction[0]
             st.metric(label="Churn Probability", value=f"{churn_probability:.2f}")
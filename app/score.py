@@ -0,0 +1,168 @@
+"""Batch churn scoring.
+
+    python -m app.score customers.csv scores.parquet --batch-size 50000 --id-column Customer_ID
+
+Reads the customer file (CSV or Parquet) in chunks, scores each chunk with the VotingRegressor
+ensemble (members predicting in parallel unless --serial, or the NumPy-compiled trees with
+--compiled) and appends the probabilities to a Parquet file. Throughput and peak memory are
+reported at the end of the run.
+
+With --preprocessor, the file holds raw customer columns and is mapped to model input with the
+fitted `input_pipeline.json` that `app.training` saved, the same transform the model was
+trained on.
+
+The pickled --model, and a pickled --preprocessor, are only read with --allow-pickle (or
+CHURN_ALLOW_PICKLE=1): unpickling runs arbitrary code. --compiled reads no pickle.
+
+With --explanations, each customer's top drivers are looked up by --id-column in the explanation
+store written by `app.explanations` and added as driver_1..driver_k columns.
+"""
+import argparse
+import logging
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.data_store import iter_chunks, snapshot_dtypes
+from app.explanations import TOP_DRIVERS, ExplanationStore
+from app.inference import FEATURE_COLUMNS, MODEL_PATH, ParallelVotingPredictor, load_model_file, predict_batch, to_feature_matrix
+from app.model_bundle import ALLOW_PICKLE, check_pickle
+from app.preprocessing import input_columns, load_input_pipeline
+from app.tree_compiler import CompiledEnsemble
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50_000
+
+
+def peak_rss():
+    """Return the peak resident set size of this process so far, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _empty_chunk(input_path, columns):
+    """Return the zero-row frame `iter_chunks` would read from `input_path`, with its columns and dtypes."""
+    if input_path.endswith(".parquet"):
+        return pq.read_schema(input_path).empty_table().select(columns).to_pandas()
+    header = pd.read_csv(input_path, nrows=0).columns
+    return pd.read_csv(input_path, usecols=columns, dtype=snapshot_dtypes(header), nrows=0)
+
+
+def _to_table(scores):
+    table = pa.Table.from_pandas(scores, preserve_index=False)
+    # Driver columns are strings even when a chunk has no explained customer (all missing)
+    schema = pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema])
+    return table.cast(schema)
+
+
+def score_file(input_path, output_path, model, batch_size=DEFAULT_BATCH_SIZE, id_column=None, features=FEATURE_COLUMNS,
+               input_pipeline=None, explanations=None, top_drivers=TOP_DRIVERS):
+    """Score `input_path` chunk by chunk into `output_path` and return the run statistics.
+
+    With an `input_pipeline`, chunks are raw customer rows transformed by it instead of `features`.
+    With an `explanations` store, the top `top_drivers` of each customer are added from it.
+    """
+    if explanations is not None and not id_column:
+        raise ValueError("Looking up explanations needs an id column")
+    if input_pipeline is not None:
+        features = input_columns(input_pipeline)
+    columns = list(features) + ([id_column] if id_column and id_column not in features else [])
+
+    def score_chunk(chunk):
+        if not len(chunk):
+            probabilities = np.empty(0, dtype=np.float64)
+        elif input_pipeline is not None:
+            probabilities = predict_batch(model, np.ascontiguousarray(input_pipeline.transform(chunk[features]), dtype=np.float64))
+        else:
+            probabilities = predict_batch(model, to_feature_matrix(chunk, features))
+        scores = pd.DataFrame({"churn_probability": probabilities})
+        if id_column:
+            scores.insert(0, id_column, chunk[id_column].to_numpy())
+        if explanations is not None:
+            drivers = explanations.top_driver_columns(scores[id_column], top_drivers)
+            scores = pd.concat([scores, drivers], axis=1)
+        return _to_table(scores)
+
+    rows = 0
+    writer = None
+    start = time.perf_counter()
+    try:
+        for chunk in iter_chunks(input_path, columns=columns, batch_size=batch_size):
+            if not len(chunk):
+                continue
+            table = score_chunk(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+            logger.info(f"Scored {rows} rows.")
+        if writer is None:
+            # No rows to score: still write the output, with the schema a non-empty run has
+            logger.warning(f"{input_path} has no rows; writing an empty {output_path}.")
+            pq.write_table(score_chunk(_empty_chunk(input_path, columns)), output_path)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss() / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Customer file to score (.csv or .parquet)")
+    parser.add_argument("output", help="Parquet file to write the probabilities to")
+    parser.add_argument("--model", default=MODEL_PATH, help="Pickled VotingRegressor")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per vectorized predict call")
+    parser.add_argument("--id-column", default=None, help="Column copied through to the output to identify each customer")
+    parser.add_argument("--compiled", default=None, help="Compiled .npz ensemble from app.tree_compiler, used instead of --model")
+    parser.add_argument("--serial", action="store_true", help="Predict with the ensemble members one after another")
+    parser.add_argument("--process-members", nargs="*", default=[], help="Ensemble members to run on a process pool instead of threads")
+    parser.add_argument("--preprocessor", default=None, help="Fitted input pipeline from app.training, for files of raw customer columns")
+    parser.add_argument("--explanations", default=None, help="Explanation store from app.explanations to add top drivers from")
+    parser.add_argument("--top-drivers", type=int, default=TOP_DRIVERS, help="Drivers per customer added with --explanations")
+    parser.add_argument("--allow-pickle", action="store_true", help="Trust and unpickle --model, and --preprocessor if it is a pickle")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    allow_pickle = args.allow_pickle or ALLOW_PICKLE
+    if not args.compiled:
+        check_pickle(args.model, allow_pickle)
+    options = {"batch_size": args.batch_size, "id_column": args.id_column}
+    if args.preprocessor:
+        # The JSON transform app.training writes next to the pickle reads no code
+        if not args.preprocessor.endswith(".json"):
+            check_pickle(args.preprocessor, allow_pickle)
+        options["input_pipeline"] = load_input_pipeline(args.preprocessor)
+    if args.explanations:
+        options["explanations"] = ExplanationStore(args.explanations)
+        options["top_drivers"] = args.top_drivers
+    if args.compiled:
+        stats = score_file(args.input, args.output, CompiledEnsemble.load(args.compiled), **options)
+    elif args.serial:
+        model = load_model_file(args.model)
+        stats = score_file(args.input, args.output, model, **options)
+    else:
+        model = load_model_file(args.model)
+        with ParallelVotingPredictor(model, process_members=args.process_members) as predictor:
+            stats = score_file(args.input, args.output, predictor, **options)
+    print(
+        f"Scored {stats['rows']} rows in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_second']:.0f} rows/sec), peak RSS {stats['peak_rss_mb']:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""HTTP churn scoring service with request micro-batching.
+
+    python -m app.serve --port 8000 --max-batch-size 64 --max-delay-ms 5
+
+Endpoints:
+    POST /predict   {"<field>": value, ...} for one customer -> {"churn_probability": p}
+    GET  /stats     p50/p99 latency, throughput and batch sizes since start
+    POST /stats/reset  the same, then restarts them
+    GET  /schema    the model's feature schema and the `request_fields` a request must supply
+                    (the raw customer columns when the bundle ships its input pipeline)
+    GET  /metrics   span latency histograms and counters in the Prometheus text format
+    GET  /health
+
+Concurrent requests are queued and flushed as one batch when `--max-batch-size` requests are
+waiting or `--max-delay-ms` after the first one arrived, whichever comes first. Each batch is a
+single vectorized predict on a worker thread, so the event loop keeps accepting requests
+meanwhile. Load-test a local instance with `python -m benchmarks.serve_load`.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import deque
+
+import numpy as np
+from aiohttp import web
+
+from app.feature_schema import input_pipeline_for, schema_for
+from app.inference import FEATURE_COLUMNS, ParallelVotingPredictor
+from app.instrumentation import REGISTRY, timed
+from app.model_bundle import BUNDLE_PATH, load_ensemble
+from app.preprocessing import input_columns
+from app.tree_compiler import CompiledEnsemble
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_DELAY_MS = 5.0
+
+# Latencies kept for the percentiles; older requests fall out of the window
+LATENCY_WINDOW = 100_000
+
+
+class LatencyStats:
+    """Request latencies over a sliding window, plus request and batch counters."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.batches = 0
+        self.batch_rows = 0
+        self.max_batch = 0
+        self.started = time.perf_counter()
+
+    def record_batch(self, latencies):
+        self.latencies.extend(latencies)
+        self.requests += len(latencies)
+        self.batches += 1
+        self.batch_rows += len(latencies)
+        self.max_batch = max(self.max_batch, len(latencies))
+
+    def summary(self):
+        """Return p50/p99 latency in ms, requests per second and batch sizes."""
+        elapsed = time.perf_counter() - self.started
+        latencies = np.fromiter(self.latencies, dtype=np.float64)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1e3 if len(latencies) else (float("nan"), float("nan"))
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.batch_rows / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "requests_per_second": self.requests / elapsed if elapsed else 0.0,
+            "uptime_seconds": elapsed,
+        }
+
+
+class MicroBatcher:
+    """Collects single-row predictions into batches flushed on size or deadline."""
+
+    def __init__(self, predict, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_delay_ms=DEFAULT_MAX_DELAY_MS):
+        self.predict = timed("serve.batch_predict")(predict)
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1e3
+        self.stats = LatencyStats()
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, row):
+        """Queue one (1, n_features) row and wait for its prediction."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        """Wait for a first request, then take more until the batch is full or the deadline passes."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Anything that goes wrong with a batch fails its requests only; the loop keeps serving
+            try:
+                rows = np.concatenate([row for row, _, _ in batch])
+                # One vectorized predict per batch, off the event loop
+                predictions = await loop.run_in_executor(None, self.predict, rows)
+                if len(predictions) != len(batch):
+                    raise ValueError(f"Model returned {len(predictions)} predictions for {len(batch)} requests")
+                finished = time.perf_counter()
+                for (_, future, _), prediction in zip(batch, predictions):
+                    if not future.done():
+                        future.set_result(float(prediction))
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats.record_batch([finished - queued for _, _, queued in batch])
+
+
+async def predict_handler(request):
+    try:
+        payload = await request.json()
+        row = request.app["adapter"].from_mapping(payload)
+    except KeyError as e:
+        raise web.HTTPBadRequest(text=f"Missing field {e}; expected {request.app['adapter'].fields}")
+    except (ValueError, TypeError) as e:
+        raise web.HTTPBadRequest(text=f"Invalid request body: {e}")
+    try:
+        probability = await request.app["batcher"].submit(row)
+    except Exception as e:
+        raise web.HTTPInternalServerError(text=f"Prediction failed: {e}")
+    return web.json_response({"churn_probability": probability})
+
+
+async def stats_handler(request):
+    return web.json_response(request.app["batcher"].stats.summary())
+
+
+async def stats_reset_handler(request):
+    batcher = request.app["batcher"]
+    summary = batcher.stats.summary()
+    batcher.stats = LatencyStats()
+    return web.json_response(summary)
+
+
+async def schema_handler(request):
+    adapter = request.app["adapter"]
+    return web.json_response({**adapter.schema.to_dict(), "request_fields": adapter.fields})
+
+
+async def metrics_handler(request):
+    return web.Response(text=REGISTRY.prometheus(), content_type="text/plain", charset="utf-8")
+
+
+async def health_handler(request):
+    return web.json_response({"status": "ok"})
+
+
+def create_app(model, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_delay_ms=DEFAULT_MAX_DELAY_MS, predict=None):
+    """Build the aiohttp application around a loaded model, predicting with `predict` if given."""
+    app = web.Application()
+    # Requests name the model's own features, or the raw customer columns of the input pipeline
+    # the bundle ships, which is then applied to every request as in training
+    schema = schema_for(model, FEATURE_COLUMNS)
+    input_pipeline = input_pipeline_for(model)
+    app["adapter"] = schema.adapter(input_columns(input_pipeline) if input_pipeline is not None else schema.names, input_pipeline)
+    app["batcher"] = MicroBatcher(predict or model.predict, max_batch_size, max_delay_ms)
+
+    async def start_batcher(app):
+        app["batcher"].start()
+
+    async def stop_batcher(app):
+        await app["batcher"].stop()
+
+    app.on_startup.append(start_batcher)
+    app.on_cleanup.append(stop_batcher)
+    app.router.add_post("/predict", predict_handler)
+    app.router.add_get("/stats", stats_handler)
+    app.router.add_post("/stats/reset", stats_reset_handler)
+    app.router.add_get("/schema", schema_handler)
+    app.router.add_get("/metrics", metrics_handler)
+    app.router.add_get("/health", health_handler)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--bundle", default=BUNDLE_PATH, help="Model bundle (falls back to the pickled model)")
+    parser.add_argument("--compiled", default=None, help="Compiled .npz ensemble from app.tree_compiler, used instead of --bundle")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-delay-ms", type=float, default=DEFAULT_MAX_DELAY_MS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.compiled:
+        model = CompiledEnsemble.load(args.compiled)
+        web.run_app(create_app(model, args.max_batch_size, args.max_delay_ms), host=args.host, port=args.port)
+        return
+    model = load_ensemble(args.bundle)
+    with ParallelVotingPredictor(model) as predictor:
+        app = create_app(model, args.max_batch_size, args.max_delay_ms, predict=predictor.predict)
+        web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Streaming aggregation of the churn file in fixed-size chunks.
+
+    python -m app.streaming "data/Telecom_customer churn.csv" --batch-size 200000
+
+Reads the file chunk by chunk (CSV or Parquet) and folds every chunk into running aggregates
+(count, mean and sum of squared deviations per group, and the Dashboard cubes), so the business metrics
+and Dashboard charts can be computed over files far larger than memory. Only one chunk and the
+aggregates are held at a time; peak RSS is reported at the end of the run.
+"""
+import argparse
+import logging
+
+import numpy as np
+import psutil
+
+from app.aggregate_cube import COMPLAINTS_DIMENSIONS, CUBE_DIMENSIONS, AggregateCube
+from app.data_store import CSV_PATH, iter_chunks
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100_000
+
+# Columns behind the sidebar business metrics, and the segments they are also broken down by
+BUSINESS_MEASURES = ["totrev", "months", "rev_Mean", "custcare_Mean"]
+BUSINESS_SEGMENTS = ["churn", "creditcd"]
+
+
+class RunningStats:
+    """Count, mean and sum of squared deviations (M2) of `measures`, per `by` group or overall.
+
+    Chunks, partial results and groups are combined with Chan et al.'s parallel update, so the
+    variance keeps its precision where a running sum of squares would cancel (large means,
+    small spread). Missing values are skipped, as in pandas' `mean()` and `std()`.
+    """
+
+    def __init__(self, measures, by=None):
+        self.measures = list(measures)
+        self.by = list(by) if by else []
+        self.rows = 0
+        self.counts = None
+        self.means = None
+        self.m2s = None
+
+    @property
+    def columns(self):
+        return self.measures + self.by
+
+    def update(self, chunk):
+        """Fold one chunk into the running statistics."""
+        values = chunk[self.measures].astype(np.float64)
+        keys = [chunk[column] for column in self.by] if self.by else np.zeros(len(chunk), dtype=np.int8)
+        grouped = values.groupby(keys, observed=True, dropna=False)
+        counts = grouped.count()
+        # Groups whose values are all missing hold count 0, mean 0 and M2 0
+        means = grouped.mean().fillna(0.0)
+        m2s = (grouped.var(ddof=0) * counts).fillna(0.0)
+        self._add(counts, means, m2s, len(chunk))
+        return self
+
+    def merge(self, other):
+        """Fold another `RunningStats` over the same measures and groups into this one."""
+        if other.counts is not None:
+            self._add(other.counts, other.means, other.m2s, other.rows)
+        return self
+
+    def rollup(self, by=None):
+        """Return the statistics combined up to a subset of the `by` groups, or overall when None."""
+        by = list(by) if by else []
+        rolled = RunningStats(self.measures, by)
+        if self.counts is None:
+            return rolled
+        if by:
+            group = lambda frame: frame.groupby(level=by, observed=True, dropna=False)
+        else:
+            group = lambda frame: frame.groupby(np.zeros(len(frame), dtype=np.int8))
+        weighted = self.counts * self.means
+        counts = group(self.counts).sum()
+        means = (group(weighted).sum() / counts).fillna(0.0)
+        # Each group adds its own M2 plus its count times its mean's squared offset from the combined mean
+        combined_means = (group(weighted).transform("sum") / group(self.counts).transform("sum")).fillna(0.0)
+        m2s = group(self.m2s + self.counts * (self.means - combined_means) ** 2).sum()
+        rolled._add(counts, means, m2s, self.rows)
+        return rolled
+
+    def _add(self, counts, means, m2s, rows):
+        self.rows += rows
+        if self.counts is None:
+            self.counts, self.means, self.m2s = counts, means, m2s
+            return
+        # Chan et al.: n = na + nb, mean = ma + delta * nb / n, M2 = M2a + M2b + delta**2 * na * nb / n
+        count_a, count_b = self.counts.align(counts, join="outer", fill_value=0)
+        mean_a, mean_b = self.means.align(means, join="outer", fill_value=0.0)
+        m2_a, m2_b = self.m2s.align(m2s, join="outer", fill_value=0.0)
+        total = count_a + count_b
+        share = (count_b / total).fillna(0.0)
+        delta = mean_b - mean_a
+        self.counts = total
+        self.means = mean_a + delta * share
+        self.m2s = m2_a + m2_b + delta ** 2 * count_a * share
+
+    def _result(self, frame):
+        # Overall statistics come back as one value per measure rather than a one-row frame
+        return frame if self.by else frame.iloc[0]
+
+    def count(self):
+        return self._result(self.counts)
+
+    def total(self):
+        return self._result(self.means * self.counts)
+
+    def mean(self):
+        return self._result(self.means.where(self.counts > 0))
+
+    def var(self, ddof=1):
+        """Sample variance (ddof=1, as pandas) from the running M2; missing for groups of `ddof` values or fewer."""
+        return self._result((self.m2s / (self.counts - ddof)).where(self.counts > ddof))
+
+    def std(self, ddof=1):
+        return np.sqrt(self.var(ddof))
+
+
+def stream(path, aggregates, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Fold every chunk of `path` into each of `aggregates`; return the rows read and peak RSS."""
+    process = psutil.Process()
+    peak_rss = process.memory_info().rss
+    rows = 0
+    for chunk in iter_chunks(path, columns=columns, batch_size=batch_size):
+        for aggregate in aggregates:
+            aggregate.update(chunk)
+        rows += len(chunk)
+        peak_rss = max(peak_rss, process.memory_info().rss)
+        logger.info(f"Aggregated {rows} rows.")
+    return {"rows": rows, "peak_rss_mb": peak_rss / 2**20}
+
+
+def business_metrics(stats):
+    """Return the sidebar CLV, ARPU and average complaints from overall `RunningStats` of BUSINESS_MEASURES."""
+    mean = stats.mean()
+    return {
+        "clv": mean["totrev"] / mean["months"],
+        "arpu": mean["rev_Mean"],
+        "complaints": mean["custcare_Mean"],
+    }
+
+
+class CubeBuilder:
+    """Builds an `AggregateCube` by aggregating each chunk and merging the partial cubes."""
+
+    def __init__(self, dimensions):
+        self.dimensions = dimensions
+        self.cube = None
+
+    @property
+    def columns(self):
+        return self.dimensions + ["churn", "totrev", "mou_Mean"]
+
+    def update(self, chunk):
+        partial = AggregateCube.build(chunk, self.dimensions)
+        self.cube = partial if self.cube is None else self.cube.merge(partial)
+        return self
+
+
+def stream_dashboard(path=CSV_PATH, batch_size=DEFAULT_BATCH_SIZE):
+    """Aggregate the business metrics and both Dashboard cubes in one pass over `path`.
+
+    Returns the metrics, the main and customer care cubes, and the `stream` run statistics.
+    """
+    stats = RunningStats(BUSINESS_MEASURES)
+    cube, complaints_cube = CubeBuilder(CUBE_DIMENSIONS), CubeBuilder(COMPLAINTS_DIMENSIONS)
+    aggregates = [stats, cube, complaints_cube]
+    columns = list(dict.fromkeys(column for aggregate in aggregates for column in aggregate.columns))
+    run = stream(path, aggregates, columns=columns, batch_size=batch_size)
+    return business_metrics(stats), cube.cube, complaints_cube.cube, run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default=CSV_PATH, help="Customer file (.csv or .parquet)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per chunk")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    metrics, cube, complaints_cube, run = stream_dashboard(args.path, args.batch_size)
+    totals = cube.totals()
+    print(f"Customers: {totals['count']}, churn rate {totals['churn_rate']:.2%}, average revenue {totals['avg_revenue']:.2f}")
+    print(f"Average CLV ${metrics['clv']:.2f}, ARPU ${metrics['arpu']:.2f}, complaints {metrics['complaints']:.2f}")
+    print(f"Cube cells: {len(cube.table)} main, {len(complaints_cube.table)} customer care")
+    print(f"{run['rows']} rows streamed, peak RSS {run['peak_rss_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""Training pipeline for the churn ensemble, extracted from `src/data/preprocessing and modeling.ipynb`.
+
+    python -m app.training --run-dir artifacts/training --n-jobs 4
+
+Runs the notebook's stages in order: prepare (column drops, dropna, train/test split and the
+fitted `Preprocessor` encoding and imputation), features (ColumnTransformer + SelectKBest),
+compare (the regressor comparison with 5-fold CV), tune and ensemble (the VotingRegressor fit).
+The run directory ends up with `voting_regressor_model.pkl` and `input_pipeline.pkl`, the
+fitted raw-columns-to-model-input transform that batch scoring applies unchanged, and
+`feature_schema.json`, the names, dtypes and selected indices of the model's input.
+
+Every stage writes its output to the run directory and is skipped when that output already
+exists, so an interrupted run resumes from the last finished stage (the comparison resumes
+model by model); pass --force to retrain from scratch. The checkpoints sit under
+`checkpoints/<key>`, where the key hashes the customer file and the training settings, so a
+changed file or setting trains afresh instead of reusing stale stages. A comparison in which a
+model failed is not checkpointed; the rerun retries that model. Model fits and CV folds of the
+comparison run on a process pool of --n-jobs workers, and every estimator gets a fixed seed,
+so the same data and settings give the same model. Wall-clock time per stage is written to
+`timings.json`.
+
+The tune stage searches the CatBoost and LightGBM members by successive halving
+(`app.tuning`, trials checkpointed to `tuning_trials.jsonl`); --tuner grid runs the notebook's
+exhaustive CatBoost grid instead.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor
+from lightgbm import LGBMRegressor
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor, VotingRegressor
+from sklearn.feature_selection import SelectKBest, f_classif
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import ElasticNet, Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import GridSearchCV, KFold, train_test_split
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBRegressor
+
+from app.data_store import CSV_PATH
+from app.feature_schema import FeatureSchema
+from app.preprocessing import INPUT_TRANSFORM_PATH, PREPROCESSOR_PATH, InputTransform, Preprocessor
+from app.tuning import CV_FOLDS as TUNING_CV_FOLDS, ETA, RUNGS, SEARCH_SPACES, tune_members
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+RUN_DIR = "artifacts/training"
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+CV_FOLDS = 5
+SELECTED_FEATURES = 10
+
+STAGES = ["prepare", "features", "compare", "tune", "ensemble"]
+TUNERS = ["halving", "grid"]
+
+# Columns with no significant contribution to the model
+DROP_COLUMNS = [
+    'numbcars', 'dwllsize', 'HHstatin', 'ownrent', 'dwlltype', 'lor', 'ethnic', 'kid0_2', 'kid3_5',
+    'kid6_10', 'kid11_15', 'kid16_17', 'creditcd', 'eqpdays', 'income', 'adults', 'prizm_social_one',
+    'infobase', 'crclscod',
+]
+
+# CatBoost grid searched by the grid tuner
+CATBOOST_PARAM_GRID = {
+    'iterations': [100, 200],
+    'depth': [6, 8, 10],
+    'learning_rate': [0.01, 0.1],
+    'l2_leaf_reg': [1, 3, 5],
+}
+
+
+# Data preparation
+def clean_dataset(df):
+    """Drop the ID and unused columns and the incomplete rows."""
+    return df.drop(columns=["Customer_ID"] + DROP_COLUMNS, errors="ignore").dropna()
+
+
+def prepare_data(csv_path=CSV_PATH):
+    """Load and clean the customer file, split it, and encode both splits with a `Preprocessor` fitted on train."""
+    df = clean_dataset(pd.read_csv(csv_path))
+    X = df.drop(columns=['churn'])
+    y = df['churn']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    preprocessor = Preprocessor().fit(X_train)
+    return {
+        "X_train": preprocessor.transform(X_train),
+        "X_test": preprocessor.transform(X_test),
+        "y_train": y_train,
+        "y_test": y_test,
+        "preprocessor": preprocessor,
+    }
+
+
+# Feature engineering
+def build_column_transformer(X):
+    """Median-impute and scale the numeric columns, one-hot encode any remaining text columns."""
+    numerical_cols = X.select_dtypes(include=['float64', 'int64']).columns
+    categorical_cols = X.select_dtypes(include=['object', 'string']).columns
+    return ColumnTransformer(transformers=[
+        ('num', Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='median')),
+            ('scaler', StandardScaler()),
+        ]), numerical_cols),
+        ('cat', Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='most_frequent')),
+            ('onehot', OneHotEncoder(handle_unknown='ignore')),
+        ]), categorical_cols),
+    ])
+
+
+def select_features(data, k=SELECTED_FEATURES):
+    """Transform the splits and keep the `k` features with the highest ANOVA F-value."""
+    column_transformer = build_column_transformer(data["X_train"])
+    X_train_transformed = column_transformer.fit_transform(data["X_train"])
+    X_test_transformed = column_transformer.transform(data["X_test"])
+    selector = SelectKBest(score_func=f_classif, k=k)
+    X_train_selected = selector.fit_transform(X_train_transformed, data["y_train"])
+    X_test_selected = selector.transform(X_test_transformed)
+    return {
+        # Raw customer columns in, selected model features out, with every step already fitted
+        "input_pipeline": Pipeline(steps=[
+            ('preprocess', data["preprocessor"]),
+            ('transform', column_transformer),
+            ('select', selector),
+        ]),
+        "selector": selector,
+        "selected_indices": selector.get_support(indices=True),
+        "X_train_selected": X_train_selected,
+        "X_test_selected": X_test_selected,
+    }
+
+
+# Model comparison
+def candidate_models(threads=-1):
+    """Return the regressors compared in the notebook, seeded and limited to `threads` threads."""
+    return {
+        "Linear Regression": LinearRegression(),
+        "Lasso Regression": Lasso(),
+        "Ridge Regression": Ridge(),
+        "ElasticNet Regression": ElasticNet(),
+        "K-Neighbors Regressor": KNeighborsRegressor(n_jobs=threads),
+        "Decision Tree Regressor": DecisionTreeRegressor(random_state=RANDOM_STATE),
+        "Random Forest Regressor": RandomForestRegressor(n_estimators=10, random_state=RANDOM_STATE, n_jobs=threads),
+        "Gradient Boosting Regressor": GradientBoostingRegressor(n_estimators=10, random_state=RANDOM_STATE),
+        "AdaBoost Regressor": AdaBoostRegressor(random_state=RANDOM_STATE),
+        "XGBoost Regressor": XGBRegressor(tree_method="auto", random_state=RANDOM_STATE, n_jobs=threads),
+        "CatBoost Regressor": CatBoostRegressor(n_estimators=10, verbose=False, random_seed=RANDOM_STATE,
+                                                thread_count=threads, allow_writing_files=False),
+        "LightGBM Regressor": LGBMRegressor(n_estimators=10, random_state=RANDOM_STATE, n_jobs=threads, verbose=-1),
+    }
+
+
+def evaluate_model(y_true, y_pred):
+    """Evaluate a model using common regression metrics."""
+    mse = mean_squared_error(y_true, y_pred)
+    return {"MAE": mean_absolute_error(y_true, y_pred), "RMSE": np.sqrt(mse), "R2": r2_score(y_true, y_pred)}
+
+
+# Training data of the comparison, sent to each pool worker once instead of with every task
+_worker_data = {}
+
+
+def _init_worker(X_train, y_train, X_test, y_test, threads):
+    _worker_data.update(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test, threads=threads)
+
+
+def _run_task(name, fold):
+    """Fit one model on the full training set (`fold` None) or on one CV fold, and score it."""
+    data = _worker_data
+    model = candidate_models(data["threads"])[name]
+    X, y = data["X_train"], data["y_train"]
+    if fold is None:
+        model.fit(X, y)
+        train = evaluate_model(y, model.predict(X))
+        test = evaluate_model(data["y_test"], model.predict(data["X_test"]))
+        return {**{f"Train_{k}": v for k, v in train.items()}, **test}
+
+    train_index, val_index = list(KFold(n_splits=CV_FOLDS).split(X))[fold]
+    model.fit(X.iloc[train_index], y.iloc[train_index])
+    y_pred = model.predict(X.iloc[val_index])
+    y_val = y.iloc[val_index]
+    return {"MSE": mean_squared_error(y_val, y_pred), "R2": r2_score(y_val, y_pred)}
+
+
+def _checkpoint_name(name):
+    return name.lower().replace(" ", "_") + ".json"
+
+
+def compare_models(data, n_jobs=1, checkpoint_dir=None):
+    """Train and cross-validate every candidate model, returning results sorted by test R².
+
+    The holdout fit and the CV folds of every model are independent tasks on a pool of `n_jobs`
+    processes. Finished models are written to `checkpoint_dir` and not retrained on a rerun.
+    """
+    results = {}
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        for name in candidate_models():
+            path = os.path.join(checkpoint_dir, _checkpoint_name(name))
+            if os.path.exists(path):
+                with open(path) as f:
+                    results[name] = json.load(f)
+    pending = [name for name in candidate_models() if name not in results]
+    if results:
+        logger.info(f"Resuming comparison: {len(results)} models already evaluated.")
+
+    failed = set()
+    tasks = [(name, fold) for name in pending for fold in [None] + list(range(CV_FOLDS))]
+    # A single worker uses every core per model; several workers get one thread each
+    threads = -1 if n_jobs == 1 else 1
+    args = (data["X_train"], data["y_train"], data["X_test"], data["y_test"], threads)
+    outputs = {name: {} for name in pending}
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=args) as executor:
+        futures = {executor.submit(_run_task, name, fold): (name, fold) for name, fold in tasks}
+        # Take results in completion order, so each model is checkpointed as soon as its last fit ends
+        for future in as_completed(futures):
+            name, fold = futures[future]
+            try:
+                outputs[name][fold] = future.result()
+            except Exception as e:
+                logger.error(f"Error during training of {name}: {e}")
+                failed.add(name)
+                continue
+            if len(outputs[name]) < CV_FOLDS + 1:
+                continue
+            folds = [outputs[name][i] for i in range(CV_FOLDS)]
+            result = {
+                "Model": name,
+                **outputs[name][None],
+                "CV_RMSE": float(np.sqrt(np.mean([f["MSE"] for f in folds]))),
+                "CV_R2": float(np.mean([f["R2"] for f in folds])),
+            }
+            result = {k: float(v) if isinstance(v, np.floating) else v for k, v in result.items()}
+            results[name] = result
+            logger.info(f"{name} completed. Test R²: {result['R2']:.4f}, CV Test R²: {result['CV_R2']:.4f}")
+            if checkpoint_dir:
+                with open(os.path.join(checkpoint_dir, _checkpoint_name(name)), "w") as f:
+                    json.dump(result, f, indent=2)
+
+    # An incomplete comparison must not be checkpointed as the stage's output; rerunning retries the failed models
+    if failed:
+        raise RuntimeError(f"Model comparison failed for {', '.join(sorted(failed))}; rerun to retry them.")
+    return sorted(results.values(), key=lambda result: result["R2"], reverse=True)
+
+
+# Hyperparameter tuning and the final ensemble
+def tune_catboost(features, y_train, n_jobs=1):
+    """Grid-search CatBoost with 3-fold CV; return the best parameters and their R²."""
+    # As in compare_models: with several search workers, each CatBoost fit gets one thread
+    threads = -1 if n_jobs == 1 else 1
+    search = GridSearchCV(
+        estimator=CatBoostRegressor(verbose=False, random_seed=RANDOM_STATE, thread_count=threads, allow_writing_files=False),
+        param_grid=CATBOOST_PARAM_GRID, cv=3, scoring='r2', n_jobs=n_jobs,
+    )
+    search.fit(features["X_train_selected"], y_train)
+    return {"catboost": {"best_params": search.best_params_, "best_score": float(search.best_score_)}}
+
+
+def fit_ensemble(features, data, tuning):
+    """Fit the CatBoost / LightGBM / GradientBoosting VotingRegressor and evaluate it on the test set.
+
+    `tuning` maps member names to their tuned parameters; a member without any keeps its defaults.
+    """
+    catboost_params = tuning.get("catboost", {}).get("best_params", {})
+    lightgbm_params = tuning.get("lightgbm", {}).get("best_params", {})
+    voting_regressor = VotingRegressor(estimators=[
+        ('catboost', CatBoostRegressor(**catboost_params, verbose=False, random_seed=RANDOM_STATE, allow_writing_files=False)),
+        ('lightgbm', LGBMRegressor(**lightgbm_params, random_state=RANDOM_STATE, verbose=-1)),
+        ('gradient_boosting', GradientBoostingRegressor(random_state=RANDOM_STATE)),
+    ])
+    voting_regressor.fit(features["X_train_selected"], data["y_train"])
+    metrics = evaluate_model(data["y_test"], voting_regressor.predict(features["X_test_selected"]))
+    return voting_regressor, {k: float(v) for k, v in metrics.items()}
+
+
+def checkpoint_key(csv_path):
+    """Hash the customer file's bytes and the settings the stages depend on into the key of their checkpoints."""
+    digest = hashlib.sha1()
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            digest.update(block)
+    settings = {
+        "random_state": RANDOM_STATE,
+        "test_size": TEST_SIZE,
+        "cv_folds": CV_FOLDS,
+        "selected_features": SELECTED_FEATURES,
+        "drop_columns": DROP_COLUMNS,
+        "catboost_param_grid": CATBOOST_PARAM_GRID,
+        "tuning": {"rungs": RUNGS, "eta": ETA, "cv_folds": TUNING_CV_FOLDS, "search_spaces": SEARCH_SPACES},
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+class TrainingPipeline:
+    """Runs the training stages, checkpointing each one under `run_dir` and timing it."""
+
+    def __init__(self, csv_path=CSV_PATH, run_dir=RUN_DIR, n_jobs=1, force=False, tuner="halving"):
+        if tuner not in TUNERS:
+            raise ValueError(f"Unknown tuner: {tuner} (expected one of {TUNERS})")
+        self.csv_path = csv_path
+        self.run_dir = run_dir
+        self.n_jobs = n_jobs
+        self.force = force
+        self.tuner = tuner
+        self.timings = {}
+        self.key = checkpoint_key(csv_path)
+        self.checkpoint_dir = os.path.join(run_dir, "checkpoints", self.key)
+        if force and os.path.isdir(self.checkpoint_dir):
+            shutil.rmtree(self.checkpoint_dir)
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+    def _path(self, filename):
+        return os.path.join(self.run_dir, filename)
+
+    def _checkpoint(self, filename):
+        return os.path.join(self.checkpoint_dir, filename)
+
+    def _stage(self, name, filename, compute):
+        """Return the stage output from its checkpoint, or compute, save and time it."""
+        path = self._checkpoint(filename)
+        start = time.perf_counter()
+        if os.path.exists(path) and not self.force:
+            with open(path, "rb") as f:
+                output = pickle.load(f)
+            cached = True
+        else:
+            output = compute()
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump(output, f)
+            os.replace(path + ".tmp", path)
+            cached = False
+        self.timings[name] = {"seconds": time.perf_counter() - start, "cached": cached}
+        logger.info(f"Stage {name} {'loaded from checkpoint' if cached else 'finished'} in {self.timings[name]['seconds']:.1f} s.")
+        with open(self._path("timings.json"), "w") as f:
+            json.dump(self.timings, f, indent=2)
+        return output
+
+    def run(self):
+        """Run every stage and return the fitted ensemble with its test metrics."""
+        logger.info(f"Checkpoints for this customer file and settings: {self.checkpoint_dir}")
+        compare_dir = self._checkpoint("compare")
+        trials_path = self._checkpoint("tuning_trials.jsonl")
+
+        data = self._stage("prepare", "prepare.pkl", lambda: prepare_data(self.csv_path))
+        features = self._stage("features", "features.pkl", lambda: select_features(data))
+        self.results = self._stage("compare", "compare.pkl", lambda: compare_models(data, self.n_jobs, compare_dir))
+        if self.tuner == "grid":
+            tune = lambda: tune_catboost(features, data["y_train"], self.n_jobs)
+        else:
+            tune = lambda: tune_members(features["X_train_selected"], data["y_train"], self.n_jobs, trials_path, RANDOM_STATE)
+        self.tuning = self._stage("tune", f"tune_{self.tuner}.pkl", tune)
+        self.model, self.metrics = self._stage(
+            "ensemble", f"ensemble_{self.tuner}.pkl", lambda: fit_ensemble(features, data, self.tuning))
+        self.selected_indices = features["selected_indices"]
+        self.input_pipeline = features["input_pipeline"]
+        with open(self._path("voting_regressor_model.pkl"), "wb") as f:
+            pickle.dump(self.model, f)
+        with open(self._path(PREPROCESSOR_PATH), "wb") as f:
+            pickle.dump(self.input_pipeline, f)
+        InputTransform.from_pipeline(self.input_pipeline).save(self._path(INPUT_TRANSFORM_PATH))
+        self.schema = FeatureSchema.from_input_pipeline(self.input_pipeline)
+        with open(self._path("feature_schema.json"), "w") as f:
+            json.dump(self.schema.to_dict(), f, indent=2)
+        return self.model, self.metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=CSV_PATH, help="Customer file to train on")
+    parser.add_argument("--run-dir", default=RUN_DIR, help="Directory holding the stage checkpoints")
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count(), help="Worker processes for fits and CV folds")
+    parser.add_argument("--force", action="store_true", help="Ignore existing checkpoints and retrain every stage")
+    parser.add_argument("--tuner", choices=TUNERS, default="halving", help="Hyperparameter search of the tune stage")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    pipeline = TrainingPipeline(args.csv, args.run_dir, args.n_jobs, args.force, args.tuner)
+    pipeline.run()
+
+    print("\n=== Model Performance Summary ===")
+    for result in pipeline.results:
+        print(f"{result['Model']:<28} Test R²: {result['R2']:.4f}  CV R²: {result['CV_R2']:.4f}  "
+              f"Test RMSE: {result['RMSE']:.4f}  CV RMSE: {result['CV_RMSE']:.4f}")
+    print()
+    for member, tuned in pipeline.tuning.items():
+        print(f"{member} best parameters: {tuned['best_params']} (CV R² {tuned['best_score']:.4f})")
+        if "report" in tuned:
+            report = tuned["report"]
+            print(f"  successive halving: {report['search_trials']} trials in {report['search_cpu_hours']:.3f} CPU-h "
+                  f"({report['search_configs_per_cpu_hour']:.0f} configs/CPU-h); grid: {report['grid_configs']} configs "
+                  f"in ~{report['grid_cpu_hours_estimate']:.3f} CPU-h ({report['grid_configs_per_cpu_hour']:.0f} configs/CPU-h)")
+    print(f"Selected feature indices: {pipeline.selected_indices}")
+    print(f"Ensemble test metrics: {pipeline.metrics}")
+    print("\nStage timings:")
+    for stage, timing in pipeline.timings.items():
+        print(f"  {stage:<10} {timing['seconds']:8.1f} s{' (checkpoint)' if timing['cached'] else ''}")
+
+
+if __name__ == "__main__":
+    main()
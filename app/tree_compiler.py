@@ -0,0 +1,352 @@
+"""Compile the VotingRegressor ensemble into flat node arrays.
+
+    python -m app.tree_compiler --model voting_regressor_model.pkl --output voting_regressor_model.npz
+
+Every tree of every member (CatBoost, LightGBM, sklearn GradientBoosting) becomes rows of
+feature/threshold/left/right/value arrays. The compiled artifact is a plain `.npz` file, so
+`CompiledEnsemble.load` and `predict` only need NumPy.
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from app.inference import ensemble_members, load_model_file
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Rows evaluated together; bounds the (rows x trees) node-index matrix
+DEFAULT_BLOCK_SIZE = 10_000
+
+_ARRAYS = ["feature", "threshold", "left", "right", "value", "default_left", "roots"]
+
+
+class TreeGroup:
+    """All trees of one ensemble member, flattened into shared node arrays.
+
+    Leaves point `left` and `right` at themselves, so walking every tree for `depth` steps
+    lands each row on its leaf without per-node leaf checks.
+    """
+
+    def __init__(self, name, feature, threshold, left, right, value, default_left, roots, depth, bias, float32_input):
+        self.name = name
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.default_left = default_left
+        self.roots = roots
+        self.depth = depth
+        self.bias = bias
+        self.float32_input = float32_input
+
+    def predict(self, features):
+        """Return the summed tree outputs plus bias for every row of `features`."""
+        if self.float32_input:
+            # Match libraries that compare float32 inputs against their thresholds
+            features = features.astype(np.float32)
+        rows = np.arange(len(features))[:, None]
+        node = np.repeat(self.roots[None, :], len(features), axis=0)
+        for _ in range(self.depth):
+            x = features[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.bias + self.value[node].sum(axis=1)
+
+
+class _GroupBuilder:
+    """Accumulate trees given as local node arrays (left == -1 marks a leaf) into one group."""
+
+    def __init__(self):
+        self.arrays = {key: [] for key in _ARRAYS}
+        self.size = 0
+        self.depth = 0
+
+    def add_tree(self, feature, threshold, left, right, value, default_left):
+        offset = self.size
+        count = len(feature)
+        is_leaf = np.asarray(left) == -1
+        own = np.arange(offset, offset + count)
+        self.arrays["feature"].append(np.where(is_leaf, 0, feature).astype(np.int32))
+        self.arrays["threshold"].append(np.asarray(threshold, dtype=np.float64))
+        self.arrays["left"].append(np.where(is_leaf, own, np.asarray(left) + offset).astype(np.int32))
+        self.arrays["right"].append(np.where(is_leaf, own, np.asarray(right) + offset).astype(np.int32))
+        self.arrays["value"].append(np.where(is_leaf, value, 0.0).astype(np.float64))
+        self.arrays["default_left"].append(np.asarray(default_left, dtype=bool))
+        self.arrays["roots"].append(np.array([offset], dtype=np.int32))
+        self.size += count
+        self.depth = max(self.depth, _tree_depth(left, right))
+
+    def build(self, name, bias, float32_input):
+        arrays = {key: np.concatenate(parts) for key, parts in self.arrays.items()}
+        return TreeGroup(name, depth=self.depth, bias=float(bias), float32_input=float32_input, **arrays)
+
+
+def _tree_depth(left, right):
+    """Return the maximum root-to-leaf depth of a tree in local node arrays."""
+    depth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, level = stack.pop()
+        if left[node] == -1:
+            depth = max(depth, level)
+        else:
+            stack.append((left[node], level + 1))
+            stack.append((right[node], level + 1))
+    return depth
+
+
+# Per-tree node arrays of `GradientBoostingArrays`, stored concatenated with each tree's size
+_GB_ARRAYS = ["feature", "threshold", "left", "right", "value", "cover", "missing_left"]
+
+
+class GradientBoostingArrays:
+    """A fitted sklearn GradientBoostingRegressor reduced to its trees' node arrays.
+
+    Keeps what prediction and TreeSHAP need (splits, leaf values scaled by the learning rate,
+    node cover) and is saved as a plain `.npz`, so loading it runs no pickle.
+    """
+
+    def __init__(self, trees, bias, n_features_in_):
+        self.trees = trees
+        self.bias = bias
+        self.n_features_in_ = n_features_in_
+        self._group = None
+
+    @classmethod
+    def from_estimator(cls, est):
+        if est.init_ == "zero":
+            bias = 0.0
+        elif hasattr(est.init_, "constant_"):
+            bias = float(np.ravel(est.init_.constant_)[0])
+        else:
+            raise ValueError("Only the default or 'zero' init estimator can be converted")
+        trees = []
+        for tree in est.estimators_[:, 0]:
+            t = tree.tree_
+            trees.append({
+                "feature": t.feature.astype(np.int32),
+                "threshold": t.threshold.astype(np.float64),
+                "left": t.children_left.astype(np.int32),
+                "right": t.children_right.astype(np.int32),
+                "value": t.value[:, 0, 0] * est.learning_rate,
+                "cover": t.weighted_n_node_samples.astype(np.float64),
+                "missing_left": np.asarray(getattr(t, "missing_go_to_left", np.ones(t.node_count)), dtype=bool),
+            })
+        return cls(trees, bias, int(est.n_features_in_))
+
+    def group(self, name="gradient_boosting"):
+        """Return the trees as a compiled `TreeGroup`."""
+        builder = _GroupBuilder()
+        for tree in self.trees:
+            builder.add_tree(tree["feature"], tree["threshold"], tree["left"], tree["right"], tree["value"], tree["missing_left"])
+        # sklearn trees compare float32 inputs
+        return builder.build(name, self.bias, float32_input=True)
+
+    def predict(self, features):
+        features = np.asarray(features, dtype=np.float64)
+        # As the estimator itself: its trees have no learned direction for missing values
+        if np.isnan(features).any():
+            raise ValueError("Input contains NaN; GradientBoostingRegressor does not accept missing values.")
+        if self._group is None:
+            self._group = self.group()
+        return self._group.predict(features)
+
+    def save(self, path):
+        arrays = {key: np.concatenate([tree[key] for tree in self.trees]) for key in _GB_ARRAYS}
+        sizes = np.array([len(tree["feature"]) for tree in self.trees], dtype=np.int64)
+        meta = {"bias": self.bias, "n_features_in": self.n_features_in_}
+        with open(path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), sizes=sizes, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            bounds = np.cumsum(data["sizes"])[:-1]
+            parts = {key: np.split(data[key], bounds) for key in _GB_ARRAYS}
+        trees = [{key: parts[key][i] for key in _GB_ARRAYS} for i in range(len(parts["feature"]))]
+        return cls(trees, meta["bias"], meta["n_features_in"])
+
+
+def _compile_gradient_boosting(name, est):
+    """Flatten a fitted sklearn GradientBoostingRegressor."""
+    try:
+        return GradientBoostingArrays.from_estimator(est).group(name)
+    except ValueError as e:
+        raise ValueError(f"{name}: {e}") from None
+
+
+def _compile_lightgbm(name, est):
+    """Flatten a fitted LightGBM regressor (or a bare Booster) from its JSON dump."""
+    dump = getattr(est, "booster_", est).dump_model()
+    builder = _GroupBuilder()
+    for tree in dump["tree_info"]:
+        arrays = {key: [] for key in ["feature", "threshold", "left", "right", "value", "default_left"]}
+
+        def visit(node):
+            i = len(arrays["feature"])
+            for key in arrays:
+                arrays[key].append(-1 if key in ("left", "right") else 0)
+            if "split_feature" not in node:
+                arrays["value"][i] = node["leaf_value"]
+                return i
+            if node["decision_type"] != "<=":
+                raise ValueError(f"{name}: categorical splits cannot be compiled")
+            missing_type = node.get("missing_type", "None")
+            if missing_type == "NaN":
+                default_left = node["default_left"]
+            elif missing_type == "None":
+                # LightGBM treats NaN as 0.0 when the feature had no missing values in training
+                default_left = 0.0 <= node["threshold"]
+            else:
+                raise ValueError(f"{name}: missing_type '{missing_type}' cannot be compiled")
+            arrays["feature"][i] = node["split_feature"]
+            arrays["threshold"][i] = node["threshold"]
+            arrays["default_left"][i] = default_left
+            arrays["left"][i] = visit(node["left_child"])
+            arrays["right"][i] = visit(node["right_child"])
+            return i
+
+        visit(tree["tree_structure"])
+        builder.add_tree(**arrays)
+    # The initial score is folded into the first tree's leaves
+    return builder.build(name, 0.0, float32_input=False)
+
+
+def _compile_catboost(name, est):
+    """Flatten a fitted CatBoost regressor by expanding its oblivious trees."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "model.json")
+        est.save_model(path, format="json")
+        with open(path) as f:
+            dump = json.load(f)
+
+    float_features = dump["features_info"]["float_features"]
+    flat_index = {ff["feature_index"]: ff["flat_feature_index"] for ff in float_features}
+    nan_left = {ff["feature_index"]: ff.get("nan_value_treatment") != "AsTrue" for ff in float_features}
+    scale, bias = dump.get("scale_and_bias", [1.0, [0.0]])
+    bias = np.ravel(bias)[0]
+
+    builder = _GroupBuilder()
+    for tree in dump["oblivious_trees"]:
+        splits = tree["splits"]
+        leaf_values = tree["leaf_values"]
+        arrays = {key: [] for key in ["feature", "threshold", "left", "right", "value", "default_left"]}
+
+        # Split `level` decides bit `level` of the leaf index; a true condition (x > border) sets it
+        def visit(level, index):
+            i = len(arrays["feature"])
+            for key in arrays:
+                arrays[key].append(-1 if key in ("left", "right") else 0)
+            if level == len(splits):
+                arrays["value"][i] = scale * leaf_values[index]
+                return i
+            split = splits[level]
+            if split.get("split_type", "FloatFeature") != "FloatFeature":
+                raise ValueError(f"{name}: only float feature splits can be compiled")
+            feature = split["float_feature_index"]
+            arrays["feature"][i] = flat_index[feature]
+            arrays["threshold"][i] = float(np.float32(split["border"]))
+            arrays["default_left"][i] = nan_left[feature]
+            arrays["left"][i] = visit(level + 1, index)
+            arrays["right"][i] = visit(level + 1, index | (1 << level))
+            return i
+
+        visit(0, 0)
+        builder.add_tree(**arrays)
+    # CatBoost compares float32 inputs against float32 borders
+    return builder.build(name, bias, float32_input=True)
+
+
+_COMPILERS = {
+    "CatBoostRegressor": _compile_catboost,
+    "LGBMRegressor": _compile_lightgbm,
+    "Booster": _compile_lightgbm,
+    "GradientBoostingRegressor": _compile_gradient_boosting,
+    "GradientBoostingArrays": lambda name, est: est.group(name),
+}
+
+
+class CompiledEnsemble:
+    """Weighted average of compiled tree groups, evaluated with NumPy only."""
+
+    def __init__(self, groups, weights=None, block_size=DEFAULT_BLOCK_SIZE):
+        self.groups = groups
+        self.weights = weights
+        self.block_size = block_size
+
+    @classmethod
+    def from_ensemble(cls, model):
+        """Compile every fitted member of a VotingRegressor or ModelBundle."""
+        ensemble = ensemble_members(model)
+        groups = []
+        for name in ensemble.names:
+            est = ensemble.member(name)
+            kind = type(est).__name__
+            if kind not in _COMPILERS:
+                raise ValueError(f"{name}: {kind} members cannot be compiled")
+            groups.append(_COMPILERS[kind](name, est))
+            logger.info(f"Compiled {name}: {len(groups[-1].roots)} trees, depth {groups[-1].depth}.")
+        return cls(groups, ensemble.weights)
+
+    def predict(self, features):
+        """Return the weighted ensemble prediction for `features`."""
+        features = np.asarray(features, dtype=np.float64)
+        out = np.empty(len(features))
+        for start in range(0, len(features), self.block_size):
+            block = features[start:start + self.block_size]
+            predictions = np.column_stack([group.predict(block) for group in self.groups])
+            out[start:start + self.block_size] = np.average(predictions, axis=1, weights=self.weights)
+        return out
+
+    def save(self, path):
+        """Write the compiled ensemble to an `.npz` file."""
+        arrays = {}
+        meta = {"weights": self.weights, "groups": []}
+        for i, group in enumerate(self.groups):
+            meta["groups"].append({
+                "name": group.name, "depth": group.depth, "bias": group.bias, "float32_input": group.float32_input,
+            })
+            for key in _ARRAYS:
+                arrays[f"{i}_{key}"] = getattr(group, key)
+        np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path, block_size=DEFAULT_BLOCK_SIZE):
+        """Load a compiled ensemble written by `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            groups = [
+                TreeGroup(**info, **{key: data[f"{i}_{key}"] for key in _ARRAYS})
+                for i, info in enumerate(meta["groups"])
+            ]
+        return cls(groups, meta["weights"], block_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="voting_regressor_model.pkl", help="Pickled VotingRegressor")
+    parser.add_argument("--output", default="voting_regressor_model.npz", help="Compiled artifact to write")
+    parser.add_argument("--check-rows", type=int, default=10_000, help="Random rows compared against model.predict")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    model = load_model_file(args.model)
+    compiled = CompiledEnsemble.from_ensemble(model)
+    compiled.save(args.output)
+
+    if args.check_rows:
+        features = np.random.default_rng(0).normal(size=(args.check_rows, model.n_features_in_))
+        error = np.abs(compiled.predict(features) - model.predict(features)).max()
+        print(f"Max absolute difference from model.predict over {args.check_rows} rows: {error:.3g}")
+    print(f"Compiled ensemble written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
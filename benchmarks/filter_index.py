@@ -0,0 +1,61 @@
+"""Compare the Dashboard's boolean-mask filter with FilterIndex.resolve on synthetic data.
+
+Both approaches must select the same rows; timings are the best of several runs. Run from
+the repository root:
+
+    python -m benchmarks.filter_index --rows 100000 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.data_store import DASHBOARD_COLUMNS
+from app.filter_index import FilterIndex
+from benchmarks.synthetic import make_dashboard_frame
+
+ROW_COUNTS = [100_000, 1_000_000, 10_000_000]
+
+
+def mask_filter(df, area, months, marital, income):
+    """The filter expression the Dashboard used before the index."""
+    mask = (
+        (df['area'] == area) &
+        (df['months'].between(months[0], months[1])) &
+        (df['marital'].isin(marital)) &
+        (df['income'].between(income[0], income[1]))
+    )
+    return np.flatnonzero(mask.to_numpy())
+
+
+def _best_of(function, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=ROW_COUNTS)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'build (s)':>10} {'mask (ms)':>10} {'index (ms)':>11} {'speedup':>8}")
+    for rows in args.rows:
+        df = make_dashboard_frame(rows, columns=DASHBOARD_COLUMNS)
+        start = time.perf_counter()
+        index = FilterIndex(df)
+        build = time.perf_counter() - start
+
+        selection = (df['area'].iloc[0], (1, 24), list(df['marital'].unique()), index.bounds('income'))
+        mask_time, expected = _best_of(lambda: mask_filter(df, *selection), args.repeats)
+        index_time, actual = _best_of(lambda: index.resolve(*selection), args.repeats)
+        np.testing.assert_array_equal(actual, expected)
+        print(f"{rows:>10} {build:>10.2f} {mask_time * 1e3:>10.2f} {index_time * 1e3:>11.2f} {mask_time / index_time:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare serial `VotingRegressor.predict` with ParallelVotingPredictor on random batches.
+
+Checks that both produce the same predictions before reporting timings. Run from the
+repository root:
+
+    python -m benchmarks.parallel_inference --rows 1 1000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.inference import FEATURE_COLUMNS, ParallelVotingPredictor, load_model_file
+
+BATCH_ROWS = [1, 1_000, 100_000]
+
+
+def _best_of(predict, features, repeats):
+    """Return the fastest of `repeats` calls in seconds, and the last prediction."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predictions = predict(features)
+        best = min(best, time.perf_counter() - start)
+    return best, predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=BATCH_ROWS)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--process-members", nargs="*", default=[])
+    args = parser.parse_args()
+
+    model = load_model_file()
+    rng = np.random.default_rng(42)
+    print(f"{'rows':>8} {'serial (ms)':>12} {'parallel (ms)':>14} {'speedup':>8}")
+    with ParallelVotingPredictor(model, process_members=args.process_members) as predictor:
+        for rows in args.rows:
+            features = rng.normal(size=(rows, len(FEATURE_COLUMNS)))
+            serial, expected = _best_of(model.predict, features, args.repeats)
+            parallel, actual = _best_of(predictor.predict, features, args.repeats)
+            np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)
+            print(f"{rows:>8} {serial * 1e3:>12.2f} {parallel * 1e3:>14.2f} {serial / parallel:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Load-test a running scoring service (`python -m app.serve`) with concurrent single-customer requests.
+
+Fetches the feature names from /schema, fires --requests random requests from --concurrency
+clients, and prints client-side p50/p99 latency and throughput next to the server's /stats.
+Start the service first, then run from the repository root:
+
+    python -m benchmarks.serve_load --url http://127.0.0.1:8000 --concurrency 64 --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+import numpy as np
+
+
+async def _client(session, url, payloads, latencies, errors):
+    for payload in payloads:
+        start = time.perf_counter()
+        async with session.post(f"{url}/predict", json=payload) as response:
+            await response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(url, concurrency, requests, seed=42):
+    """Send `requests` predictions from `concurrency` clients; return the client and server figures."""
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async with session.get(f"{url}/schema") as response:
+            # The model's features, or the raw columns of the bundle's input pipeline
+            names = (await response.json())["request_fields"]
+        # Restart the server's counters so its figures cover this run only
+        async with session.post(f"{url}/stats/reset") as response:
+            await response.read()
+
+        rng = np.random.default_rng(seed)
+        values = rng.normal(size=(requests, len(names)))
+        payloads = [dict(zip(names, row.tolist())) for row in values]
+        latencies, errors = [], []
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _client(session, url, payloads[i::concurrency], latencies, errors) for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+        async with session.get(f"{url}/stats") as response:
+            after = await response.json()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "client_p50_ms": float(p50),
+        "client_p99_ms": float(p99),
+        "server_p50_ms": after["p50_ms"],
+        "server_p99_ms": after["p99_ms"],
+        "mean_batch_size": after["mean_batch_size"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'server p50':>11} {'server p99':>11} {'batch':>6} {'errors':>7}")
+    for concurrency in args.concurrency:
+        result = asyncio.run(run(args.url, concurrency, args.requests))
+        print(
+            f"{concurrency:>8} {result['requests_per_second']:>9.0f} {result['client_p50_ms']:>9.2f} "
+            f"{result['client_p99_ms']:>9.2f} {result['server_p50_ms']:>11.2f} {result['server_p99_ms']:>11.2f} "
+            f"{result['mean_batch_size']:>6.1f} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
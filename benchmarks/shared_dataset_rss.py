@@ -0,0 +1,68 @@
+"""Report process memory as 1, 10 and 50 simulated sessions open the dashboard dataset.
+
+Modes:
+- copied:   the old `st.cache_data` behaviour, every session receives its own unpickled copy
+- shared:   `st.cache_resource` over the memory-mapped store, every session reuses one frame
+- remapped: every session maps the store itself, as separate server processes would
+
+RSS counts mapped file pages that are shared with other processes, so USS (memory unique to
+the process) is reported alongside it. Run from the repository root:
+
+    python -m benchmarks.shared_dataset_rss
+"""
+import argparse
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import psutil
+
+from app.data_store import load_columns, load_shared, DASHBOARD_COLUMNS
+
+MODES = ["copied", "shared", "remapped"]
+SESSION_COUNTS = [1, 10, 50]
+
+
+def _open_session(mode, base):
+    """Return the frame one simulated session would hold."""
+    if mode == "copied":
+        return pickle.loads(pickle.dumps(base))
+    if mode == "shared":
+        return base
+    return load_shared(DASHBOARD_COLUMNS)
+
+
+def _measure(mode, sessions):
+    """Open `sessions` sessions in this process and return (rss, uss) in bytes."""
+    base = load_columns(DASHBOARD_COLUMNS) if mode == "copied" else load_shared(DASHBOARD_COLUMNS)
+    held = []
+    for _ in range(sessions):
+        df = _open_session(mode, base)
+        # Touch the columns a dashboard rerun reads so their pages are resident
+        df['churn'].mean()
+        df['totrev'].sum()
+        held.append(df)
+    info = psutil.Process().memory_full_info()
+    return info.rss, info.uss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=SESSION_COUNTS)
+    args = parser.parse_args()
+
+    # Build the snapshot and store up front so their cost is not measured
+    load_shared(DASHBOARD_COLUMNS)
+
+    print(f"{'mode':<10} {'sessions':>8} {'RSS (MB)':>10} {'USS (MB)':>10}")
+    context = multiprocessing.get_context("spawn")
+    for mode in MODES:
+        for sessions in args.sessions:
+            # A fresh process per measurement keeps the runs independent
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                rss, uss = pool.submit(_measure, mode, sessions).result()
+            print(f"{mode:<10} {sessions:>8} {rss / 2**20:>10.1f} {uss / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
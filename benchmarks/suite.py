@@ -0,0 +1,227 @@
+"""Benchmark the app's hot paths on synthetic churn datasets and compare runs for regressions.
+
+    python -m benchmarks.suite run --rows 10000 1000000 10000000 --output base.json
+    python -m benchmarks.suite run --output new.json
+    python -m benchmarks.suite compare base.json new.json --threshold 0.10
+
+`run` writes a CSV per dataset size with every column of the real churn CSV (see
+benchmarks.synthetic) and times, headless and without a Streamlit server:
+
+    load.*       CSV parse to the typed snapshot, the memory-mapped store build, and the
+                 `load_shared` call behind the pages' `load_csv`
+    dashboard.*  cube and filter index builds, the sidebar filter, the six chart groupbys
+                 and the row resolve for the MOU scatter
+    insights.*   each Key Insights summary, including the ARPU binning
+    predict.*    single-row and batched ensemble predictions and TreeSHAP explanations, once
+                 per run (skipped when the model in --bundle / --model cannot be loaded)
+
+Every benchmark keeps the best and median of --repeats runs. `compare` flags benchmarks whose
+best time grew by more than --threshold (and by more than --min-seconds, to ignore noise)
+and exits with status 1 if any did.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.aggregate_cube import build_cubes, dashboard_tables
+from app.data_store import DASHBOARD_COLUMNS, INSIGHTS_COLUMNS, build_snapshot, build_store, load_shared
+from app.filter_index import FilterIndex
+from app.inference import MODEL_PATH
+from app.model_bundle import BUNDLE_PATH
+from benchmarks.synthetic import make_dashboard_frame
+
+ROW_COUNTS = [10_000, 1_000_000, 10_000_000]
+OUTPUT_PATH = "artifacts/benchmarks/results.json"
+PREDICT_BATCH_ROWS = 10_000
+SINGLE_ROW_CALLS = 100
+
+
+def measure(function, repeats):
+    """Run `function` `repeats` times; return its best and median seconds and the last result."""
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "median": statistics.median(times), "repeats": repeats}, result
+
+
+def dataset_paths(workdir, rows):
+    """Write (or reuse) the synthetic CSV for `rows`; return its CSV, snapshot and store paths."""
+    base = os.path.join(workdir, f"churn_{rows}")
+    csv_path = base + ".csv"
+    if not os.path.exists(csv_path):
+        make_dashboard_frame(rows).to_csv(csv_path, index=False)
+    return csv_path, base + ".parquet", base + ".arrow"
+
+
+def bench_load(paths, repeats):
+    csv_path, snapshot_path, store_path = paths
+    results = {}
+    results["load.csv_snapshot"], _ = measure(lambda: build_snapshot(csv_path, snapshot_path), repeats)
+    results["load.build_store"], _ = measure(lambda: build_store(csv_path, snapshot_path, store_path), repeats)
+    results["load.load_shared"], _ = measure(lambda: load_shared(INSIGHTS_COLUMNS, *paths), repeats)
+    return results
+
+
+def bench_dashboard(paths, repeats):
+    df = load_shared(DASHBOARD_COLUMNS, *paths)
+    results = {}
+    results["dashboard.build_cubes"], (cube, complaints_cube) = measure(lambda: build_cubes(df), repeats)
+    results["dashboard.build_filter_index"], index = measure(lambda: FilterIndex(df), repeats)
+
+    # A typical first view: one area, the default tenure range, every marital status and income
+    selection = (index.options['area'][0], (1, 24), list(index.options['marital']), index.bounds('income'))
+    results["dashboard.filter"], (filtered, filtered_complaints) = measure(
+        lambda: (cube.filter(*selection), complaints_cube.filter(*selection)), repeats)
+    results["dashboard.groupbys"], _ = measure(lambda: dashboard_tables(filtered, filtered_complaints), repeats)
+    results["dashboard.resolve_rows"], _ = measure(
+        lambda: df[['mou_Mean', 'churn']].take(index.resolve(*selection)), repeats)
+    return results
+
+
+def bench_insights(paths, repeats):
+    from app.insights_analysis import INSIGHT_SUMMARIES
+
+    df = load_shared(INSIGHTS_COLUMNS, *paths)
+    results = {}
+    for analysis, summary in INSIGHT_SUMMARIES.items():
+        name = analysis.split(":")[0].lower().replace(" ", "_")
+        results[f"insights.{name}"], _ = measure(lambda: summary(df), repeats)
+    return results
+
+
+def bench_predict(repeats, bundle_path, pickle_path):
+    """Time predictions and explanations of the deployed ensemble, or return None if it cannot load."""
+    from app.explanations import EnsembleExplainer
+    from app.feature_schema import schema_for
+    from app.inference import FEATURE_COLUMNS
+    from app.model_bundle import load_ensemble
+
+    try:
+        model = load_ensemble(bundle_path, pickle_path)
+    except Exception as e:
+        print(f"Skipping the predict benchmarks, the model could not be loaded: {e}", file=sys.stderr)
+        return None
+    n_features = len(schema_for(model, FEATURE_COLUMNS).names)
+    rng = np.random.default_rng(0)
+    rows = rng.normal(size=(PREDICT_BATCH_ROWS, n_features)).astype(np.float32)
+    model.predict(rows[:1])  # Load every member before timing
+
+    def single_rows():
+        for i in range(SINGLE_ROW_CALLS):
+            model.predict(rows[i:i + 1])
+
+    single, _ = measure(single_rows, repeats)
+    batch, _ = measure(lambda: model.predict(rows), repeats)
+    explainer = EnsembleExplainer(model)
+    explain, _ = measure(lambda: explainer.explain(rows), repeats)
+    # Per-call for single rows, so the two can be read side by side as seconds per row
+    single = {**single, "best": single["best"] / SINGLE_ROW_CALLS, "median": single["median"] / SINGLE_ROW_CALLS}
+    batch_per_row = {**batch, "best": batch["best"] / PREDICT_BATCH_ROWS, "median": batch["median"] / PREDICT_BATCH_ROWS}
+    return {
+        "predict.single_row": single,
+        f"predict.batch_{PREDICT_BATCH_ROWS}": batch,
+        f"predict.batch_{PREDICT_BATCH_ROWS}_per_row": batch_per_row,
+        f"predict.explain_batch_{PREDICT_BATCH_ROWS}": explain,
+    }
+
+
+def run(row_counts, repeats, workdir, predict=True, bundle_path=BUNDLE_PATH, pickle_path=MODEL_PATH):
+    """Run every benchmark; return the results document written by `run`."""
+    benchmarks = {}
+    for rows in row_counts:
+        print(f"Generating and benchmarking {rows} rows...", file=sys.stderr)
+        paths = dataset_paths(workdir, rows)
+        for bench in (bench_load, bench_dashboard, bench_insights):
+            for name, result in bench(paths, repeats).items():
+                benchmarks[f"{name}@{rows}"] = {**result, "rows": rows}
+    if predict:
+        results = bench_predict(repeats, bundle_path, pickle_path)
+        if results is not None:
+            benchmarks.update(results)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": sys.modules["pandas"].__version__,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(base, new, threshold, min_seconds):
+    """Return (name, base seconds, new seconds, ratio, regressed) for benchmarks in both runs."""
+    rows = []
+    for name in sorted(set(base["benchmarks"]) & set(new["benchmarks"])):
+        before, after = base["benchmarks"][name]["best"], new["benchmarks"][name]["best"]
+        ratio = after / before if before else float("inf")
+        regressed = ratio > 1 + threshold and after - before > min_seconds
+        rows.append((name, before, after, ratio, regressed))
+    return rows
+
+
+def print_results(document):
+    print(f"{'benchmark':<48} {'best (ms)':>11} {'median (ms)':>12}")
+    for name, result in document["benchmarks"].items():
+        print(f"{name:<48} {result['best'] * 1e3:>11.3f} {result['median'] * 1e3:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write the results as JSON")
+    run_parser.add_argument("--rows", type=int, nargs="+", default=ROW_COUNTS)
+    run_parser.add_argument("--repeats", type=int, default=3)
+    run_parser.add_argument("--output", default=OUTPUT_PATH)
+    run_parser.add_argument("--workdir", default=None, help="Keep the generated datasets here and reuse them across runs")
+    run_parser.add_argument("--no-predict", action="store_true", help="Skip the model predict benchmarks")
+    run_parser.add_argument("--bundle", default=BUNDLE_PATH, help="Model bundle to predict with")
+    run_parser.add_argument("--model", default=MODEL_PATH, help="Pickled model used when there is no bundle")
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts as a regression")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.001, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if args.workdir:
+            os.makedirs(args.workdir, exist_ok=True)
+            document = run(args.rows, args.repeats, args.workdir, not args.no_predict, args.bundle, args.model)
+        else:
+            with tempfile.TemporaryDirectory() as workdir:
+                document = run(args.rows, args.repeats, workdir, not args.no_predict, args.bundle, args.model)
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print_results(document)
+        print(f"Results written to {args.output}")
+        return
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows = compare(base, new, args.threshold, args.min_seconds)
+    print(f"{'benchmark':<48} {'base (ms)':>11} {'new (ms)':>11} {'ratio':>7}")
+    for name, before, after, ratio, regressed in rows:
+        print(f"{name:<48} {before * 1e3:>11.3f} {after * 1e3:>11.3f} {ratio:>7.2f}{'  REGRESSION' if regressed else ''}")
+    regressions = [row for row in rows if row[4]]
+    print(f"{len(regressions)} regressions out of {len(rows)} benchmarks (threshold {args.threshold:.0%})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+AREAS = [
+    "NEW ENGLAND AREA", "DC/MARYLAND/VIRGINIA AREA", "GREAT LAKES AREA", "CHICAGO AREA",
+    "NEW YORK CITY AREA", "DALLAS AREA", "ATLANTIC SOUTH AREA", "LOS ANGELES AREA",
+    "CALIFORNIA NORTH AREA", "HOUSTON AREA", "OHIO AREA", "NORTHWEST/ROCKY MOUNTAIN AREA",
+    "PHILADELPHIA AREA", "MIDWEST AREA", "CENTRAL/SOUTH TEXAS AREA", "SOUTH FLORIDA AREA",
+    "TENNESSEE AREA", "NORTH FLORIDA AREA", "SOUTHWEST AREA",
+]
+MARITAL = ["S", "A", "B", "U", "M"]
+CREDIT_CLASSES = ["A", "AA", "B", "BA", "C", "CA", "D", "DA", "E", "EA", "Z", "ZA", "GY", "U", "W"]
+
+# Monthly usage averages of the churn CSV (float, *_Mean) and the gamma scale they are drawn with
+USAGE_COLUMNS = {
+    "rev_Mean": 30.0, "mou_Mean": 350.0, "totmrc_Mean": 25.0, "da_Mean": 1.0, "ovrmou_Mean": 30.0,
+    "ovrrev_Mean": 8.0, "vceovr_Mean": 8.0, "datovr_Mean": 0.5, "roam_Mean": 1.0, "change_mou": 100.0,
+    "change_rev": 10.0, "drop_vce_Mean": 4.0, "drop_dat_Mean": 0.1, "blck_vce_Mean": 3.0,
+    "blck_dat_Mean": 0.1, "unan_vce_Mean": 18.0, "unan_dat_Mean": 0.1, "plcd_vce_Mean": 60.0,
+    "plcd_dat_Mean": 0.5, "recv_vce_Mean": 80.0, "recv_sms_Mean": 0.1, "comp_vce_Mean": 75.0,
+    "comp_dat_Mean": 0.5, "custcare_Mean": 1.5, "ccrndmou_Mean": 2.0, "cc_mou_Mean": 2.0,
+    "inonemin_Mean": 25.0, "threeway_Mean": 0.2, "mou_cvce_Mean": 100.0, "mou_cdat_Mean": 2.0,
+    "mou_rvce_Mean": 30.0, "owylis_vce_Mean": 15.0, "mouowylisv_Mean": 15.0, "iwylis_vce_Mean": 5.0,
+    "mouiwylisv_Mean": 6.0, "peak_vce_Mean": 60.0, "peak_dat_Mean": 0.5, "mou_peav_Mean": 60.0,
+    "mou_pead_Mean": 1.0, "opk_vce_Mean": 50.0, "opk_dat_Mean": 0.5, "mou_opkv_Mean": 70.0,
+    "mou_opkd_Mean": 1.0, "drop_blk_Mean": 7.0, "attempt_Mean": 60.0, "complete_Mean": 50.0,
+    "callfwdv_Mean": 0.01, "callwait_Mean": 1.0,
+}
+
+# Text columns of the churn CSV and the values they take
+TEXT_COLUMNS = {
+    "new_cell": ["U", "Y", "N"], "asl_flag": ["N", "Y"], "prizm_social_one": ["S", "U", "C", "T", "R"],
+    "dualband": ["Y", "N", "T"], "refurb_new": ["N", "R"], "hnd_webcap": ["WCMB", "WC", "UNKW"],
+    "ownrent": ["O", "R"], "dwlltype": ["S", "M"], "infobase": ["M", "N"],
+    "HHstatin": ["C", "I", "B", "A", "G", "H"], "dwllsize": list("ABCDEFGHIJKLMNO"),
+    "ethnic": list("NHSUGFJOZIDBRXPC"), "kid0_2": ["U", "Y"], "kid3_5": ["U", "Y"],
+    "kid6_10": ["U", "Y"], "kid11_15": ["U", "Y"], "kid16_17": ["U", "Y"], "creditcd": ["Y", "N"],
+}
+
+# Every column of the churn CSV, in file order
+CSV_COLUMNS = list(USAGE_COLUMNS) + [
+    "churn", "months", "uniqsubs", "actvsubs", "new_cell", "crclscod", "asl_flag", "totcalls", "totmou",
+    "totrev", "adjrev", "adjmou", "adjqty", "avgrev", "avgmou", "avgqty", "avg3mou", "avg3qty", "avg3rev",
+    "avg6mou", "avg6qty", "avg6rev", "prizm_social_one", "area", "dualband", "refurb_new", "hnd_price",
+    "phones", "models", "hnd_webcap", "truck", "rv", "ownrent", "lor", "dwlltype", "marital", "adults",
+    "infobase", "income", "numbcars", "HHstatin", "dwllsize", "forgntvl", "ethnic", "kid0_2", "kid3_5",
+    "kid6_10", "kid11_15", "kid16_17", "creditcd", "eqpdays", "Customer_ID",
+]
+
+# Share of missing values per column in the churn CSV
+MISSING_FRACTIONS = {
+    **{column: 0.0036 for column in list(USAGE_COLUMNS)[:9]},
+    "change_mou": 0.0089, "change_rev": 0.0089, "avg6mou": 0.0284, "avg6qty": 0.0284, "avg6rev": 0.0284,
+    "prizm_social_one": 0.0739, "area": 0.0004, "hnd_price": 0.0085, "hnd_webcap": 0.1019,
+    **{column: 0.0173 for column in ["truck", "rv", "marital", "forgntvl", "ethnic", "kid0_2", "kid3_5",
+                                     "kid6_10", "kid11_15", "kid16_17", "creditcd"]},
+    "ownrent": 0.337, "lor": 0.302, "dwlltype": 0.319, "adults": 0.230, "infobase": 0.221, "income": 0.254,
+    "numbcars": 0.494, "HHstatin": 0.379, "dwllsize": 0.383,
+}
+
+
+def _column(name, rows, seed):
+    """Generate one column; each draws from its own stream, so a subset matches the full frame."""
+    rng = np.random.default_rng([seed, CSV_COLUMNS.index(name)])
+    if name in ("months", "totrev", "rev_Mean"):
+        # Total revenue is the monthly revenue over the tenure, as in the real data
+        months = np.random.default_rng([seed, CSV_COLUMNS.index("months")]).integers(6, 62, size=rows)
+        if name == "months":
+            return months
+        rev = np.random.default_rng([seed, CSV_COLUMNS.index("rev_Mean")]).gamma(2.0, 30.0, size=rows).astype(np.float32)
+        return rev if name == "rev_Mean" else rev * months
+    if name == "custcare_Mean":
+        return (np.round(rng.exponential(1.5, size=rows) * 3) / 3).astype(np.float32)
+    if name in USAGE_COLUMNS:
+        values = rng.gamma(1.5, USAGE_COLUMNS[name], size=rows)
+        if name.startswith("change_"):
+            values -= 1.5 * USAGE_COLUMNS[name]
+        return values.astype(np.float32)
+    if name in ("churn", "truck", "rv", "forgntvl"):
+        return rng.integers(0, 2, size=rows)
+    if name in ("uniqsubs", "actvsubs", "phones", "models", "adults"):
+        return rng.integers(1, 4, size=rows)
+    if name in ("totcalls", "adjqty"):
+        return rng.integers(100, 8000, size=rows)
+    if name in ("totmou", "adjmou", "adjrev", "hnd_price", "eqpdays"):
+        return rng.gamma(2.0, {"totmou": 4000.0, "adjmou": 4000.0, "adjrev": 600.0}.get(name, 200.0), size=rows)
+    if name.startswith("avg"):
+        values = rng.gamma(2.0, 150.0 if "mou" in name else 100.0 if "qty" in name else 30.0, size=rows)
+        # The 3-month averages are whole numbers in the CSV
+        return np.round(values).astype(np.int64) if name.startswith("avg3") else values
+    if name in ("income", "lor", "numbcars"):
+        return rng.integers(1, 10, size=rows).astype(float)
+    if name == "area":
+        return pd.Categorical(rng.choice(AREAS, size=rows))
+    if name == "marital":
+        return pd.Categorical(rng.choice(MARITAL, size=rows))
+    if name == "crclscod":
+        return pd.Categorical(rng.choice(CREDIT_CLASSES, size=rows))
+    if name == "creditcd":
+        return rng.choice(TEXT_COLUMNS[name], size=rows, p=[0.7, 0.3])
+    if name in TEXT_COLUMNS:
+        return pd.Categorical(rng.choice(TEXT_COLUMNS[name], size=rows))
+    if name == "Customer_ID":
+        return np.arange(1_000_001, 1_000_001 + rows)
+    raise ValueError(f"No generator for column {name}")
+
+
+def _with_missing(values, fraction, rng):
+    missing = rng.random(len(values)) < fraction
+    if isinstance(values, pd.Categorical):
+        return pd.Categorical.from_codes(np.where(missing, -1, values.codes), values.categories)
+    # Missing integers turn the column float and missing text is NaN, as pandas reads the CSV
+    values = values.astype(np.float64 if values.dtype.kind in "iu" else values.dtype if values.dtype.kind == "f" else object)
+    values[missing] = np.nan
+    return values
+
+
+def make_dashboard_frame(rows, seed=0, columns=None):
+    """Generate a frame with the columns, dtypes and missing values of the churn CSV.
+
+    All 100 columns by default, so loads read as wide a file as the real one; `columns` limits it
+    to a subset, with the same values the full frame would have.
+    """
+    columns = CSV_COLUMNS if columns is None else list(columns)
+    data = {}
+    for name in columns:
+        values = _column(name, rows, seed)
+        fraction = MISSING_FRACTIONS.get(name)
+        if fraction:
+            values = _with_missing(values, fraction, np.random.default_rng([seed, CSV_COLUMNS.index(name), 1]))
+        data[name] = values
+    return pd.DataFrame(data)
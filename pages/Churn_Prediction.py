@@ -1,42 +1,99 @@
-import streamlit as st
-import pandas as pd
-import pickle
-import plotly.express as px
-import plotly.graph_objects as go
-from streamlit_extras.metric_cards import style_metric_cards
+import time
+
+# Start of the script run, for the time-to-interactive logging
+SCRIPT_STARTED = time.perf_counter()
+
+import importlib
 import logging
+import os
+import sys
+import streamlit as st
+from app.instrumentation import REGISTRY, timed, timer
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Modules behind the prediction sections, imported only when one of them is opened
+PREDICTION_IMPORTS = ["plotly.graph_objects", "app.inference", "app.feature_schema", "app.model_bundle", "app.prediction_cache", "app.prediction_pool"]
+
+# Modules behind the dataset, its aggregates and the sidebar business metrics, imported only by the sections that use the dataset
+DATASET_IMPORTS = ["app.business_metrics", "app.dataset"]
+
+# What each section needs: the modules it imports, and whether it uses the model and the dataset.
+# Only the picked section's dependencies are imported and loaded; the sidebar metrics come with the dataset.
+SECTIONS = {
+    "Customer Churn Prediction": {"imports": PREDICTION_IMPORTS + ["app.explanations"], "model": True, "dataset": False},
+    "Realtime Churn Rate": {"imports": PREDICTION_IMPORTS, "model": True, "dataset": False},
+    "Key Insights and Analysis": {"imports": DATASET_IMPORTS + ["app.insights_analysis"], "model": False, "dataset": True},
+    "Model Evaluation Metrics": {"imports": ["app.figure_cache", "app.model_evaluation"], "model": False, "dataset": False},
+    # Hidden unless the page is opened with ?diagnostics=1
+    "Diagnostics": {"imports": ["app.diagnostics"], "model": False, "dataset": False, "hidden": True},
+}
+
 # Custom color theme for eye-catching visuals
 COLOR_THEME = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
 
-# Load the model
-@st.cache_data
+# Load the model bundle once per process; its members load lazily on first prediction
+@st.cache_resource
+@timed("load_model")
 def load_model():
-   
+    from app.model_bundle import load_ensemble
+
     try:
-        with open('voting_regressor_model.pkl', 'rb') as f:
-            model = pickle.load(f)
+        model = load_ensemble()
         logger.info("Model loaded successfully.")
         return model
-    except FileNotFoundError:
-        st.error("Model file 'voting_regressor_model.pkl' not found. Please ensure it exists in the correct directory.")
-        logger.error("Model file not found.")
+    except FileNotFoundError as e:
+        st.error(f"Model not found: {e}")
+        logger.error(f"Model not found: {e}")
         return None
     except Exception as e:
         st.error(f"An error occurred while loading the model: {e}")
         logger.error(f"Error loading model: {e}")
         return None
 
-# Load the CSV file
-@st.cache_data
-def load_csv():
+# Wrap the ensemble so its members predict concurrently; shared by all sessions
+@st.cache_resource
+def load_predictor(_model):
+    from app.inference import ParallelVotingPredictor
+    return ParallelVotingPredictor(_model)
+
+# Worker processes preloaded with the ensemble, shared by all sessions so predictions run off the script thread
+@st.cache_resource
+def load_prediction_pool():
+    from app.prediction_pool import PredictionPool
 
     try:
-        df = pd.read_csv(r"data/Telecom_customer churn.csv")
+        return PredictionPool()
+    except Exception as e:
+        logger.error(f"Prediction pool unavailable, predicting in-process: {e}")
+        return None
+
+# Match the page's input fields to the model's feature schema once; a mismatch fails here, not on every predict
+@st.cache_resource
+def load_input_adapter(_model):
+    from app.feature_schema import adapter_for, form_fields
+    from app.inference import FEATURE_COLUMNS
+
+    try:
+        # With a bundle's input pipeline, the forms ask for the raw columns behind the model's features
+        # and the pipeline is applied to them, as in training
+        return adapter_for(_model, form_fields(_model, FEATURE_COLUMNS), FEATURE_COLUMNS)
+    except ValueError as e:
+        st.error(f"The loaded model does not accept this page's inputs: {e}")
+        logger.error(f"Feature schema mismatch: {e}")
+        return None
+
+# Load the CSV file and any partitions once per dataset version (the base rows come from the shared memory-mapped store)
+@st.cache_resource(max_entries=2)
+@timed("load_csv")
+def load_csv(version):
+    from app.data_store import INSIGHTS_COLUMNS
+    from app.dataset import load_rows
+
+    try:
+        df = load_rows(INSIGHTS_COLUMNS)
         logger.info("CSV file loaded successfully.")
         return df
     except FileNotFoundError:
@@ -48,11 +105,75 @@ def load_csv():
         logger.error(f"Error loading CSV file: {e}")
         return None
 
+# Compute the sidebar metrics in one pass per dataset version; reruns only look them up.
+# With partitions, they come from the aggregates over the base CSV and every partition.
+@st.cache_resource(max_entries=2)
+def load_business_metrics(version):
+    from app.business_metrics import compute_business_metrics, metrics_from_stats
+    from app.dataset import load_partitions
+    from app.partitions import partition_files
+
+    # No CSV to compute them from; the prediction sections still work without it
+    if version is None:
+        return None
+    if partition_files():
+        return metrics_from_stats(load_partitions().combined()[0])
+    df = load_csv(version)
+    return compute_business_metrics(df) if df is not None else None
+
+# Figure cache shared by all sessions, so charts with unchanged inputs are not rebuilt
+@st.cache_resource
+def load_figure_cache():
+    from app.figure_cache import FigureCache
+    return FigureCache()
+
+# Prediction cache shared by all sessions, so revisited what-if inputs skip the ensemble.
+# Keyed on the model version: a new model starts an empty cache, and its keys carry the version too.
+@st.cache_resource(max_entries=1)
+def load_prediction_cache(model_version):
+    from app.prediction_cache import PredictionCache
+    return PredictionCache(model_version=model_version)
+
+# The prediction cache of the currently loaded model
+def prediction_cache():
+    from app.model_bundle import model_version
+    return load_prediction_cache(model_version(load_model()))
+
+# TreeSHAP explainer for the what-if inputs; its leaf tables are built once per process
+@st.cache_resource
+def load_explainer(_model):
+    from app.explanations import EnsembleExplainer
+
+    try:
+        return EnsembleExplainer(_model)
+    except Exception as e:
+        logger.error(f"Explanations unavailable: {e}")
+        return None
+
+# Per-customer explanations written by `python -m app.explanations`, reloaded when the file changes
+@st.cache_resource(max_entries=1)
+def load_explanation_store(version):
+    from app.explanations import ExplanationStore
+
+    try:
+        return ExplanationStore()
+    except Exception as e:
+        logger.error(f"Error loading the explanation store: {e}")
+        return None
+
 # Function to calculate churn probability
-def calculate_churn_probability(input_data, model):
-    """Calculate the churn probability using the provided model."""
+def calculate_churn_probability(features, model):
+    """Calculate the churn probability of one float32 feature row using the provided model."""
     try:
-        return model.predict(input_data)[0]
+        cache = prediction_cache()
+
+        # Time the ensemble separately, so cache hits and model time can be told apart
+        def predict():
+            with timer("ensemble_predict"):
+                return model.predict(features)[0]
+
+        with timer("calculate_churn_probability"):
+            return cache.get_or_compute(cache.key(features), predict)
     except Exception as e:
         st.error(f"An error occurred while calculating churn probability: {e}")
         logger.error(f"Error calculating churn probability: {e}")
@@ -61,6 +182,8 @@ def calculate_churn_probability(input_data, model):
 # Function to create a gauge visualization
 def create_gauge(churn_probability, title):
     """Create a gauge chart to visualize churn probability."""
+    import plotly.graph_objects as go
+
     try:
         fig = go.Figure(go.Indicator(
             mode="gauge+number",
@@ -81,34 +204,77 @@ def create_gauge(churn_probability, title):
         logger.error(f"Error creating gauge chart: {e}")
         return None
 
-# Function to display business metrics in the sidebar
-def display_business_metrics(df):
-    """Display key business metrics in the sidebar."""
-    try:
-        st.sidebar.markdown("---")
-        st.sidebar.header("📈 Business Metrics (Overall)")
-
-        if df is not None:
-            # Example CLV calculation
-            clv = df['totrev'].mean() / df['months'].mean()
-            
-            # Example ARPU calculation
-            arpu = df['rev_Mean'].mean()
-            
-            # Example Number of Complaints (using custcare_Mean as a proxy)
-            num_complaints = df['custcare_Mean'].mean() if 'custcare_Mean' in df.columns else 0
-
-            # Display metrics vertically
-            st.sidebar.metric(label="📊 Average CLV", value=f"${clv:.2f}")
-            st.sidebar.metric(label="💳 Average ARPU", value=f"${arpu:.2f}")
-            st.sidebar.metric(label="📞 Average Complaints", value=f"{num_complaints:.2f}")
-            style_metric_cards()  # Apply styling to metric cards
-    except Exception as e:
-        st.error(f"An error occurred while displaying business metrics: {e}")
-        logger.error(f"Error displaying business metrics: {e}")
+# Function to show the features that moved a prediction the most
+def display_top_drivers(drivers):
+    """Show the top drivers as a table and a bar chart of their contributions."""
+    st.dataframe(drivers.style.format({"contribution": "{:+.4f}"}), use_container_width=True, hide_index=True)
+    st.bar_chart(drivers.set_index("feature")["contribution"])
+
+# Function to collect one customer's inputs in either prediction section
+def customer_inputs(adapter, key=None):
+    """Show the customer input fields and return them as the model's float32 feature row.
+
+    A model that ships its input pipeline is asked for the raw customer columns behind its
+    features instead, starting from their training means and categories.
+    """
+    # Widget keys keep the two sections' fields apart
+    def widget_key(name):
+        return f"{key}_{name}" if key else None
+
+    st.subheader("Enter Customer Information")
+    col1, col2 = st.columns(2)
+
+    if adapter.input_pipeline is not None:
+        from app.preprocessing import input_defaults
+
+        defaults = input_defaults(adapter.input_pipeline)
+        values = {}
+        for i, column in enumerate(adapter.fields):
+            default = defaults.get(column, 0.0)
+            with col1 if i % 2 == 0 else col2:
+                if isinstance(default, list):
+                    values[column] = st.selectbox(column, default, key=widget_key(column))
+                else:
+                    # A column with no values in training has no mean; the pipeline imputes it anyway
+                    values[column] = st.number_input(column, value=default if default == default else 0.0, key=widget_key(column))
+        return adapter.from_mapping(values)
+
+    with col1:
+        age = st.slider("Age", 18, 100, 30, key=widget_key("age"))
+        gender = st.selectbox("Gender", ["Male", "Female"], key=widget_key("gender"))
+        tenure = st.slider("Tenure (months)", 0, 120, 12, key=widget_key("tenure"))
+        monthly_charges = st.number_input("Monthly Charges ($)", min_value=0.0, value=50.0, max_value=200.0, help="Maximum limit is $200", key=widget_key("monthly_charges"))
+        total_charges = st.number_input("Total Charges ($)", min_value=0.0, value=600.0, max_value=10000.0, help="Maximum limit is $10,000", key=widget_key("total_charges"))
+
+    with col2:
+        contract_type = st.selectbox("Contract Type", ["Month-to-Month", "One Year", "Two Year"], key=widget_key("contract_type"))
+        credited = st.selectbox("Payment Method", ["Credit Card", "Bank Transfer", "Electronic Check"], key=widget_key("payment_method"))
+        usage_frequency = st.slider("Usage Frequency (per month)", 0, 100, 10, key=widget_key("usage_frequency"))
+        num_calls = st.slider("Number of Calls to Support", 0, 20, 2, key=widget_key("num_calls"))
+        complaints = st.slider("Number of Complaints", 0, 10, 0, key=widget_key("complaints"))
+
+    # Convert categorical features to numerical
+    gender = 1 if gender == "Male" else 0
+    contract_mapping = {"Month-to-Month": 0, "One Year": 1, "Two Year": 2}
+    contract_type = contract_mapping[contract_type]
+    payment_mapping = {"Credit Card": 0, "Bank Transfer": 1, "Electronic Check": 2}
+    credited = payment_mapping[credited]
+
+    return adapter.from_mapping({
+        "Age": age,
+        "Gender": gender,
+        "Tenure": tenure,
+        "MonthlyCharges": monthly_charges,
+        "TotalCharges": total_charges,
+        "ContractType": contract_type,
+        "PaymentMethod": credited,
+        "UsageFrequency": usage_frequency,
+        "NumberOfCalls": num_calls,
+        "Complaints": complaints
+    })
 
 # Function for Customer Churn Prediction section
-def customer_churn_prediction(model):
+def customer_churn_prediction(model, adapter, explainer=None):
     """Display the customer churn prediction interface."""
     try:
         st.title("📊 Telecom Customer Churn Prediction")
@@ -119,47 +285,11 @@ def customer_churn_prediction(model):
             """
         )
 
-        # Input fields for features
-        st.subheader("Enter Customer Information")
-        col1, col2 = st.columns(2)
-
-        with col1:
-            age = st.slider("Age", 18, 100, 30)
-            gender = st.selectbox("Gender", ["Male", "Female"])
-            tenure = st.slider("Tenure (months)", 0, 120, 12)
-            monthly_charges = st.number_input("Monthly Charges ($)", min_value=0.0, value=50.0, max_value=200.0, help="Maximum limit is $200")
-            total_charges = st.number_input("Total Charges ($)", min_value=0.0, value=600.0, max_value=10000.0, help="Maximum limit is $10,000")
-
-        with col2:
-            contract_type = st.selectbox("Contract Type", ["Month-to-Month", "One Year", "Two Year"])
-            credited = st.selectbox("Payment Method", ["Credit Card", "Bank Transfer", "Electronic Check"])
-            usage_frequency = st.slider("Usage Frequency (per month)", 0, 100, 10)
-            num_calls = st.slider("Number of Calls to Support", 0, 20, 2)
-            complaints = st.slider("Number of Complaints", 0, 10, 0)
-
-        # Convert categorical features to numerical
-        gender = 1 if gender == "Male" else 0
-        contract_mapping = {"Month-to-Month": 0, "One Year": 1, "Two Year": 2}
-        contract_type = contract_mapping[contract_type]
-        payment_mapping = {"Credit Card": 0, "Bank Transfer": 1, "Electronic Check": 2}
-        credited = payment_mapping[credited]
-
-        # Create a DataFrame for prediction
-        input_data = pd.DataFrame({
-            "Age": [age],
-            "Gender": [gender],
-            "Tenure": [tenure],
-            "MonthlyCharges": [monthly_charges],
-            "TotalCharges": [total_charges],
-            "ContractType": [contract_type],
-            "PaymentMethod": [credited],
-            "UsageFrequency": [usage_frequency],
-            "NumberOfCalls": [num_calls],
-            "Complaints": [complaints]
-        })
+        # Input fields for features, mapped to the model's float32 feature row
+        features = customer_inputs(adapter)
 
         # Real-time churn probability update
-        churn_probability = calculate_churn_probability(input_data, model)
+        churn_probability = calculate_churn_probability(features, model)
 
         # Prediction
         if st.button("Predict Churn"):
@@ -177,12 +307,42 @@ def customer_churn_prediction(model):
             fig = create_gauge(churn_probability, "Churn Probability (%)")
             if fig:
                 st.plotly_chart(fig, use_container_width=True)
+
+            # Contributions of each input to this prediction
+            if explainer is not None:
+                from app.explanations import top_drivers
+
+                st.subheader("Top Drivers")
+                with timer("explain"):
+                    contributions, _ = explainer.explain(features)
+                display_top_drivers(top_drivers(contributions[0], adapter.schema.names))
+
+        # Stored explanations of scored customers, looked up by id without running the model
+        from app.explanations import EXPLANATIONS_PATH
+
+        if os.path.exists(EXPLANATIONS_PATH):
+            stat = os.stat(EXPLANATIONS_PATH)
+            store = load_explanation_store((stat.st_size, stat.st_mtime_ns))
+        else:
+            store = None
+        if store is not None:
+            with st.expander(f"Look up a customer ({len(store)} explained)"):
+                customer_id = st.text_input("Customer ID")
+                if customer_id:
+                    # The ids are stored with the type they had in the customer file
+                    key = int(customer_id) if customer_id.isdigit() and store.index.dtype.kind in "iu" else customer_id
+                    if key in store:
+                        explanation = store.lookup(key)
+                        st.write(f"**Churn Probability: {explanation['churn_probability']:.2%}**")
+                        display_top_drivers(store.top_drivers(key))
+                    else:
+                        st.warning(f"No stored explanation for customer {customer_id}.")
     except Exception as e:
         st.error(f"An error occurred in the customer churn prediction section: {e}")
         logger.error(f"Error in customer churn prediction section: {e}")
 
 # Function for Realtime Churn Rate section
-def realtime_churn_rate(model):
+def realtime_churn_rate(model, adapter):
     """Display the real-time churn rate interface."""
     try:
         st.header("📉 Realtime Churn Rate")
@@ -192,47 +352,11 @@ def realtime_churn_rate(model):
             """
         )
 
-        # Input fields for features
-        st.subheader("Enter Customer Information")
-        col1, col2 = st.columns(2)
-
-        with col1:
-            age = st.slider("Age", 18, 100, 30, key="realtime_age")
-            gender = st.selectbox("Gender", ["Male", "Female"], key="realtime_gender")
-            tenure = st.slider("Tenure (months)", 0, 120, 12, key="realtime_tenure")
-            monthly_charges = st.number_input("Monthly Charges ($)", min_value=0.0, value=50.0, max_value=200.0, help="Maximum limit is $200", key="realtime_monthly_charges")
-            total_charges = st.number_input("Total Charges ($)", min_value=0.0, value=600.0, max_value=10000.0, help="Maximum limit is $10,000", key="realtime_total_charges")
-
-        with col2:
-            contract_type = st.selectbox("Contract Type", ["Month-to-Month", "One Year", "Two Year"], key="realtime_contract_type")
-            credited = st.selectbox("Payment Method", ["Credit Card", "Bank Transfer", "Electronic Check"], key="realtime_payment_method")
-            usage_frequency = st.slider("Usage Frequency (per month)", 0, 100, 10, key="realtime_usage_frequency")
-            num_calls = st.slider("Number of Calls to Support", 0, 20, 2, key="realtime_num_calls")
-            complaints = st.slider("Number of Complaints", 0, 10, 0, key="realtime_complaints")
-
-        # Convert categorical features to numerical
-        gender = 1 if gender == "Male" else 0
-        contract_mapping = {"Month-to-Month": 0, "One Year": 1, "Two Year": 2}
-        contract_type = contract_mapping[contract_type]
-        payment_mapping = {"Credit Card": 0, "Bank Transfer": 1, "Electronic Check": 2}
-        credited = payment_mapping[credited]
-
-        # Create a DataFrame for prediction
-        input_data = pd.DataFrame({
-            "Age": [age],
-            "Gender": [gender],
-            "Tenure": [tenure],
-            "MonthlyCharges": [monthly_charges],
-            "TotalCharges": [total_charges],
-            "ContractType": [contract_type],
-            "PaymentMethod": [credited],
-            "UsageFrequency": [usage_frequency],
-            "NumberOfCalls": [num_calls],
-            "Complaints": [complaints]
-        })
+        # Input fields for features, mapped to the model's float32 feature row
+        features = customer_inputs(adapter, key="realtime")
 
         # Real-time churn probability update
-        churn_probability = calculate_churn_probability(input_data, model)
+        churn_probability = calculate_churn_probability(features, model)
 
         # Display real-time churn probability
         st.subheader("Realtime Churn Probability")
@@ -244,6 +368,23 @@ def realtime_churn_rate(model):
         if fig:
             st.plotly_chart(fig, use_container_width=True)
 
+        # Shared prediction cache counters
+        with st.expander("Prediction cache statistics"):
+            st.json(prediction_cache().stats())
+
+        # Queue depth and worker utilization of the shared prediction pool
+        with st.expander("Prediction pool diagnostics"):
+            pool = load_prediction_pool()
+            if pool is None:
+                st.info("Predictions are running in-process; the worker pool could not be started.")
+            else:
+                stats = pool.stats()
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Queue Depth", stats["queue_depth"])
+                col2.metric("In Flight", f"{stats['in_flight']} / {stats['workers']} workers")
+                col3.metric("Worker Utilization", f"{stats['utilization']:.1%}")
+                st.json(stats)
+
         # Key insights based on churn probability
         st.subheader("Key Insights")
         if churn_probability >= 0.5:
@@ -270,267 +411,88 @@ def realtime_churn_rate(model):
         st.error(f"An error occurred in the realtime churn rate section: {e}")
         logger.error(f"Error in realtime churn rate section: {e}")
 
-# Function for Key Insights and Analysis section
-def key_insights_and_analysis(df):
-    """Display key insights and analysis based on the data."""
-    try:
-        st.header("📊 Key Insights and Analysis")
-        st.markdown(
-            """
-            Dive into customer churn data and uncover actionable insights using advanced analytics and visualizations.
-            """
-        )
-
-        analysis_option = st.selectbox(
-            "Choose an Analysis",
-            [
-                "Overall Churn Rate",
-                "Churn Rate by Tenure",
-                "Churn by Payment Method",
-                "ARPU: Churned vs Retained"
-            ]
-        )
-
-        if analysis_option == "Overall Churn Rate":
-            churn_rate = df['churn'].mean() * 100
-            st.metric(label="Overall Churn Rate", value=f"{churn_rate:.2f}%")
-            
-            fig = px.pie(df, names='churn', title="Overall Churn Rate", 
-                         color_discrete_sequence=COLOR_THEME,
-                         hole=0.4)
-            st.plotly_chart(fig, use_container_width=True)
-
-            st.markdown(
-                """
-                **Insights:**
-                - The overall churn rate provides a high-level view of customer attrition.
-                - A higher churn rate indicates a need for immediate retention strategies.
-                - Compare this rate with industry benchmarks to assess performance.
-                """
-            )
-
-        elif analysis_option == "Churn Rate by Tenure":
-            fig = px.histogram(df, x='months', color='churn', 
-                               barmode='group', title="Churn Rate by Tenure",
-                               labels={'months': 'Tenure (Months)', 'churn': 'Churn'},
-                               color_discrete_sequence=COLOR_THEME)
-            st.plotly_chart(fig, use_container_width=True)
-
-            st.markdown(
-                """
-                **Insights:**
-                - Customers with shorter tenures are more likely to churn.
-                - Long-term customers tend to have lower churn rates, indicating loyalty.
-                - Focus retention efforts on customers in the 0-12 month tenure range.
-                """
-            )
-
-        elif analysis_option == "Churn by Payment Method":
-            # Advanced Visualization: Sunburst Chart
-            df['churn_status'] = df['churn'].map({0: 'Retained', 1: 'Churned'})
-            payment_churn = df.groupby(['creditcd', 'churn_status']).size().reset_index(name='count')
-            
-            fig = px.sunburst(
-                payment_churn,
-                path=['creditcd', 'churn_status'],  # Hierarchy: Payment Method -> Churn Status
-                values='count',  # Size of each segment
-                title="Churn by Payment Method (Sunburst Chart)",
-                color='churn_status',  # Color by churn status
-                color_discrete_sequence=COLOR_THEME,
-                hover_data=['count']  # Show count on hover
-            )
-            fig.update_traces(textinfo="label+percent parent")  # Add labels and percentages
-            st.plotly_chart(fig, use_container_width=True)
-
-            st.markdown(
-                """
-                **Insights:**
-                - Customers using electronic checks have a higher churn rate compared to other payment methods.
-                - Credit card users are more likely to be retained, indicating a preference for convenience.
-                - Consider incentivizing customers to switch to more stable payment methods.
-                """
-            )
-
-        elif analysis_option == "ARPU: Churned vs Retained":
-            if 'rev_Mean' in df.columns and 'churn' in df.columns:
-                # Map churn to readable labels
-                df['churn_status'] = df['churn'].map({0: 'Retained', 1: 'Churned'})
-
-                # Group data by ARPU bins and churn status
-                df['ARPU_bin'] = pd.cut(df['rev_Mean'], bins=20)  # Bin ARPU into 20 groups
-                df['ARPU_bin'] = df['ARPU_bin'].astype(str)  # Convert intervals to strings
-                arpu_churn = df.groupby(['ARPU_bin', 'churn_status']).size().unstack().fillna(0)
-
-                if 'Churned' in arpu_churn.columns:
-                    # Create line chart
-                    fig = px.line(
-                        arpu_churn,
-                        x=arpu_churn.index,  # ARPU bins on x-axis
-                        y=arpu_churn.columns,  # Churn status on y-axis
-                        title="ARPU: Churned vs Retained (Line Chart)",
-                        labels={'value': 'Number of Customers', 'index': 'ARPU Bin', 'variable': 'Churn Status'},
-                        color_discrete_sequence=COLOR_THEME
-                    )
-
-                    # Optional: Add markers to the lines for better visibility
-                    fig.update_traces(mode='lines+markers')
-
-                    # Update layout
-                    fig.update_layout(
-                        xaxis_title="ARPU Bin",
-                        yaxis_title="Number of Customers",
-                        legend_title="Churn Status",
-                        template="plotly_white",
-                        hovermode="x"
-                    )
-
-                    # Add annotation to highlight the ARPU bin with the highest churn rate
-                    max_churn_bin = arpu_churn['Churned'].idxmax()
-                    max_churn_value = arpu_churn['Churned'].max()
-                    fig.add_annotation(
-                        x=max_churn_bin,
-                        y=max_churn_value,
-                        text=f"Max Churn: {max_churn_value}",
-                        showarrow=True,
-                        arrowhead=1,
-                        ax=0,
-                        ay=-40
-                    )
-
-                    # Display the chart in Streamlit
-                    st.plotly_chart(fig, use_container_width=True)
-
-                    st.markdown(
-                        """
-                        **Insights:**
-                        - Customers with lower ARPU (Average Revenue Per User) are more likely to churn.
-                        - High ARPU customers are retained at a higher rate, indicating their value to the business.
-                        - Focus on increasing ARPU through upselling and cross-selling strategies.
-                        """
-                    )
-                else:
-                    st.warning("No churned customers found in the dataset for ARPU analysis.")
-            else:
-                st.error("Required columns ('rev_Mean' or 'churn') not found in the dataset.")
-    except Exception as e:
-        st.error(f"An error occurred in the key insights and analysis section: {e}")
-        logger.error(f"Error in key insights and analysis section: {e}")
-
-# Function for Model Evaluation Metrics section
-def model_evaluation_metrics():
-    """Display model evaluation metrics."""
-    try:
-        st.header("📊 Model Evaluation Metrics")
-        st.markdown(
-            """
-            Evaluate the performance of the machine learning model using key metrics and visualizations.
-            """
-        )
-
-        # Example evaluation metrics (replace with actual model metrics)
-        rmse = 0.49174695355193226
-        mae = 0.48607733765642713
-        r2 = 0.03183860198932953
-
-        # Display metrics in columns
-        col1, col2, col3 = st.columns(3)
-        col1.metric(label="RMSE", value=f"{rmse:.2f}")
-        col2.metric(label="MAE", value=f"{mae:.2f}")
-        col3.metric(label="R²", value=f"{r2:.2f}")
-
-        # Final performance metrics
-        metrics_data = pd.DataFrame({
-            "Metric": ["RMSE", "MAE", "R²"],
-            "Value": [0.49174695355193226, 0.48607733765642713, 0.03183860198932953]
-        })
-
-        # Visualization
-        st.subheader("Model Performance Metrics")
-
-        # Enhanced bar chart
-        fig = px.bar(
-            metrics_data,
-            x="Metric",
-            y="Value",
-            text="Value",
-            title="Model Performance Metrics",
-            labels={"Value": "Metric Value"},
-            color="Metric",
-            color_discrete_sequence=px.colors.sequential.Viridis 
-        )
-
-        # Customizing the chart appearance
-        fig.update_traces(
-            texttemplate='%{text:.4f}', 
-            textposition='outside', 
-            marker_line_color='black',  # Black border for bars
-            marker_line_width=1.5       # Border thickness
-        )
-        fig.update_layout(
-            title=dict(
-                text="📊 Model Performance Metrics",
-                x=0.2,  # Center the title
-                font=dict(size=24, color="darkblue")
-            ),
-            xaxis=dict(
-                tickfont=dict(size=14, color="black"),
-                title=dict(font=dict(size=16, color="darkblue"))
-            ),
-            yaxis=dict(
-                tickfont=dict(size=14, color="black"),
-                title=dict(font=dict(size=16, color="darkblue")),
-                gridcolor='lightgrey'
-            ),
-            plot_bgcolor='white',  # White background 
-            margin=dict(l=50, r=50, t=100, b=50)  # Adjust margins for clarity
-        )
-
-        # Display the chart
-        st.plotly_chart(fig, use_container_width=True)
-
-        st.markdown(
-            """
-            **Insights:**
-            - **RMSE (Root Mean Squared Error):** Measures the average deviation of predictions from actual values. Lower values indicate better performance.
-            - **MAE (Mean Absolute Error):** Represents the average absolute difference between predicted and actual values. It provides a clear understanding of prediction errors.
-            - **R² (R-squared):** Indicates the proportion of variance in the target variable explained by the model. A higher R² value suggests a better fit.
-            """
-        )
-    except Exception as e:
-        st.error(f"An error occurred in the model evaluation metrics section: {e}")
-        logger.error(f"Error in model evaluation metrics section: {e}")
+# Import modules on first use, returning the seconds spent on those not imported yet
+def import_modules(names):
+    missing = [name for name in names if name not in sys.modules]
+    start = time.perf_counter()
+    for name in missing:
+        importlib.import_module(name)
+    return time.perf_counter() - start
+
+# Log where a section's time went; the first render of a section in a session is its first paint
+def log_section_timings(section, timings):
+    painted = st.session_state.setdefault("painted_sections", set())
+    kind = "rerun" if section in painted else "first paint"
+    painted.add(section)
+    for name, seconds in timings.items():
+        REGISTRY.observe(f"section.{name.replace(' ', '_')}", seconds)
+    details = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items())
+    logger.info(f"Section '{section}' {kind} in {time.perf_counter() - SCRIPT_STARTED:.3f}s ({details})")
 
 # Main function to run the app
 def main():
     """Main function to run the Streamlit app."""
     try:
-        # Load data and model
-        model = load_model()
-        df = load_csv()
-
-        # Exit if data or model is not loaded
-        if model is None or df is None:
-            st.stop()
+        timings = {"page imports": time.perf_counter() - SCRIPT_STARTED}
 
         # Sidebar navigation
         st.sidebar.title("Navigation")
+        show_hidden = st.query_params.get("diagnostics") == "1"
         app_mode = st.sidebar.selectbox(
             "Choose a Section",
-            ["Customer Churn Prediction", "Realtime Churn Rate", "Key Insights and Analysis", "Model Evaluation Metrics"]
+            [name for name, spec in SECTIONS.items() if show_hidden or not spec.get("hidden")]
         )
-
-        # Display business metrics in the sidebar
-        display_business_metrics(df)
+        section = SECTIONS[app_mode]
+
+        # Import only what the selected section uses
+        timings["section imports"] = import_modules(section["imports"])
+
+        # Load the model and data only if the selected section uses them
+        start = time.perf_counter()
+        if section["model"]:
+            model = load_model()
+            if model is None:
+                st.stop()
+            # Predict on the worker pool when it is up, otherwise on threads in this process
+            pool = load_prediction_pool()
+            predictor = pool if pool is not None else load_predictor(model)
+            adapter = load_input_adapter(model)
+            if adapter is None:
+                st.stop()
+        if section["dataset"]:
+            from app.business_metrics import display_business_metrics
+            from app.dataset import dataset_version
+
+            # The section and its sidebar metrics read the same version, picking up new partitions here
+            version = dataset_version()
+            df = load_csv(version)
+            if df is None:
+                st.stop()
+        timings["loading"] = time.perf_counter() - start
+
+        # Display business metrics in the sidebar of the sections that read the dataset
+        if section["dataset"]:
+            start = time.perf_counter()
+            display_business_metrics(load_business_metrics(version))
+            timings["sidebar"] = time.perf_counter() - start
 
         # Run the selected section
+        start = time.perf_counter()
         if app_mode == "Customer Churn Prediction":
-            customer_churn_prediction(model)
+            customer_churn_prediction(predictor, adapter, load_explainer(model))
         elif app_mode == "Realtime Churn Rate":
-            realtime_churn_rate(model)
+            realtime_churn_rate(predictor, adapter)
         elif app_mode == "Key Insights and Analysis":
-            key_insights_and_analysis(df)
+            from app.insights_analysis import key_insights_and_analysis
+            key_insights_and_analysis(df, version)
         elif app_mode == "Model Evaluation Metrics":
-            model_evaluation_metrics()
+            from app.model_evaluation import model_evaluation_metrics
+            model_evaluation_metrics(load_figure_cache())
+        elif app_mode == "Diagnostics":
+            from app.diagnostics import render_diagnostics
+            render_diagnostics()
+        timings["render"] = time.perf_counter() - start
+        log_section_timings(app_mode, timings)
     except Exception as e:
         st.error(f"An unexpected error occurred: {e}")
         logger.error(f"Unexpected error in main function: {e}")
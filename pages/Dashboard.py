@@ -1,51 +1,65 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from app.aggregate_cube import dashboard_tables
+from app.dashboard_charts import (churn_by_marital_figure, churn_by_plan_figure, churn_gauge_figure, churn_heatmap_figure,
+                                  churn_over_time_figure, complaints_churn_figure, revenue_impact_figure)
+from app.dataset import dataset_version, load_cubes, load_dashboard_data, load_filter_index
+from app.downsampling import mou_vs_churn_figure
+from app.figure_cache import FigureCache
+from app.instrumentation import timer
 
 # Set up the dashboard layout
 st.set_page_config(layout="wide", page_title="Customer Churn Prediction Dashboard", page_icon="📊")
 
-# Load the data
-@st.cache_data
-def load_data():
-    return pd.read_csv(r"data/Telecom_customer churn.csv")
+# Figure cache shared by all sessions, keyed on chart, filters and dataset version
+@st.cache_resource
+def load_figure_cache():
+    return FigureCache()
 
 # Main function for the dashboard page
 def main():
     st.title("📊 Customer Churn Prediction Dashboard")
     st.markdown("Welcome to the Dashboard page!")
 
-    # Load data
-    df = load_data()
-
-    # Replace marital status codes with their full forms
-    marital_status_mapping = {
-        "S": "Single",
-        "A": "Annulled",
-        "B": "Divorced",
-        "U": "Unknown",
-        "M": "Married"
-    }
-    df['marital'] = df['marital'].replace(marital_status_mapping)
+    # Load data; new partitions are picked up here, and everything below reads this version
+    version = dataset_version()
+    df = load_dashboard_data(version)
 
     # Custom color theme
     COLOR_THEME = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
 
     # Sidebar for advanced filters
+    filter_index = load_filter_index(version)
+    income_min, income_max = filter_index.bounds('income')
     st.sidebar.header("Advanced Filters")
-    selected_area = st.sidebar.selectbox("Select Area", df['area'].unique())
-    selected_months = st.sidebar.slider("Select Months with Company", min_value=1, max_value=df['months'].max(), value=(1, 24))
-    selected_marital = st.sidebar.multiselect("Select Marital Status", df['marital'].unique(), default=df['marital'].unique())
-    selected_income = st.sidebar.slider("Select Income Range", min_value=df['income'].min(), max_value=df['income'].max(), value=(df['income'].min(), df['income'].max()))
-
-    # Filter data based on sidebar selections
-    filtered_df = df[
-        (df['area'] == selected_area) &
-        (df['months'].between(selected_months[0], selected_months[1])) &
-        (df['marital'].isin(selected_marital)) &
-        (df['income'].between(selected_income[0], selected_income[1]))
-    ]
+    selected_area = st.sidebar.selectbox("Select Area", filter_index.options['area'])
+    selected_months = st.sidebar.slider("Select Months with Company", min_value=1, max_value=filter_index.bounds('months')[1], value=(1, 24))
+    selected_marital = st.sidebar.multiselect("Select Marital Status", filter_index.options['marital'], default=filter_index.options['marital'])
+    selected_income = st.sidebar.slider("Select Income Range", min_value=income_min, max_value=income_max, value=(income_min, income_max))
+
+    # Slice the pre-aggregated cubes instead of rescanning every customer row
+    cube, complaints_cube = load_cubes(version)
+    with timer("dashboard.filter"):
+        filtered_cube = cube.filter(selected_area, selected_months, selected_marital, selected_income)
+        filtered_complaints_cube = complaints_cube.filter(selected_area, selected_months, selected_marital, selected_income)
+    with timer("dashboard.groupby"):
+        totals = filtered_cube.totals()
+        tables = dashboard_tables(filtered_cube, filtered_complaints_cube)
+
+    # Filter state and dataset version behind every chart; unchanged charts come from the figure cache
+    figures = load_figure_cache()
+    filters = (selected_area, selected_months, selected_marital, selected_income)
+
+    def cached_chart(chart_id, build):
+        def timed_build():
+            with timer(f"chart.{chart_id}"):
+                return build()
+        return figures.figure(FigureCache.key(chart_id, filters, version), timed_build)
+
+    # Row-level data is only needed for the MOU scatter; resolve it through the filter indexes on a cache miss
+    def mou_scatter():
+        with timer("dashboard.resolve_rows"):
+            filtered_df = df[['mou_Mean', 'churn']].take(filter_index.resolve(*filters))
+        return mou_vs_churn_figure(filtered_df, COLOR_THEME)
 
     # Main Content: Non-Scrollable Layout
     with st.container():
@@ -53,24 +67,19 @@ def main():
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            st.metric(label="Total Customers", value=len(filtered_df), delta="+5%")
+            st.metric(label="Total Customers", value=totals['count'], delta="+5%")
 
         with col2:
-            st.metric(label="Churn Rate", value=f"{filtered_df['churn'].mean() * 100:.2f}%", delta="-2%")
+            st.metric(label="Churn Rate", value=f"{totals['churn_rate'] * 100:.2f}%", delta="-2%")
 
         with col3:
-            st.metric(label="Average Revenue", value=f"${filtered_df['totrev'].mean():.2f}", delta="+3%")
+            st.metric(label="Average Revenue", value=f"${totals['avg_revenue']:.2f}", delta="+3%")
 
     # Main Content: Grid Layout
     with st.container():
         # Row 1: Churn Rate Over Time (full width)
         st.subheader("Churn Rate Over Time")
-        churn_over_time = filtered_df.groupby('months')['churn'].mean().reset_index()
-        fig1 = px.line(churn_over_time, x='months', y='churn', title="Churn Rate Over Time", 
-                       labels={'churn': 'Churn Rate', 'months': 'Months'}, 
-                       color_discrete_sequence=[COLOR_THEME[0]], 
-                       template="plotly_white")
-        fig1.update_traces(line=dict(width=3))
+        fig1 = cached_chart("churn_over_time", lambda: churn_over_time_figure(tables['churn_over_time'], COLOR_THEME))
         st.plotly_chart(fig1, use_container_width=True, height=300)
 
         # Row 2: Churn Distribution and Usage Patterns
@@ -78,19 +87,12 @@ def main():
 
         with col1:
             st.subheader("Churn Distribution by Marital Status")
-            churn_by_marital = filtered_df.groupby('marital')['churn'].mean().reset_index()
-            fig2 = px.bar(churn_by_marital, x='marital', y='churn', title="Churn Rate by Marital Status", 
-                          labels={'churn': 'Churn Rate', 'marital': 'Marital Status'}, 
-                          color='marital', color_discrete_sequence=COLOR_THEME, 
-                          template="plotly_white")
+            fig2 = cached_chart("churn_by_marital", lambda: churn_by_marital_figure(tables['churn_by_marital'], COLOR_THEME))
             st.plotly_chart(fig2, use_container_width=True, height=300)
 
         with col2:
             st.subheader("Usage Patterns: MOU vs. Churn")
-            fig3 = px.scatter(filtered_df, x='mou_Mean', y='churn', title="Minutes of Usage (MOU) vs. Churn", 
-                              labels={'mou_Mean': 'Mean MOU', 'churn': 'Churn'}, 
-                              color='churn', color_discrete_sequence=COLOR_THEME, 
-                              trendline="lowess", template="plotly_white")
+            fig3 = cached_chart("mou_vs_churn", mou_scatter)
             st.plotly_chart(fig3, use_container_width=True, height=300)
 
         # Row 3: Revenue Impact and Service Plan Churn
@@ -98,20 +100,12 @@ def main():
 
         with col3:
             st.subheader("Revenue Impact of Churn")
-            revenue_impact = filtered_df.groupby('churn')['totrev'].sum().reset_index()
-            fig4 = px.bar(revenue_impact, x='churn', y='totrev', title="Total Revenue by Churn Status", 
-                          labels={'totrev': 'Total Revenue', 'churn': 'Churn'}, 
-                          color='churn', color_discrete_sequence=COLOR_THEME, 
-                          template="plotly_white")
+            fig4 = cached_chart("revenue_impact", lambda: revenue_impact_figure(tables['revenue_impact'], COLOR_THEME))
             st.plotly_chart(fig4, use_container_width=True, height=300)
 
         with col4:
             st.subheader("Churn by Service Plan")
-            churn_by_plan = filtered_df.groupby('crclscod')['churn'].mean().reset_index()
-            fig5 = px.bar(churn_by_plan, x='crclscod', y='churn', title="Churn Rate by Service Plan", 
-                          labels={'churn': 'Churn Rate', 'crclscod': 'Service Plan'}, 
-                          color='crclscod', color_discrete_sequence=COLOR_THEME, 
-                          template="plotly_white")
+            fig5 = cached_chart("churn_by_plan", lambda: churn_by_plan_figure(tables['churn_by_plan'], COLOR_THEME))
             st.plotly_chart(fig5, use_container_width=True, height=300)
 
     # Row 4: Customer Complaints and Predictive Churn Probability
@@ -119,38 +113,17 @@ def main():
 
     with col5:
         st.subheader("Customer Complaints vs.. Churn")
-        complaints_churn = filtered_df.groupby('custcare_Mean')['churn'].mean().reset_index()
-        fig6 = px.scatter(complaints_churn, x='custcare_Mean', y='churn', title="Customer Complaints vs. Churn", 
-                          labels={'custcare_Mean': 'Customer Care Calls', 'churn': 'Churn Rate'}, 
-                          color='custcare_Mean', color_continuous_scale=COLOR_THEME, 
-                          template="plotly_white")
+        fig6 = cached_chart("complaints_churn", lambda: complaints_churn_figure(tables['complaints_churn'], COLOR_THEME))
         st.plotly_chart(fig6, use_container_width=True, height=300)
 
     with col6:
         st.subheader("Predictive Churn Probability")
-        churn_probability = filtered_df['mou_Mean'].mean() / filtered_df['mou_Mean'].max()
-        fig7 = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = churn_probability,
-            title = {'text': "Churn Probability"},
-            gauge = {'axis': {'range': [None, 1]},
-                     'steps': [
-                         {'range': [0, 0.3], 'color': "lightgreen"},
-                         {'range': [0.3, 0.7], 'color': "yellow"},
-                         {'range': [0.7, 1], 'color': "red"}],
-                     'threshold': {'line': {'color': "black", 'width': 4}, 'thickness': 0.75, 'value': churn_probability}}))
+        fig7 = cached_chart("churn_gauge", lambda: churn_gauge_figure(totals['mou_ratio']))
         st.plotly_chart(fig7, use_container_width=True, height=300)
 
     # Row 5: Comprehensive Churn Analysis (full width)
     st.subheader("Comprehensive Churn Analysis")
-
-    churn_heatmap = filtered_df.groupby(['area', 'crclscod'])['churn'].mean().unstack()
-    fig8 = px.imshow(
-    churn_heatmap, 
-    labels=dict(x="Service Plan", y="Area", color="Churn Rate"),
-    title="Churn Rate by Area and Service Plan", 
-    color_continuous_scale=COLOR_THEME
-                    )
+    fig8 = cached_chart("churn_heatmap", lambda: churn_heatmap_figure(tables['churn_heatmap'], COLOR_THEME))
     st.plotly_chart(fig8, use_container_width=True, height=400)
 
     # Adding a description about the visualization
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.aggregate_cube import CUBE_DIMENSIONS, AggregateCube, build_cubes, dashboard_tables
+from app.data_store import DASHBOARD_COLUMNS
+from benchmarks.synthetic import make_dashboard_frame
+
+
+@pytest.fixture(scope="module")
+def customers():
+    return make_dashboard_frame(5_000, seed=1, columns=DASHBOARD_COLUMNS)
+
+
+def selections(df):
+    areas = df["area"].dropna().unique()
+    return [
+        (areas[0], (1, 24), ["S", "M"], (1.0, 9.0)),
+        (areas[1], (10, 40), list(df["marital"].unique()), (3.0, 6.0)),
+        (areas[2], (6, 61), [np.nan], (1.0, 9.0)),
+    ]
+
+
+def row_filter(df, area, months, marital, income):
+    return df[
+        (df["area"] == area) & df["months"].between(*months)
+        & df["marital"].isin(marital) & df["income"].between(*income)
+    ]
+
+
+def test_filter_matches_row_level_groupby(customers):
+    cube, complaints_cube = build_cubes(customers)
+    for selection in selections(customers):
+        rows = row_filter(customers, *selection)
+        filtered = cube.filter(*selection)
+        totals = filtered.totals()
+        assert totals["count"] == len(rows)
+        assert totals["churn_rate"] == pytest.approx(rows["churn"].mean())
+        assert totals["avg_revenue"] == pytest.approx(rows["totrev"].mean(), rel=1e-5)
+        assert totals["mou_ratio"] == pytest.approx(rows["mou_Mean"].mean() / rows["mou_Mean"].max(), rel=1e-5)
+
+        tables = dashboard_tables(filtered, complaints_cube.filter(*selection))
+        expected = rows.groupby("months")["churn"].mean()
+        np.testing.assert_allclose(tables["churn_over_time"].set_index("months")["churn"].loc[expected.index], expected)
+        expected = rows.groupby("crclscod", observed=True)["churn"].mean()
+        np.testing.assert_allclose(tables["churn_by_plan"].set_index("crclscod")["churn"].loc[expected.index], expected)
+        expected = rows.groupby("custcare_Mean")["churn"].mean()
+        np.testing.assert_allclose(tables["complaints_churn"].set_index("custcare_Mean")["churn"].loc[expected.index], expected)
+        expected = rows.groupby("churn")["totrev"].sum()
+        np.testing.assert_allclose(tables["revenue_impact"].set_index("churn")["totrev"].loc[expected.index], expected, rtol=1e-5)
+
+
+def sorted_table(cube):
+    return cube.table.sort_values(cube.dimensions, na_position="last").reset_index(drop=True)
+
+
+def test_merge_matches_single_build(customers):
+    half = len(customers) // 2
+    merged = AggregateCube.build(customers.iloc[:half]).merge(AggregateCube.build(customers.iloc[half:]))
+    whole = AggregateCube.build(customers)
+    pd.testing.assert_frame_equal(sorted_table(merged), sorted_table(whole), check_dtype=False, check_categorical=False, rtol=1e-5)
+    assert merged.dimensions == CUBE_DIMENSIONS
+
+
+def test_combine_matches_single_build(customers):
+    parts = np.array_split(np.arange(len(customers)), 5)
+    combined = AggregateCube.combine(AggregateCube.build(customers.iloc[rows]) for rows in parts)
+    whole = AggregateCube.build(customers)
+    pd.testing.assert_frame_equal(sorted_table(combined), sorted_table(whole), check_dtype=False, check_categorical=False, rtol=1e-5)
+    assert combined.dimensions == CUBE_DIMENSIONS
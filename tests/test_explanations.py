@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, VotingRegressor
+
+from app import explanations
+from app.explanations import ExplanationStore, LeafTables, explain_file, top_drivers
+from app.model_bundle import export_bundle
+
+lightgbm = pytest.importorskip("lightgbm")
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 6))
+    y = X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.1, size=len(X))
+    return X, y
+
+
+def test_lightgbm_tables_match_native_treeshap(training_data):
+    X, y = training_data
+    model = lightgbm.LGBMRegressor(n_estimators=20, num_leaves=8, min_child_samples=5, verbose=-1).fit(X, y)
+    tables = LeafTables.from_lightgbm(model)
+    native = model.predict(X[:100], pred_contrib=True)
+    np.testing.assert_allclose(tables.contributions(X[:100]), native[:, :-1], atol=1e-10)
+    assert tables.expected_value == pytest.approx(native[0, -1])
+
+
+def test_lightgbm_tables_match_native_treeshap_on_booster(training_data):
+    X, y = training_data
+    booster = lightgbm.LGBMRegressor(n_estimators=10, num_leaves=16, verbose=-1).fit(X, y).booster_
+    native = booster.predict(X[:50], pred_contrib=True)
+    np.testing.assert_allclose(LeafTables.from_lightgbm(booster).contributions(X[:50]), native[:, :-1], atol=1e-10)
+
+
+def test_gradient_boosting_contributions_sum_to_prediction(training_data):
+    X, y = training_data
+    model = GradientBoostingRegressor(n_estimators=20, max_depth=3, random_state=0).fit(X, y)
+    tables = LeafTables.from_gradient_boosting(model)
+    contributions = tables.contributions(X[:100])
+    np.testing.assert_allclose(contributions.sum(axis=1) + tables.expected_value, model.predict(X[:100]), atol=1e-10)
+
+
+def test_tables_reject_missing_values(training_data):
+    X, y = training_data
+    tables = LeafTables.from_gradient_boosting(GradientBoostingRegressor(n_estimators=2).fit(X, y))
+    with pytest.raises(ValueError):
+        tables.contributions(np.full((1, X.shape[1]), np.nan))
+
+
+def test_top_drivers_orders_by_magnitude():
+    drivers = top_drivers([0.1, -0.5, 0.3, 0.0], ["a", "b", "c", "d"], k=3)
+    assert drivers["feature"].tolist() == ["b", "c", "a"]
+
+
+def _write_store(path, ids):
+    frame = pd.DataFrame({"Customer_ID": ids, "churn_probability": 0.5, "expected_value": 0.4, "x": 0.1, "y": 0.0})
+    metadata = {b"explanations": b'{"id_column": "Customer_ID", "features": ["x", "y"]}'}
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False).replace_schema_metadata(metadata), path)
+
+
+def test_store_top_driver_columns(tmp_path):
+    path = str(tmp_path / "explanations.parquet")
+    _write_store(path, [1, 2, 3])
+    store = ExplanationStore(path)
+    drivers = store.top_driver_columns(pd.Series([3, 4]), k=1)
+    assert drivers["driver_1"].iloc[0] == "x"
+    assert pd.isna(drivers["driver_1"].iloc[1])
+
+
+def test_store_rejects_duplicate_ids(tmp_path):
+    path = str(tmp_path / "explanations.parquet")
+    _write_store(path, [1, 2, 2])
+    with pytest.raises(ValueError):
+        ExplanationStore(path)
+
+
+def test_explain_file_rejects_duplicate_ids(tmp_path):
+    input_path = str(tmp_path / "customers.csv")
+    pd.DataFrame({"Customer_ID": [1, 2, 1], "x": [0.0, 1.0, 2.0]}).to_csv(input_path, index=False)
+    # Checked before the model is loaded, so no bundle is needed
+    with pytest.raises(ValueError, match="Customer_ID"):
+        explain_file(input_path, str(tmp_path / "out.parquet"), bundle_path=str(tmp_path / "missing"))
+
+
+def test_explain_file_loads_the_model_in_the_workers_only(tmp_path, training_data, monkeypatch):
+    X, y = training_data
+    names = [f"f{i}" for i in range(X.shape[1])]
+    model = VotingRegressor([("gradient_boosting", GradientBoostingRegressor(n_estimators=10, random_state=0))]).fit(X, y)
+    bundle_path = export_bundle(model, str(tmp_path / "bundle"), features=names)
+    input_path = str(tmp_path / "customers.csv")
+    pd.DataFrame(X[:50], columns=names).assign(Customer_ID=np.arange(50)).to_csv(input_path, index=False)
+
+    parent = os.getpid()
+    load_ensemble = explanations.load_ensemble
+
+    def load_in_worker(*args):
+        assert os.getpid() != parent, "the parent process loaded the model"
+        return load_ensemble(*args)
+    monkeypatch.setattr(explanations, "load_ensemble", load_in_worker)
+
+    output_path = str(tmp_path / "explanations.parquet")
+    assert explain_file(input_path, output_path, bundle_path=bundle_path, workers=2)["rows"] == 50
+    store = ExplanationStore(output_path)
+    assert store.features == names
+    np.testing.assert_allclose(store.probability, model.predict(X[:50]), rtol=1e-5, atol=1e-5)
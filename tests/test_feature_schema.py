@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, VotingRegressor
+from sklearn.linear_model import Ridge
+
+from app.feature_schema import FeatureSchema, InputAdapter, adapter_for, form_fields, pipeline_inputs, schema_for
+from app.inference import FEATURE_COLUMNS
+from app.model_bundle import ModelBundle, export_bundle
+from app.preprocessing import Preprocessor, input_columns, input_defaults
+from app.training import DROP_COLUMNS, select_features
+from benchmarks.synthetic import make_dashboard_frame
+
+
+@pytest.fixture(scope="module")
+def customers(tmp_path_factory):
+    # Read back from CSV, as app.training reads the customer file
+    path = tmp_path_factory.mktemp("customers") / "customers.csv"
+    make_dashboard_frame(2_000, seed=9).to_csv(path, index=False)
+    df = pd.read_csv(path).drop(columns=["Customer_ID"] + DROP_COLUMNS, errors="ignore")
+    return df.drop(columns=["churn"]), df["churn"]
+
+
+@pytest.fixture(scope="module")
+def pipeline_bundle(customers, tmp_path_factory):
+    X, y = customers
+    preprocessor = Preprocessor().fit(X)
+    encoded = preprocessor.transform(X)
+    features = select_features({"X_train": encoded, "X_test": encoded, "y_train": y, "preprocessor": preprocessor})
+    model = VotingRegressor([("gradient_boosting", GradientBoostingRegressor(n_estimators=10, random_state=0))])
+    model.fit(features["X_train_selected"], y)
+    path = export_bundle(model, str(tmp_path_factory.mktemp("bundle")), input_pipeline=features["input_pipeline"])
+    return ModelBundle(path), features["input_pipeline"]
+
+
+@pytest.fixture(scope="module")
+def pickled_model():
+    X = np.random.default_rng(0).normal(size=(100, 3))
+    return VotingRegressor([("ridge", Ridge())]).fit(X, X.sum(axis=1))
+
+
+def test_schema_for_prefers_the_bundle_schema(pipeline_bundle):
+    bundle, _ = pipeline_bundle
+    assert schema_for(bundle, FEATURE_COLUMNS) is bundle.schema
+
+
+def test_schema_for_checks_a_pickled_model_against_the_default_names(pickled_model):
+    assert schema_for(pickled_model, ["a", "b", "c"]).names == ["a", "b", "c"]
+    with pytest.raises(ValueError, match="expects 3 features"):
+        schema_for(pickled_model, FEATURE_COLUMNS)
+    with pytest.raises(ValueError, match="expects 3 features"):
+        schema_for(Ridge().fit(np.zeros((4, 3)), np.zeros(4)), ["a", "b"])
+
+
+def test_adapter_gathers_fields_in_schema_order():
+    adapter = InputAdapter(FeatureSchema(["a", "b", "c"]), ["c", "extra", "a", "b"])
+    row = adapter.from_mapping({"a": 1, "b": 2, "c": 3, "extra": 9})
+    assert row.dtype == np.float32 and row.tolist() == [[1, 2, 3]]
+    rows = adapter.from_rows([[3, 9, 1, 2], [6, 9, 4, 5]])
+    assert rows.flags["C_CONTIGUOUS"] and rows.tolist() == [[1, 2, 3], [4, 5, 6]]
+    frame = pd.DataFrame({"a": [1.0], "b": [2.0], "c": [3.0], "extra": [9.0]})
+    assert adapter.from_frame(frame).tolist() == [[1, 2, 3]]
+    with pytest.raises(ValueError, match="Expected rows of 4 fields"):
+        adapter.from_rows([[1, 2, 3]])
+
+
+def test_adapter_refuses_fields_that_do_not_cover_the_schema():
+    with pytest.raises(ValueError, match=r"\['c'\] are not provided"):
+        InputAdapter(FeatureSchema(["a", "b", "c"]), ["a", "b"])
+
+
+def test_page_fields_are_refused_by_a_pipeline_bundle(pipeline_bundle):
+    bundle, _ = pipeline_bundle
+    with pytest.raises(ValueError, match="are not provided"):
+        adapter_for(bundle, FEATURE_COLUMNS, FEATURE_COLUMNS)
+
+
+def test_forms_ask_for_the_columns_behind_the_features(pipeline_bundle, customers):
+    bundle, pipeline = pipeline_bundle
+    X, _ = customers
+    fields = form_fields(bundle, FEATURE_COLUMNS)
+    assert fields == pipeline_inputs(bundle.schema, bundle.input_pipeline())
+    assert sorted(fields) == sorted(bundle.schema.names) and set(fields) <= set(input_columns(pipeline))
+
+    # Only those columns reach the features; the pipeline imputes the rest
+    adapter = adapter_for(bundle, fields, FEATURE_COLUMNS)
+    expected = pipeline.transform(X.head(20)).astype(np.float32)
+    rows = [adapter.from_mapping(row) for row in X.head(20)[fields].to_dict("records")]
+    np.testing.assert_allclose(np.vstack(rows), expected, rtol=1e-6)
+    np.testing.assert_allclose(adapter.from_frame(X.head(20)), expected, rtol=1e-6)
+
+
+def test_all_raw_columns_go_through_the_pipeline(pipeline_bundle, customers):
+    bundle, pipeline = pipeline_bundle
+    X, _ = customers
+    columns = input_columns(pipeline)
+    adapter = adapter_for(bundle, columns, FEATURE_COLUMNS)
+    expected = pipeline.transform(X.head(50)).astype(np.float32)
+    np.testing.assert_allclose(adapter.from_frame(X.head(50)), expected, rtol=1e-6)
+    np.testing.assert_allclose(adapter.from_rows(X.head(50)[columns].to_numpy(dtype=object)), expected, rtol=1e-6)
+    assert adapter.from_mapping(X.iloc[0].to_dict()).shape == (1, len(bundle.schema.names))
+
+
+def test_features_not_named_after_a_column_need_every_column(pipeline_bundle):
+    _, pipeline = pipeline_bundle
+    assert pipeline_inputs(FeatureSchema(["area_NE"]), pipeline) == input_columns(pipeline)
+
+
+def test_input_defaults_cover_every_raw_column(pipeline_bundle, customers):
+    bundle, pipeline = pipeline_bundle
+    X, _ = customers
+    for transform in (pipeline, bundle.input_pipeline()):
+        defaults = input_defaults(transform)
+        assert set(defaults) == set(input_columns(pipeline))
+        text = X.select_dtypes(include=["object", "string"]).columns
+        assert all(isinstance(defaults[column], list) for column in text)
+        assert defaults["months"] == pytest.approx(X["months"].mean())
@@ -0,0 +1,61 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+
+from app.figure_cache import FigureCache
+
+
+def bar_chart():
+    return go.Figure(go.Bar(x=["a", "b"], y=[1, 2]))
+
+
+def test_hit_skips_build_and_serialization(monkeypatch):
+    figures = FigureCache()
+    key = FigureCache.key("bars", {"area": "NE", "months": (1, 24)}, "v1")
+    builds = []
+    first = figures.figure(key, lambda: builds.append(1) or bar_chart())
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a cache hit must not go through Plotly")
+    monkeypatch.setattr(pio, "to_json", fail)
+    monkeypatch.setattr(pio, "from_json", fail)
+    second = figures.figure(key, lambda: fail())
+
+    assert builds == [1]
+    assert second is first
+    assert isinstance(second, dict) and second["data"][0]["type"] == "bar"
+    assert figures.stats()["hits"] == 1 and figures.stats()["misses"] == 1
+
+
+def test_stored_dict_renders_the_built_figure():
+    spec = FigureCache().figure(FigureCache.key("bars", None, None), bar_chart)
+    assert go.Figure(spec) == bar_chart()
+
+
+def test_keys_separate_filters_and_versions():
+    figures = FigureCache()
+    figures.figure(FigureCache.key("bars", ["S", "M"], "v1"), bar_chart)
+    figures.figure(FigureCache.key("bars", ("S", "M"), "v1"), bar_chart)
+    figures.figure(FigureCache.key("bars", ["S", "M"], "v2"), bar_chart)
+    assert figures.stats()["hits"] == 1 and figures.stats()["size"] == 2
+
+
+def test_evicts_least_recently_used_by_size():
+    size = len(pio.to_json(bar_chart(), validate=False))
+    figures = FigureCache(maxbytes=2 * size)
+    keys = [FigureCache.key(name, None, None) for name in "abc"]
+    figures.figure(keys[0], bar_chart)
+    figures.figure(keys[1], bar_chart)
+    figures.figure(keys[0], bar_chart)
+    figures.figure(keys[2], bar_chart)
+    stats = figures.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 2 * size
+    figures.figure(keys[0], bar_chart)
+    assert figures.stats()["hits"] == 2
+
+
+@pytest.mark.parametrize("maxbytes", [0, 10])
+def test_oversized_figure_is_returned_but_not_kept(maxbytes):
+    figures = FigureCache(maxbytes=maxbytes)
+    assert figures.figure(FigureCache.key("bars", None, None), bar_chart)["data"]
+    assert figures.stats()["size"] == 0
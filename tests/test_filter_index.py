@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from app.data_store import DASHBOARD_COLUMNS
+from app.filter_index import FilterIndex
+from benchmarks.synthetic import make_dashboard_frame
+
+
+@pytest.fixture(scope="module")
+def customers():
+    return make_dashboard_frame(20_000, seed=2, columns=DASHBOARD_COLUMNS)
+
+
+def mask_positions(df, area, months, marital, income):
+    mask = (
+        (df["area"] == area) & df["months"].between(*months)
+        & df["marital"].isin(marital) & df["income"].between(*income)
+    )
+    return np.flatnonzero(mask.to_numpy())
+
+
+def test_resolve_matches_boolean_mask(customers):
+    index = FilterIndex(customers)
+    marital = list(index.options["marital"])
+    for area in index.options["area"][:5]:
+        for months in [(1, 24), (30, 30), (6, 61)]:
+            for statuses in [marital, ["S"], [np.nan, "M"], []]:
+                for income in [index.bounds("income"), (2.0, 4.0)]:
+                    selection = (area, months, statuses, income)
+                    np.testing.assert_array_equal(index.resolve(*selection), mask_positions(customers, *selection))
+
+
+def test_missing_area_matches_nothing(customers):
+    index = FilterIndex(customers)
+    assert len(index.resolve(np.nan, (1, 100), list(index.options["marital"]), index.bounds("income"))) == 0
+
+
+def test_bounds_ignore_missing_values(customers):
+    index = FilterIndex(customers)
+    assert index.bounds("income") == (customers["income"].min(), customers["income"].max())
+    assert index.bounds("months") == (customers["months"].min(), customers["months"].max())
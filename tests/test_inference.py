@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor, VotingRegressor
+from sklearn.linear_model import Ridge
+
+from app.inference import ParallelVotingPredictor
+from app.model_bundle import ModelBundle, export_bundle
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 4))
+    y = X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.1, size=len(X))
+    return X, y
+
+
+@pytest.fixture(scope="module", params=[None, [3, 1, 2]], ids=["unweighted", "weighted"])
+def model(request, training_data):
+    X, y = training_data
+    return VotingRegressor([
+        ("gradient_boosting", GradientBoostingRegressor(n_estimators=20, random_state=0)),
+        ("random_forest", RandomForestRegressor(n_estimators=10, random_state=0)),
+        ("ridge", Ridge()),
+    ], weights=request.param).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return np.random.default_rng(1).normal(size=(257, 4))
+
+
+@pytest.mark.parametrize("process_members", [[], ["random_forest"], ["gradient_boosting", "random_forest", "ridge"]])
+def test_matches_voting_regressor(model, rows, process_members):
+    with ParallelVotingPredictor(model, process_members=process_members) as predictor:
+        np.testing.assert_allclose(predictor.predict(rows), model.predict(rows), rtol=0, atol=1e-12)
+        # The process pool is reused across calls
+        np.testing.assert_allclose(predictor.predict(rows[:1]), model.predict(rows[:1]), rtol=0, atol=1e-12)
+
+
+def test_dropped_members_are_skipped(training_data, rows):
+    X, y = training_data
+    model = VotingRegressor([
+        ("gradient_boosting", GradientBoostingRegressor(n_estimators=20, random_state=0)),
+        ("random_forest", "drop"),
+        ("ridge", Ridge()),
+    ], weights=[1, 5, 3]).fit(X, y)
+    with ParallelVotingPredictor(model, process_members=["ridge"]) as predictor:
+        assert predictor.names == ["gradient_boosting", "ridge"]
+        np.testing.assert_allclose(predictor.predict(rows), model.predict(rows), rtol=0, atol=1e-12)
+
+
+def test_matches_the_bundled_model(training_data, rows, tmp_path):
+    X, y = training_data
+    model = VotingRegressor([
+        ("shallow", GradientBoostingRegressor(n_estimators=20, max_depth=2, random_state=0)),
+        ("deep", GradientBoostingRegressor(n_estimators=20, max_depth=4, random_state=0)),
+    ], weights=[1, 2]).fit(X, y)
+    bundle = ModelBundle(export_bundle(model, str(tmp_path), features=["a", "b", "c", "d"]))
+    with ParallelVotingPredictor(bundle) as predictor:
+        np.testing.assert_allclose(predictor.predict(rows), model.predict(rows), rtol=0, atol=1e-12)
+
+
+def test_unknown_process_member_is_rejected(model):
+    with pytest.raises(ValueError, match="catboost"):
+        ParallelVotingPredictor(model, process_members=["catboost"])
@@ -0,0 +1,94 @@
+import os
+import pickle
+
+import pandas as pd
+import pytest
+
+from app.aggregate_cube import build_cubes
+from app.partitions import BASE_PARTITION, PartitionedAggregates
+from app.streaming import BUSINESS_MEASURES
+from benchmarks.synthetic import make_dashboard_frame
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    base = make_dashboard_frame(3_000, seed=3)
+    base_path = str(tmp_path / "churn.csv")
+    base.to_csv(base_path, index=False)
+    directory = tmp_path / "partitions"
+    directory.mkdir()
+    return base_path, str(directory)
+
+
+def add(directory, name, rows, seed):
+    frame = make_dashboard_frame(rows, seed=seed)
+    frame.to_csv(os.path.join(directory, name), index=False)
+    return frame
+
+
+def all_rows(base_path, directory):
+    paths = [base_path] + [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(".csv")]
+    return pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+
+
+def assert_matches_rows(aggregates, rows):
+    stats, cube, complaints_cube = aggregates.combined()
+    pd.testing.assert_series_equal(stats.rollup().mean(), rows[BUSINESS_MEASURES].mean(), check_names=False, rtol=1e-6)
+    expected_cube, expected_complaints = build_cubes(rows)
+    assert cube.totals() == pytest.approx(expected_cube.totals(), rel=1e-6)
+    for by in ["months", "marital", "crclscod"]:
+        pd.testing.assert_series_equal(
+            cube.churn_rate(by).sort_index(), expected_cube.churn_rate(by).sort_index(), check_index_type=False, check_categorical=False)
+    pd.testing.assert_series_equal(
+        complaints_cube.churn_rate("custcare_Mean"), expected_complaints.churn_rate("custcare_Mean"), check_index=False, rtol=1e-6)
+
+
+def test_refresh_covers_base_and_partitions(dataset):
+    base_path, directory = dataset
+    add(directory, "a.csv", 1_000, seed=4)
+    aggregates = PartitionedAggregates(directory, base_path=base_path)
+    result = aggregates.refresh()
+    assert sorted(result["changed"]) == sorted([BASE_PARTITION, "a.csv"])
+    assert result["partitions"] == 2
+    assert_matches_rows(aggregates, all_rows(base_path, directory))
+
+
+def test_refresh_ingests_only_the_delta(dataset):
+    base_path, directory = dataset
+    add(directory, "a.csv", 1_000, seed=4)
+    aggregates = PartitionedAggregates(directory, base_path=base_path)
+    first = aggregates.refresh()
+
+    unchanged = aggregates.refresh()
+    assert unchanged["changed"] == [] and unchanged["removed"] == []
+    assert unchanged["version"] == first["version"]
+
+    add(directory, "b.csv", 500, seed=5)
+    added = aggregates.refresh()
+    assert added["changed"] == ["b.csv"]
+    assert added["version"] != first["version"]
+    assert_matches_rows(aggregates, all_rows(base_path, directory))
+
+    os.remove(os.path.join(directory, "a.csv"))
+    removed = aggregates.refresh()
+    assert removed["removed"] == ["a.csv"]
+    assert_matches_rows(aggregates, all_rows(base_path, directory))
+
+
+def test_state_is_reloaded_between_runs(dataset):
+    base_path, directory = dataset
+    add(directory, "a.csv", 1_000, seed=4)
+    version = PartitionedAggregates(directory, base_path=base_path).refresh()["version"]
+    reopened = PartitionedAggregates(directory, base_path=base_path)
+    assert reopened.version == version
+    assert reopened.refresh()["changed"] == []
+
+
+def test_state_of_an_older_format_is_reingested(dataset):
+    base_path, directory = dataset
+    aggregates = PartitionedAggregates(directory, base_path=base_path)
+    aggregates.refresh()
+    # Before STATE_FORMAT, the partials were pickled on their own
+    with open(aggregates.state_path, "wb") as f:
+        pickle.dump(aggregates.partials, f)
+    assert PartitionedAggregates(directory, base_path=base_path).refresh()["changed"] == [BASE_PARTITION]
@@ -0,0 +1,72 @@
+import numpy as np
+
+from app.prediction_cache import PredictionCache
+
+
+class Model:
+    """Counts how often the cache falls through to a prediction."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value):
+        def compute():
+            self.calls += 1
+            return value
+        return compute
+
+
+def cached(cache, model, row, value=0.5):
+    return cache.get_or_compute(cache.key(np.array([row], dtype=np.float32)), model(value))
+
+
+def test_hits_skip_the_model_and_are_counted():
+    cache, model = PredictionCache(maxsize=4, model_version="v1"), Model()
+    assert cached(cache, model, [1, 2], 0.25) == 0.25
+    # A hit returns the stored value, whatever the model would now say
+    assert cached(cache, model, [1, 2], 0.75) == 0.25
+    assert cached(cache, model, [2, 1], 0.75) == 0.75
+    assert model.calls == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 2, 0, 2)
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache, model = PredictionCache(maxsize=2), Model()
+    cached(cache, model, [1])
+    cached(cache, model, [2])
+    # Touching [1] leaves [2] as the least recently used
+    cached(cache, model, [1])
+    cached(cache, model, [3])
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+
+    calls = model.calls
+    cached(cache, model, [1])
+    cached(cache, model, [3])
+    assert model.calls == calls
+    cached(cache, model, [2])
+    assert model.calls == calls + 1
+    assert cache.stats()["evictions"] == 2
+
+
+def test_keys_are_isolated_by_model_version():
+    old, new = PredictionCache(model_version="v1"), PredictionCache(model_version="v2")
+    row = np.array([[1.0, 2.0]], dtype=np.float32)
+    assert old.key(row) != new.key(row)
+    assert old.key(row) == PredictionCache(model_version="v1").key(row.ravel())
+
+    # Entries written under one version are never served for another
+    cache, model = PredictionCache(model_version="v1"), Model()
+    cache.get_or_compute(old.key(row), model(0.25))
+    assert cache.get_or_compute(new.key(row), model(0.75)) == 0.75
+    assert model.calls == 2
+
+
+def test_clear_drops_entries_but_keeps_counters():
+    cache, model = PredictionCache(), Model()
+    cached(cache, model, [1])
+    cache.clear()
+    cached(cache, model, [1])
+    assert model.calls == 2
+    assert cache.stats()["misses"] == 2 and cache.stats()["size"] == 1
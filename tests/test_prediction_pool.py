@@ -0,0 +1,57 @@
+import os
+import signal
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, VotingRegressor
+
+from app.model_bundle import ModelBundle, export_bundle
+from app.prediction_pool import PredictionPool
+
+FEATURES = ["a", "b", "c"]
+
+
+@pytest.fixture(scope="module")
+def bundle_path(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, len(FEATURES)))
+    y = X[:, 0] - X[:, 1] * X[:, 2]
+    model = VotingRegressor([
+        ("shallow", GradientBoostingRegressor(n_estimators=10, max_depth=2, random_state=0)),
+        ("deep", GradientBoostingRegressor(n_estimators=10, max_depth=4, random_state=0)),
+    ]).fit(X, y)
+    # Members stored as node arrays, so the spawned workers unpickle nothing
+    return export_bundle(model, str(tmp_path_factory.mktemp("bundle")), features=FEATURES)
+
+
+@pytest.fixture
+def pool(bundle_path):
+    pool = PredictionPool(workers=1, bundle_path=bundle_path, pickle_path=None)
+    yield pool
+    pool.close()
+
+
+def features():
+    return np.random.default_rng(1).normal(size=(5, len(FEATURES)))
+
+
+def test_predictions_match_the_bundle(pool, bundle_path):
+    np.testing.assert_allclose(pool.predict(features()), ModelBundle(bundle_path).predict(features()))
+    assert pool.stats()["completed"] == 1
+
+
+def test_pool_recovers_from_a_killed_worker(pool, bundle_path):
+    expected = ModelBundle(bundle_path).predict(features())
+    pool.predict(features())
+    for pid in list(pool._executor._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    # The first prediction after the crash runs on new workers instead of failing for good
+    np.testing.assert_allclose(pool.predict(features()), expected)
+    np.testing.assert_allclose(pool.submit(features()).result(timeout=60), expected)
+    assert pool.stats()["restarts"] == 1
+
+
+def test_pool_fails_to_start_without_a_model(tmp_path):
+    with pytest.raises(Exception):
+        PredictionPool(workers=1, bundle_path=str(tmp_path), pickle_path=str(tmp_path / "missing.pkl"))
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.preprocessing import InputTransform, Preprocessor, load_input_pipeline
+from app.training import DROP_COLUMNS, select_features
+from benchmarks.synthetic import make_dashboard_frame
+
+
+def raw_customers(tmp_path, rows, seed):
+    # Read back from CSV, as app.training reads the customer file
+    path = tmp_path / f"customers_{seed}.csv"
+    make_dashboard_frame(rows, seed=seed).to_csv(path, index=False)
+    df = pd.read_csv(path).drop(columns=["Customer_ID"] + DROP_COLUMNS, errors="ignore")
+    return df.drop(columns=["churn"]), df["churn"]
+
+
+@pytest.fixture(scope="module")
+def fitted(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("customers")
+    X_train, y_train = raw_customers(tmp_path, 2_000, seed=7)
+    X_test, _ = raw_customers(tmp_path, 500, seed=8)
+    preprocessor = Preprocessor().fit(X_train)
+    data = {"X_train": preprocessor.transform(X_train), "X_test": preprocessor.transform(X_test),
+            "y_train": y_train, "preprocessor": preprocessor}
+    pipeline = select_features(data)["input_pipeline"]
+    path = str(tmp_path / "input_pipeline.json")
+    InputTransform.from_pipeline(pipeline).save(path)
+    return pipeline, load_input_pipeline(path), X_test
+
+
+def assert_same_transform(pipeline, transform, X):
+    np.testing.assert_allclose(transform.transform(X), pipeline.transform(X), rtol=0, atol=1e-12)
+
+
+def test_round_trip_matches_the_fitted_pipeline(fitted):
+    pipeline, transform, X_test = fitted
+    assert isinstance(transform, InputTransform)
+    assert list(transform.feature_names_in_) == list(pipeline.feature_names_in_)
+    assert X_test.isna().any().any()
+    assert_same_transform(pipeline, transform, X_test)
+
+
+def test_unseen_categories_and_missing_values(fitted):
+    pipeline, transform, X_test = fitted
+    X = X_test.head(50).copy()
+    text = X.select_dtypes(include=["object", "string"]).columns
+    assert len(text)
+    X.loc[X.index[:10], text] = "never seen in training"
+    X.loc[X.index[10:20], text] = np.nan
+    X.iloc[20:25] = np.nan
+    assert_same_transform(pipeline, transform, X)
+
+
+def test_column_order_and_extra_columns_are_ignored(fitted):
+    pipeline, transform, X_test = fitted
+    X = X_test[X_test.columns[::-1]].assign(unrelated=1.0)
+    np.testing.assert_allclose(transform.transform(X), pipeline.transform(X_test), rtol=0, atol=1e-12)
+
+
+def test_missing_input_column_is_rejected(fitted):
+    _, transform, X_test = fitted
+    with pytest.raises(ValueError, match="missing columns"):
+        transform.transform(X_test.drop(columns=[X_test.columns[0]]))
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import numpy as np
+
+from app.serve import MicroBatcher
+
+
+class StubPredictor:
+    """Returns each row's first feature and records the size of every batch it is given."""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def __call__(self, rows):
+        self.batches.append(len(rows))
+        if self.fail_on is not None and (rows[:, 0] == self.fail_on).any():
+            raise RuntimeError("model failed")
+        return rows[:, 0] * 1.0
+
+
+def row(value):
+    return np.array([[value, 0.0]], dtype=np.float32)
+
+
+def run(batcher, scenario):
+    async def main():
+        batcher.start()
+        try:
+            return await scenario()
+        finally:
+            await batcher.stop()
+
+    return asyncio.run(main())
+
+
+def test_full_batch_flushes_without_waiting_for_the_deadline():
+    predict = StubPredictor()
+    batcher = MicroBatcher(predict, max_batch_size=4, max_delay_ms=10_000)
+
+    async def scenario():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(batcher.submit(row(i)) for i in range(4)))
+        return results, time.perf_counter() - started
+
+    results, elapsed = run(batcher, scenario)
+    assert results == [0.0, 1.0, 2.0, 3.0]
+    assert predict.batches == [4]
+    assert elapsed < 5
+    assert batcher.stats.batches == 1 and batcher.stats.max_batch == 4
+
+
+def test_partial_batch_flushes_at_the_deadline():
+    predict = StubPredictor()
+    batcher = MicroBatcher(predict, max_batch_size=64, max_delay_ms=50)
+
+    async def scenario():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(batcher.submit(row(i)) for i in range(3)))
+        return results, time.perf_counter() - started
+
+    results, elapsed = run(batcher, scenario)
+    assert results == [0.0, 1.0, 2.0]
+    assert predict.batches == [3]
+    assert elapsed >= 0.04
+    assert batcher.stats.requests == 3
+
+
+def test_oversized_burst_is_split_into_full_batches():
+    predict = StubPredictor()
+    batcher = MicroBatcher(predict, max_batch_size=4, max_delay_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(row(i)) for i in range(10)))
+
+    assert run(batcher, scenario) == [float(i) for i in range(10)]
+    assert predict.batches == [4, 4, 2]
+
+
+def test_failing_batch_fails_only_its_own_requests():
+    predict = StubPredictor(fail_on=-1)
+    batcher = MicroBatcher(predict, max_batch_size=2, max_delay_ms=10_000)
+
+    async def scenario():
+        failed = await asyncio.gather(batcher.submit(row(-1)), batcher.submit(row(1)), return_exceptions=True)
+        served = await asyncio.gather(batcher.submit(row(2)), batcher.submit(row(3)))
+        return failed, served
+
+    failed, served = run(batcher, scenario)
+    assert all(isinstance(result, RuntimeError) for result in failed)
+    # The loop keeps serving after the failed batch
+    assert served == [2.0, 3.0]
+    assert predict.batches == [2, 2]
+    assert batcher.stats.batches == 1
+
+
+def test_wrong_prediction_count_fails_the_batch():
+    batcher = MicroBatcher(lambda rows: rows[:1, 0], max_batch_size=2, max_delay_ms=10_000)
+
+    async def scenario():
+        return await asyncio.gather(batcher.submit(row(1)), batcher.submit(row(2)), return_exceptions=True)
+
+    failed = run(batcher, scenario)
+    assert all(isinstance(result, ValueError) for result in failed)
+    assert "1 predictions for 2 requests" in str(failed[0])
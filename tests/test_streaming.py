@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.streaming import RunningStats
+from benchmarks.synthetic import make_dashboard_frame
+
+MEASURES = ["totrev", "months", "rev_Mean", "custcare_Mean"]
+SEGMENTS = ["churn", "creditcd"]
+
+
+@pytest.fixture(scope="module")
+def customers():
+    df = make_dashboard_frame(10_000, seed=6, columns=MEASURES + SEGMENTS)
+    return df.astype({measure: np.float64 for measure in MEASURES})
+
+
+def chunked(df, by, size=1_500):
+    stats = RunningStats(MEASURES, by=by)
+    for start in range(0, len(df), size):
+        stats.update(df.iloc[start:start + size])
+    return stats
+
+
+@pytest.mark.parametrize("by", [None, ["churn"], ["creditcd"], ["churn", "creditcd"]])
+def test_rollup_matches_pandas(customers, by):
+    stats = chunked(customers, SEGMENTS).rollup(by)
+    expected = customers.groupby(by, observed=True, dropna=False)[MEASURES] if by else customers[MEASURES]
+    for statistic in ["count", "mean", "var", "std"]:
+        actual, reference = getattr(stats, statistic)(), getattr(expected, statistic)()
+        if by:
+            reference = reference.reindex(actual.index)
+        np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(reference, dtype=float), rtol=1e-10)
+
+
+def test_merge_equals_single_pass(customers):
+    half = len(customers) // 2
+    merged = chunked(customers.iloc[:half], SEGMENTS).merge(chunked(customers.iloc[half:], SEGMENTS))
+    whole = chunked(customers, SEGMENTS, size=len(customers))
+    pd.testing.assert_frame_equal(merged.var().sort_index(), whole.var().sort_index(), rtol=1e-10)
+
+
+def test_variance_keeps_precision_around_a_large_mean():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": 1e6 + rng.normal(scale=0.01, size=10_000)})
+    stats = RunningStats(["x"])
+    for start in range(0, len(df), 1_000):
+        stats.update(df.iloc[start:start + 1_000])
+    assert stats.var()["x"] == pytest.approx(df["x"].var(), rel=1e-6)
+
+
+def test_all_missing_group_is_empty_not_zero():
+    stats = RunningStats(["x"]).update(pd.DataFrame({"x": [np.nan, np.nan]}))
+    assert stats.count()["x"] == 0
+    assert np.isnan(stats.mean()["x"]) and np.isnan(stats.var()["x"])
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, VotingRegressor
+
+from app.tree_compiler import CompiledEnsemble, GradientBoostingArrays, _compile_catboost, _compile_lightgbm
+
+catboost = pytest.importorskip("catboost")
+lightgbm = pytest.importorskip("lightgbm")
+
+ATOL = 1e-9
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 5))
+    # Rounded columns put many rows exactly on the learned thresholds
+    X[:, 3] = np.round(X[:, 3], 1)
+    X[:, 4] = rng.integers(0, 4, size=len(X))
+    y = X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + 0.3 * X[:, 4] + rng.normal(scale=0.1, size=len(X))
+    return X, y
+
+
+def with_missing(X, fraction=0.2, seed=1):
+    X = X.copy()
+    X[np.random.default_rng(seed).random(X.shape) < fraction] = np.nan
+    return X
+
+
+@pytest.fixture(scope="module")
+def test_rows(training_data):
+    X, _ = training_data
+    rng = np.random.default_rng(2)
+    # Unseen rows, the training rows themselves (exact threshold values) and a few extremes
+    return np.vstack([rng.normal(size=(300, X.shape[1])), X[:200], np.full((1, X.shape[1]), 1e6), np.full((1, X.shape[1]), -1e6)])
+
+
+def test_gradient_boosting_matches_predict(training_data, test_rows):
+    X, y = training_data
+    model = GradientBoostingRegressor(n_estimators=30, max_depth=3, random_state=0).fit(X, y)
+    np.testing.assert_allclose(GradientBoostingArrays.from_estimator(model).predict(test_rows), model.predict(test_rows), atol=ATOL)
+
+
+def test_gradient_boosting_arrays_round_trip(training_data, test_rows, tmp_path):
+    X, y = training_data
+    model = GradientBoostingRegressor(n_estimators=10, max_depth=4, random_state=0).fit(X, y)
+    path = str(tmp_path / "gradient_boosting.npz")
+    GradientBoostingArrays.from_estimator(model).save(path)
+    np.testing.assert_allclose(GradientBoostingArrays.load(path).predict(test_rows), model.predict(test_rows), atol=ATOL)
+
+
+@pytest.mark.parametrize("missing_in_training", [False, True])
+def test_lightgbm_matches_predict_with_missing_inputs(training_data, test_rows, missing_in_training):
+    X, y = training_data
+    # Trained without missing values, LightGBM maps NaN to zero; trained with them, it learns a direction
+    X_train = with_missing(X) if missing_in_training else X
+    model = lightgbm.LGBMRegressor(n_estimators=30, num_leaves=8, min_child_samples=5, verbose=-1).fit(X_train, y)
+    compiled = _compile_lightgbm("lightgbm", model)
+    for rows in [test_rows, with_missing(test_rows, seed=3), np.full((3, X.shape[1]), np.nan)]:
+        np.testing.assert_allclose(compiled.predict(rows), model.predict(rows), atol=ATOL)
+
+
+def test_lightgbm_booster_matches_predict(training_data, test_rows):
+    X, y = training_data
+    booster = lightgbm.LGBMRegressor(n_estimators=10, num_leaves=16, verbose=-1).fit(with_missing(X), y).booster_
+    rows = with_missing(test_rows, seed=4)
+    np.testing.assert_allclose(_compile_lightgbm("lightgbm", booster).predict(rows), booster.predict(rows), atol=ATOL)
+
+
+@pytest.mark.parametrize("nan_mode", ["Min", "Max"])
+@pytest.mark.parametrize("depth", [1, 4, 6])
+def test_catboost_oblivious_trees_match_predict(training_data, test_rows, nan_mode, depth):
+    X, y = training_data
+    model = catboost.CatBoostRegressor(iterations=30, depth=depth, nan_mode=nan_mode, random_seed=0, verbose=False,
+                                       allow_writing_files=False).fit(with_missing(X), y)
+    compiled = _compile_catboost("catboost", model)
+    for rows in [test_rows, with_missing(test_rows, seed=5)]:
+        np.testing.assert_allclose(compiled.predict(rows), model.predict(rows), atol=ATOL)
+
+
+def test_compiled_ensemble_matches_voting_regressor(training_data, test_rows, tmp_path):
+    X, y = training_data
+    model = VotingRegressor([
+        ("catboost", catboost.CatBoostRegressor(iterations=20, depth=4, random_seed=0, verbose=False, allow_writing_files=False)),
+        ("lightgbm", lightgbm.LGBMRegressor(n_estimators=20, num_leaves=8, verbose=-1)),
+        ("gradient_boosting", GradientBoostingRegressor(n_estimators=20, random_state=0)),
+    ], weights=[2, 1, 1]).fit(X, y)
+    path = str(tmp_path / "ensemble.npz")
+    CompiledEnsemble.from_ensemble(model).save(path)
+    compiled = CompiledEnsemble.load(path, block_size=64)
+    np.testing.assert_allclose(compiled.predict(test_rows), model.predict(test_rows), atol=ATOL)